@@ -1,3 +1,148 @@
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+from twilio.rest import Client
+import logging
 
-# Register your models here.
+from .cache import bump_data_version_on_commit
+from .candidates import normalize_phone, refresh_candidates_on_commit
+from .models import CallResponse, CallStatusCount
+from .scoring import SCORE_FIELDS, get_scorer
+from .stats import read_status_counts, update_call_status
+
+logger = logging.getLogger(__name__)
+
+ACTION_BATCH_SIZE = 500
+RETRANSCRIBE_BATCH_SIZE = 50
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never runs COUNT(*) over the whole table: an unfiltered
+    changelist takes its total from the status counters, a filtered one counts
+    at most COUNT_CAP matching rows.
+    """
+    COUNT_CAP = 10000
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            return sum(read_status_counts().values())
+        return self.object_list.order_by().values('pk')[:self.COUNT_CAP].count()
+
+
+class CallStatusFilter(admin.SimpleListFilter):
+    """call_status choices from the counters table instead of a DISTINCT scan"""
+    title = 'call status'
+    parameter_name = 'call_status'
+
+    def lookups(self, request, model_admin):
+        statuses = CallStatusCount.objects.filter(count__gt=0).order_by('call_status')
+        return [(s.call_status or '-', s.call_status or 'no status') for s in statuses]
+
+    def queryset(self, request, queryset):
+        if self.value() == '-':
+            return queryset.filter(Q(call_status='') | Q(call_status__isnull=True))
+        if self.value():
+            return queryset.filter(call_status=self.value())
+        return queryset
+
+
+def _batches(queryset, size):
+    """Lists of primary keys from `queryset`, `size` at a time"""
+    # Collected up front: the actions below change rows the filter may select on
+    pks = list(queryset.order_by().values_list('pk', flat=True))
+    for start in range(0, len(pks), size):
+        yield pks[start:start + size]
+
+
+def _set_status_action(status):
+    def action(modeladmin, request, queryset):
+        moved = 0
+        for batch in _batches(queryset, ACTION_BATCH_SIZE):
+            moved += update_call_status(CallResponse.objects.filter(pk__in=batch), status)
+        modeladmin.message_user(request, f"Marked {moved} responses as {status}.", messages.SUCCESS)
+    action.__name__ = f'mark_{status.replace("-", "_")}'
+    action.short_description = f'Mark selected responses as {status}'
+    return action
+
+
+@admin.register(CallResponse)
+class CallResponseAdmin(admin.ModelAdmin):
+    list_display = ('id', 'phone_number', 'question', 'call_status', 'transcript_status',
+                    'recording_duration', 'keyword_score', 'created_at')
+    list_display_links = ('id', 'phone_number')
+    list_filter = (CallStatusFilter, 'created_at')
+    date_hierarchy = 'created_at'
+    # Searches are exact matches on indexed columns, see get_search_results
+    search_fields = ('phone_number', 'call_sid', 'recording_sid')
+    search_help_text = 'Exact phone number, call SID or recording SID'
+    ordering = ('-created_at', '-id')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    readonly_fields = ('keyword_score', 'keyword_hits', 'keyword_version', 'created_at', 'updated_at')
+    actions = [
+        _set_status_action('completed'),
+        _set_status_action('failed'),
+        'retranscribe',
+    ]
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if request.resolver_match and request.resolver_match.url_name.endswith('_changelist'):
+            # Keep the large text columns out of the list page
+            queryset = queryset.only(*self.list_display)
+        return queryset
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        condition = Q(call_sid=term) | Q(recording_sid=term)
+        phone = normalize_phone(term)
+        if phone:
+            condition |= Q(phone_number__in=[phone, f'+{phone}'])
+        return queryset.filter(condition), False
+
+    @admin.action(description='Fetch transcripts again from Twilio')
+    def retranscribe(self, request, queryset):
+        if not settings.TWILIO_ACCOUNT_SID or not settings.TWILIO_AUTH_TOKEN:
+            self.message_user(request, 'Twilio credentials are not configured.', messages.ERROR)
+            return
+        client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+        scorer = get_scorer()
+        updated = failed = skipped = 0
+        selected = queryset.exclude(recording_sid__isnull=True).exclude(recording_sid='')
+        for batch in _batches(selected, RETRANSCRIBE_BATCH_SIZE):
+            changed = []
+            for response in CallResponse.objects.filter(pk__in=batch).only('id', 'phone_number', 'recording_sid'):
+                try:
+                    transcriptions = client.transcriptions.list(recording_sid=response.recording_sid, limit=1)
+                except Exception as e:
+                    logger.error(f"Error fetching transcript for recording {response.recording_sid}: {str(e)}")
+                    failed += 1
+                    continue
+                if not transcriptions:
+                    skipped += 1
+                    continue
+                response.transcript = transcriptions[0].transcription_text
+                response.transcript_status = 'completed'
+                for field, value in scorer.fields(response.transcript).items():
+                    setattr(response, field, value)
+                response.updated_at = timezone.now()
+                changed.append(response)
+            # bulk_update sends no signals, so do their bookkeeping here
+            CallResponse.objects.bulk_update(changed, ['transcript', 'transcript_status', *SCORE_FIELDS, 'updated_at'])
+            updated += len(changed)
+            if changed:
+                bump_data_version_on_commit()
+                refresh_candidates_on_commit(r.phone_number for r in changed)
+        self.message_user(
+            request,
+            f"Transcripts updated for {updated} responses, {skipped} not available yet, {failed} failed.",
+            messages.WARNING if failed else messages.SUCCESS,
+        )
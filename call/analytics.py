@@ -0,0 +1,132 @@
+"""
+Duration distributions for tuning the recording limits.
+
+Durations are whole seconds, so the database collapses the matching rows to
+one (slice, duration, count) row per distinct value; a million responses come
+back as a few thousand compact tuples instead of a million. Those go into
+NumPy arrays, and the percentiles, histograms and means are computed
+vectorized from the counts as weights. They are exact, and memory follows the
+number of distinct durations rather than the number of rows.
+"""
+from math import ceil
+
+import numpy as np
+from django.db.models import CharField, Count, F, Value
+from django.db.models.functions import Cast, Substr
+
+from .filters import filter_call_responses
+from .models import CallResponse
+from .questions import load_questions
+
+DURATION_FIELDS = ('recording_duration', 'call_duration')
+GROUPINGS = ('question', 'date', 'status')
+PERCENTILES = [50, 75, 90, 95, 99]
+# Mirrors maxLength on the <Record> verbs in voice(); the share of answers
+# reaching it shows how often candidates are cut off
+RECORDING_MAX_LENGTH = 30
+DEFAULT_BINS = 30
+MAX_BINS = 200
+
+
+def _slice_key(group_by):
+    if group_by == 'question':
+        return F('question')
+    if group_by == 'status':
+        return F('call_status')
+    if group_by == 'date':
+        # The (UTC) date prefix of the stored timestamp, with no per-row date functions
+        return Substr(Cast('created_at', CharField()), 1, 10)
+    return Value('all', output_field=CharField())
+
+
+def _slice_order(group_by):
+    """Sort key for slice labels: interview order for questions, else alphabetical"""
+    if group_by != 'question':
+        return lambda key: (0, key)
+    positions = {question: i for i, question in enumerate(load_questions())}
+    return lambda key: (positions.get(key, len(positions)), key)
+
+
+def _counts(queryset, field, group_by):
+    """(slice keys, durations, counts) arrays with one entry per distinct (slice, duration)"""
+    rows = list(
+        queryset.filter(**{f'{field}__isnull': False})
+        .annotate(slice_key=_slice_key(group_by))
+        .order_by()
+        .values('slice_key', field)
+        .annotate(rows=Count('id'))
+        .values_list('slice_key', field, 'rows')
+    )
+    keys = np.array([key or '' for key, _, _ in rows], dtype=str)
+    counts = np.fromiter(((duration, n) for _, duration, n in rows),
+                         dtype=[('duration', np.float64), ('rows', np.int64)], count=len(rows))
+    return keys, counts['duration'], counts['rows']
+
+
+def bin_edges(durations, bins):
+    """`bins` equal whole-second bins from 0 covering every duration"""
+    upper = durations.max() if len(durations) else RECORDING_MAX_LENGTH
+    width = max(1, ceil(upper / bins))
+    return np.arange(bins + 1) * width
+
+
+def weighted_percentiles(durations, counts, percentiles=PERCENTILES):
+    """np.percentile's default (linear) method over `durations` repeated `counts` times"""
+    order = np.argsort(durations)
+    durations, cumulative = durations[order], np.cumsum(counts[order])
+    positions = (cumulative[-1] - 1) * np.asarray(percentiles) / 100
+    below = np.floor(positions).astype(np.int64)
+    above = np.minimum(below + 1, cumulative[-1] - 1)
+    low = durations[np.searchsorted(cumulative, below, side='right')]
+    high = durations[np.searchsorted(cumulative, above, side='right')]
+    return low + (positions - below) * (high - low)
+
+
+def summarize(durations, counts, edges, limit=None):
+    total = int(counts.sum())
+    summary = {
+        'count': total,
+        'mean': None, 'min': None, 'max': None,
+        'percentiles': {f'p{p}': None for p in PERCENTILES},
+        'histogram': np.histogram(durations, edges, weights=counts)[0].astype(np.int64).tolist(),
+    }
+    if total:
+        summary.update({
+            'mean': round(float(np.average(durations, weights=counts)), 2),
+            'min': float(durations.min()),
+            'max': float(durations.max()),
+            'percentiles': {
+                f'p{p}': round(float(value), 2)
+                for p, value in zip(PERCENTILES, weighted_percentiles(durations, counts))
+            },
+        })
+    if limit is not None:
+        summary['at_limit'] = round(float(counts[durations >= limit].sum() / total), 4) if total else None
+    return summary
+
+
+def duration_distribution(field, group_by=None, bins=DEFAULT_BINS, params=None):
+    """
+    Percentiles and a histogram of `field` over the responses matching the
+    dashboard filters in `params`, overall and per `group_by` slice.
+    """
+    queryset = filter_call_responses(CallResponse.objects.all(), params or {})
+    keys, durations, counts = _counts(queryset, field, group_by)
+    edges = bin_edges(durations, bins)
+    limit = RECORDING_MAX_LENGTH if field == 'recording_duration' else None
+
+    result = {
+        'field': field,
+        'group_by': group_by,
+        'bin_edges': edges.tolist(),
+        'overall': summarize(durations, counts, edges, limit),
+        'groups': [],
+    }
+    if group_by:
+        labels, slices = np.unique(keys, return_inverse=True)
+        order = _slice_order(group_by)
+        for i in sorted(range(len(labels)), key=lambda i: order(str(labels[i]))):
+            in_slice = slices == i
+            summary = summarize(durations[in_slice], counts[in_slice], edges, limit)
+            result['groups'].append(dict(key=str(labels[i]) or 'none', **summary))
+    return result
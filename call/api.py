@@ -0,0 +1,182 @@
+"""
+Read-only JSON API over CallResponse for pollers such as the ATS integration.
+
+Pages are ordered by (updated_at, id) and addressed with an opaque cursor, so a
+poller only ever asks for what changed since its last page. Rows updated in
+the last API_LAG_SECONDS are held back, like the incremental export and the
+rollups do, so a transaction that commits after a page was served cannot land
+behind the cursor and be skipped. Every page carries
+an ETag computed from the (id, updated_at) keys of its rows plus a
+Last-Modified date, which lets an unchanged page be answered with 304 after an
+index-only key query and without serializing anything.
+
+/api/analytics/durations/ serves duration distributions from call.analytics.
+"""
+import hashlib
+import hmac
+import json
+from calendar import timegm
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_GET
+
+from .analytics import DEFAULT_BINS, DURATION_FIELDS, GROUPINGS, MAX_BINS, duration_distribution
+from .cache import cached_fragment
+from .filters import FILTER_PARAMS
+from .models import CallResponse
+from .pagination import decode_cursor, encode_cursor, seek_filter
+from .routers import reporting_view
+
+API_FIELDS = [
+    'id', 'phone_number', 'question', 'response', 'recording_url', 'recording_sid',
+    'recording_duration', 'transcript', 'transcript_status', 'call_sid',
+    'call_duration', 'call_status', 'created_at', 'updated_at',
+]
+API_ORDERING = ['updated_at', 'id']
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+API_LAG_SECONDS = 5
+
+
+def _error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def _authorized(request):
+    token = settings.CALL_API_TOKEN
+    if not token:
+        return True
+    # Constant-time comparison so response timing does not leak the token; bytes
+    # because compare_digest rejects non-ASCII str from a hostile header
+    header = request.headers.get('Authorization', '')
+    return hmac.compare_digest(header.encode(), f'Bearer {token}'.encode())
+
+
+def _fields(request):
+    """Requested sparse fieldset; None if it names an unknown field"""
+    requested = request.GET.get('fields')
+    if not requested:
+        return API_FIELDS
+    fields = [f.strip() for f in requested.split(',') if f.strip()]
+    if any(f not in API_FIELDS for f in fields):
+        return None
+    return ['id'] + [f for f in fields if f != 'id']
+
+
+def _validators(keys, extra):
+    """ETag and Last-Modified timestamp for a page with the given (id, updated_at) keys"""
+    digest = hashlib.sha1(repr(extra).encode())
+    for row_id, updated_at in keys:
+        digest.update(f'{row_id}:{updated_at.isoformat()}'.encode())
+    last_modified = max((updated_at for _, updated_at in keys), default=None)
+    timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+    return quote_etag(digest.hexdigest()), timestamp
+
+
+def _with_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@require_GET
+@reporting_view
+def response_list(request):
+    """Page of responses changed after `cursor`, oldest change first"""
+    if not _authorized(request):
+        return _error('Invalid or missing API token', status=401)
+    fields = _fields(request)
+    if fields is None:
+        return _error(f"Unknown field in 'fields'; allowed: {', '.join(API_FIELDS)}")
+    try:
+        limit = min(int(request.GET.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        return _error("'limit' must be an integer")
+    if limit < 1:
+        return _error("'limit' must be positive")
+
+    cursor_token = request.GET.get('cursor')
+    cursor = decode_cursor(cursor_token)
+    if cursor_token and (cursor is None or len(cursor) != len(API_ORDERING)):
+        return _error("Invalid 'cursor'")
+
+    cutoff = timezone.now() - timedelta(seconds=API_LAG_SECONDS)
+    queryset = CallResponse.objects.filter(updated_at__lte=cutoff).order_by(*API_ORDERING)
+    if cursor:
+        queryset = queryset.filter(seek_filter(API_ORDERING, cursor))
+
+    # Cheap key query first: it decides between 304 and a full page
+    keys = list(queryset.values_list('id', 'updated_at')[:limit + 1])
+    has_more = len(keys) > limit
+    keys = keys[:limit]
+    etag, last_modified = _validators(keys, (fields, limit, cursor_token))
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return _with_validators(not_modified, etag, last_modified)
+
+    rows = {row['id']: row for row in CallResponse.objects.filter(id__in=[k[0] for k in keys]).values(*fields)}
+    results = [rows[row_id] for row_id, _ in keys if row_id in rows]
+    # With no new rows the poller keeps its cursor and asks again later
+    next_cursor = encode_cursor([keys[-1][1], keys[-1][0]]) if keys else cursor_token
+    response = JsonResponse(
+        {'results': results, 'next_cursor': next_cursor, 'has_more': has_more},
+        encoder=DjangoJSONEncoder,
+    )
+    return _with_validators(response, etag, last_modified)
+
+
+@require_GET
+@reporting_view
+def response_detail(request, response_id):
+    if not _authorized(request):
+        return _error('Invalid or missing API token', status=401)
+    fields = _fields(request)
+    if fields is None:
+        return _error(f"Unknown field in 'fields'; allowed: {', '.join(API_FIELDS)}")
+
+    key = CallResponse.objects.filter(id=response_id).values_list('id', 'updated_at').first()
+    if key is None:
+        return _error('Not found', status=404)
+    etag, last_modified = _validators([key], fields)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return _with_validators(not_modified, etag, last_modified)
+
+    row = CallResponse.objects.filter(id=response_id).values(*fields).first()
+    return _with_validators(JsonResponse(row, encoder=DjangoJSONEncoder), etag, last_modified)
+
+
+@require_GET
+@reporting_view
+def duration_analytics(request):
+    """Duration percentiles and histograms, cached per data version"""
+    if not _authorized(request):
+        return _error('Invalid or missing API token', status=401)
+    field = request.GET.get('field', 'recording_duration')
+    if field not in DURATION_FIELDS:
+        return _error(f"'field' must be one of: {', '.join(DURATION_FIELDS)}")
+    group_by = request.GET.get('group_by') or None
+    if group_by and group_by not in GROUPINGS:
+        return _error(f"'group_by' must be one of: {', '.join(GROUPINGS)}")
+    try:
+        bins = int(request.GET.get('bins', DEFAULT_BINS))
+    except ValueError:
+        return _error("'bins' must be an integer")
+    if not 1 <= bins <= MAX_BINS:
+        return _error(f"'bins' must be between 1 and {MAX_BINS}")
+
+    params = {key: request.GET[key] for key in FILTER_PARAMS if request.GET.get(key)}
+    key = hashlib.sha1(json.dumps([field, group_by, bins, params], sort_keys=True).encode()).hexdigest()
+    body = cached_fragment(
+        'duration-analytics', key,
+        lambda: json.dumps(duration_distribution(field, group_by, bins, params)),
+    )
+    return HttpResponse(body, content_type='application/json')
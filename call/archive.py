@@ -0,0 +1,178 @@
+"""
+Cold storage for old CallResponse rows.
+
+`archive_responses` moves rows past the retention age out of the live table
+into gzip-compressed JSONL segment files. Every segment has a small JSON index
+next to it with its date range, the line range of each day and the line numbers
+of each phone number, so `ArchiveReader` only opens segments that can match a
+query and only parses the lines it needs.
+
+Archived rows leave every live summary: `delete_archived` removes them in one
+statement instead of through per-row delete signals, then takes them out of
+the status counters and recomputes the affected Candidate summaries in bulk,
+so those describe the live table exactly as `rebuild_call_stats` and
+`rebuild_candidates` would. Archived history is read with `query_archive`.
+"""
+import gzip
+import json
+import os
+from datetime import date, datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+ARCHIVE_FIELDS = [
+    'id', 'phone_number', 'question', 'response', 'recording_url', 'recording_sid',
+    'recording_duration', 'transcript', 'transcript_status', 'call_sid',
+    'call_duration', 'call_status', 'created_at', 'updated_at',
+]
+
+SEGMENT_SUFFIX = '.jsonl.gz'
+INDEX_SUFFIX = '.idx.json'
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def write_segment(directory, rows):
+    """
+    Write `rows` (dicts with ARCHIVE_FIELDS, ordered by created_at) as one segment.
+
+    The segment and its index are written to temporary names, fsynced and then
+    renamed, so a crash never leaves a half-written segment visible to readers.
+    Returns the segment path.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    first, last = rows[0], rows[-1]
+    name = f"segment-{first['created_at']:%Y%m%d%H%M%S}-{first['id']}"
+    segment_path = directory / (name + SEGMENT_SUFFIX)
+    index_path = directory / (name + INDEX_SUFFIX)
+
+    dates = {}
+    phones = {}
+    tmp_segment = segment_path.with_name(segment_path.name + '.tmp')
+    with open(tmp_segment, 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) as gz:
+            for line_no, row in enumerate(rows):
+                record = {field: _encode(row[field]) for field in ARCHIVE_FIELDS}
+                gz.write(json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n')
+                day = row['created_at'].date().isoformat()
+                dates.setdefault(day, [line_no, line_no])[1] = line_no
+                phones.setdefault(row['phone_number'], []).append(line_no)
+        raw.flush()
+        os.fsync(raw.fileno())
+
+    index = {
+        'rows': len(rows),
+        'min_id': min(row['id'] for row in rows),
+        'max_id': max(row['id'] for row in rows),
+        'min_created_at': first['created_at'].isoformat(),
+        'max_created_at': last['created_at'].isoformat(),
+        'dates': dates,
+        'phones': phones,
+    }
+    tmp_index = index_path.with_name(index_path.name + '.tmp')
+    with open(tmp_index, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_segment, segment_path)
+    os.replace(tmp_index, index_path)
+    return segment_path
+
+
+def delete_archived(rows):
+    """Delete the archived `rows` (dicts with ARCHIVE_FIELDS) and update the live summaries"""
+    from .cache import bump_data_version_on_commit
+    from .candidates import refresh_candidates_in_bulk
+    from .models import CallResponse
+    from .stats import adjust_status_counts
+
+    deltas = {}
+    for row in rows:
+        deltas[row['call_status']] = deltas.get(row['call_status'], 0) - 1
+    with transaction.atomic():
+        # _raw_delete skips the per-row fetch and post_delete signals of delete();
+        # their bookkeeping is done once for the whole batch below
+        queryset = CallResponse.objects.filter(id__in=[row['id'] for row in rows])
+        queryset._raw_delete(queryset.db)
+        adjust_status_counts(deltas)
+        bump_data_version_on_commit()
+    refresh_candidates_in_bulk({row['phone_number'] for row in rows})
+
+
+class ArchiveReader:
+    """On-demand query access to archived CallResponse rows"""
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory or settings.CALL_ARCHIVE_DIR)
+
+    def segments(self):
+        """Yield (segment_path, index) pairs in chronological order"""
+        if not self.directory.exists():
+            return
+        for index_path in sorted(self.directory.glob('segment-*' + INDEX_SUFFIX)):
+            segment_path = index_path.with_name(index_path.name[:-len(INDEX_SUFFIX)] + SEGMENT_SUFFIX)
+            if not segment_path.exists():
+                continue
+            with open(index_path, encoding='utf-8') as f:
+                yield segment_path, json.load(f)
+
+    def query(self, phone_number=None, since=None, until=None, limit=None):
+        """
+        Yield archived rows as dicts, oldest first.
+
+        `since`/`until` are dates (inclusive) and prune whole segments and days
+        through the index; `phone_number` is matched exactly through the index.
+        """
+        since = since.isoformat() if isinstance(since, date) else since
+        until = until.isoformat() if isinstance(until, date) else until
+        seen = set()
+        yielded = 0
+        for segment_path, index in self.segments():
+            if since and index['max_created_at'][:10] < since:
+                continue
+            if until and index['min_created_at'][:10] > until:
+                continue
+
+            wanted = None
+            if phone_number is not None:
+                wanted = set(index['phones'].get(phone_number, []))
+                if not wanted:
+                    continue
+            if since or until:
+                in_range = set()
+                for day, (start, end) in index['dates'].items():
+                    if (not since or day >= since) and (not until or day <= until):
+                        in_range.update(range(start, end + 1))
+                wanted = in_range if wanted is None else wanted & in_range
+                if not wanted:
+                    continue
+
+            last_line = max(wanted) if wanted is not None else None
+            with gzip.open(segment_path, 'rb') as f:
+                for line_no, line in enumerate(f):
+                    if wanted is not None:
+                        if line_no > last_line:
+                            break
+                        if line_no not in wanted:
+                            continue
+                    row = json.loads(line)
+                    # A crash between writing a segment and deleting its rows
+                    # archives them again on the next run; report them once.
+                    if row['id'] in seen:
+                        continue
+                    seen.add(row['id'])
+                    row['created_at'] = parse_datetime(row['created_at'])
+                    row['updated_at'] = parse_datetime(row['updated_at'])
+                    yield row
+                    yielded += 1
+                    if limit is not None and yielded >= limit:
+                        return
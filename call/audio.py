@@ -0,0 +1,148 @@
+"""
+Answer-quality features from recorded audio.
+
+Recordings are decoded into a mono float32 NumPy array (WAV with the standard
+library, MP3 through ffmpeg when it is installed) and cut into fixed frames
+with a reshape, so every feature is a vectorized reduction over a
+(frames, samples) view rather than a Python loop over samples:
+
+- speech_ratio: share of frames louder than an adaptive threshold, set a
+  margin above the recording's own noise floor;
+- silence gaps: runs of quiet frames between speech, counted from
+  MIN_GAP_SECONDS up;
+- effective speaking time: from the first to the last speech frame minus
+  the silence gaps, so short pauses between words still count as speaking;
+- loudness: RMS level of the speech frames and sample peak, in dBFS.
+
+This module holds no model code so that analyze_recordings' worker
+processes can import it cheaply.
+"""
+import os
+import shutil
+import subprocess
+import wave
+
+import numpy as np
+
+FRAME_SECONDS = 0.02
+MIN_GAP_SECONDS = 0.3
+NOISE_PERCENTILE = 10
+SPEECH_MARGIN_DB = 10.0
+SPEECH_FLOOR_DBFS = -50.0
+MP3_SAMPLE_RATE = 16000
+AUDIO_EXTENSIONS = ('.wav', '.mp3')
+_EPSILON = 1e-10
+
+FEATURE_FIELDS = [
+    'duration_seconds', 'speech_ratio', 'speaking_seconds', 'silence_gaps',
+    'longest_silence_seconds', 'loudness_dbfs', 'peak_dbfs', 'sample_rate',
+]
+
+
+def decode_wav(path):
+    """(samples in [-1, 1] as float32 mono, sample rate) of a PCM WAV file"""
+    with wave.open(path, 'rb') as f:
+        channels, width, rate = f.getnchannels(), f.getsampwidth(), f.getframerate()
+        data = f.readframes(f.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / 2 ** 15
+    elif width == 3:
+        # Pad each 24-bit sample into the top of an int32
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+        padded = np.zeros((len(raw), 4), dtype=np.uint8)
+        padded[:, 1:] = raw
+        samples = padded.view('<i4').ravel().astype(np.float32) / 2 ** 31
+    elif width == 4:
+        samples = np.frombuffer(data, dtype='<i4').astype(np.float32) / 2 ** 31
+    else:
+        raise ValueError(f'Unsupported WAV sample width: {width} bytes')
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+def decode_mp3(path):
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        raise RuntimeError('Decoding MP3 needs ffmpeg installed')
+    result = subprocess.run(
+        [ffmpeg, '-v', 'error', '-i', path, '-f', 's16le', '-ac', '1', '-ar', str(MP3_SAMPLE_RATE), '-'],
+        capture_output=True, check=True,
+    )
+    return np.frombuffer(result.stdout, dtype='<i2').astype(np.float32) / 2 ** 15, MP3_SAMPLE_RATE
+
+
+def load_audio(path):
+    if path.lower().endswith('.mp3'):
+        return decode_mp3(path)
+    return decode_wav(path)
+
+
+def _dbfs(power):
+    return 10 * np.log10(np.maximum(power, _EPSILON))
+
+
+def _quiet_runs(speech):
+    """Length in frames of each run of non-speech frames"""
+    quiet = np.concatenate(([0], (~speech).astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(quiet))
+    return edges[1::2] - edges[::2]
+
+
+def extract_features(samples, rate):
+    frame = max(1, int(rate * FRAME_SECONDS))
+    count = len(samples) // frame
+    features = dict.fromkeys(FEATURE_FIELDS)
+    features.update({
+        'duration_seconds': round(len(samples) / rate, 3) if rate else 0.0,
+        'sample_rate': rate,
+        'speech_ratio': 0.0, 'speaking_seconds': 0.0, 'silence_gaps': 0, 'longest_silence_seconds': 0.0,
+    })
+    if not count:
+        return features
+
+    frames = samples[:count * frame].reshape(count, frame)
+    power = np.mean(np.square(frames, dtype=np.float64), axis=1)
+    level = _dbfs(power)
+    threshold = max(np.percentile(level, NOISE_PERCENTILE) + SPEECH_MARGIN_DB, SPEECH_FLOOR_DBFS)
+    speech = level > threshold
+    features['peak_dbfs'] = round(float(_dbfs(np.max(np.abs(samples)) ** 2)), 2)
+    if not speech.any():
+        return features
+
+    spoken = np.flatnonzero(speech)
+    first, last = spoken[0], spoken[-1]
+    runs = _quiet_runs(speech[first:last + 1])
+    gaps = runs[runs * FRAME_SECONDS >= MIN_GAP_SECONDS]
+    features.update({
+        'speech_ratio': round(float(speech.mean()), 4),
+        'speaking_seconds': round(float((last - first + 1 - gaps.sum()) * FRAME_SECONDS), 2),
+        'silence_gaps': int(len(gaps)),
+        'longest_silence_seconds': round(float(gaps.max() * FRAME_SECONDS), 2) if len(gaps) else 0.0,
+        'loudness_dbfs': round(float(_dbfs(power[speech].mean())), 2),
+    })
+    return features
+
+
+def recording_path(directory, recording_sid):
+    """Local WAV or MP3 file for a recording, or None if it has not been downloaded"""
+    for extension in AUDIO_EXTENSIONS:
+        path = os.path.join(directory, f'{recording_sid}{extension}')
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def analyze_file(job):
+    """(response id, features, error) for a (response id, path) job; run in a worker process"""
+    response_id, path = job
+    try:
+        return response_id, extract_features(*load_audio(path)), ''
+    except Exception as e:
+        return response_id, None, f'{type(e).__name__}: {e}' if str(e) else type(e).__name__
+
+
+def analyze_batch(jobs):
+    return [analyze_file(job) for job in jobs]
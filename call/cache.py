@@ -0,0 +1,102 @@
+"""
+Rendered-fragment caching for the dashboard and response pages.
+
+Cached fragments are keyed by a data version that signal handlers bump after
+every committed CallResponse change, so nothing is ever invalidated explicitly:
+a new version simply misses and old entries age out. The version must live in
+a cache every process shares (the file cache by default), or bumps made by
+management commands would never reach the web workers. A bump stores a new
+unique version rather than incrementing, so concurrent bumps on a backend
+without atomic increments (the file cache) can never cancel out.
+
+Hit and miss counters would cost a cache write per request, so they are kept
+in Redis only, where an increment is one atomic command; with any other
+backend each process counts in memory and `manage.py cache_stats` reports its
+own process only.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .routers import reading_from_replica
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'call:data-version'
+FRAGMENTS = ('dashboard-stats', 'response-page', 'duration-analytics')
+
+
+def data_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed with the clock so a restarted local cache never reuses old versions
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_data_version():
+    cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def bump_data_version_on_commit():
+    transaction.on_commit(bump_data_version)
+
+
+_local_counts = Counter()
+_local_lock = threading.Lock()
+
+
+def _shared_counters():
+    return settings.CACHES['default']['BACKEND'].endswith('RedisCache')
+
+
+def _count(name, outcome):
+    key = f'call:cache-stats:{name}:{outcome}'
+    if not _shared_counters():
+        with _local_lock:
+            _local_counts[key] += 1
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def cached_fragment(name, key, build):
+    """
+    Return the cached string for (`name`, `key`) at the current data version,
+    calling `build()` to produce and store it on a miss.
+    """
+    cache_key = f'call:{name}:{key}:{data_version()}'
+    value = cache.get(cache_key)
+    if value is not None:
+        _count(name, 'hits')
+        return value
+    _count(name, 'misses')
+    value = build()
+    # A replica snapshot can lag the version bump; do not pin its view for long
+    timeout = settings.CALL_CACHE_TIMEOUT
+    if reading_from_replica():
+        timeout = min(timeout, settings.CALL_REPLICA_MAX_STALENESS)
+    cache.set(cache_key, value, timeout=timeout)
+    return value
+
+
+def cache_stats():
+    """{fragment: (hits, misses)} for every cached fragment, across processes only with Redis"""
+    keys = [f'call:cache-stats:{name}:{outcome}' for name in FRAGMENTS for outcome in ('hits', 'misses')]
+    if _shared_counters():
+        counts = cache.get_many(keys)
+    else:
+        with _local_lock:
+            counts = dict(_local_counts)
+    return {
+        name: (counts.get(f'call:cache-stats:{name}:hits', 0), counts.get(f'call:cache-stats:{name}:misses', 0))
+        for name in FRAGMENTS
+    }
@@ -0,0 +1,132 @@
+"""
+Per-candidate summaries, one Candidate row per normalized phone number.
+
+A summary is recomputed from that phone's own responses whenever one of them
+changes: the signal handlers in call.signals cover saves and deletes, and
+`update_call_status` covers bulk status changes. The recompute reads only the
+candidate's history through the (phone_number, created_at, id) index, so
+profile pages never aggregate over CallResponse. `rebuild_candidates`
+recomputes every summary; `refresh_candidates_in_bulk` recomputes many at
+once after bulk writes, which send no signals. Values that cannot be phone
+numbers, such as the call SIDs transcription_webhook stores in phone_number,
+get no summary.
+"""
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q
+
+from .models import Candidate, CallResponse
+
+LATEST_TRANSCRIPTS = 5
+BULK_CHUNK = 500
+E164_MAX_DIGITS = 15
+
+
+def normalize_phone(phone_number):
+    """Digits of a phone number; '' for a call SID or anything longer than E.164 allows"""
+    phone_number = (phone_number or '').strip()
+    if phone_number[:2].upper() == 'CA':
+        return ''
+    digits = ''.join(filter(str.isdigit, phone_number))
+    return digits if len(digits) <= E164_MAX_DIGITS else ''
+
+
+def _responses_for(phone):
+    return CallResponse.objects.filter(phone_number__in=[phone, f'+{phone}'])
+
+
+def refresh_candidate(phone):
+    """Recompute the summary for one normalized phone; returns it, or None if it has no responses"""
+    responses = _responses_for(phone).order_by()
+    summary = responses.aggregate(
+        response_count=Count('id'),
+        call_count=Count('call_sid', distinct=True),
+        completed_calls=Count('call_sid', distinct=True, filter=Q(call_status='completed')),
+        first_call_at=Min('created_at'),
+        last_call_at=Max('created_at'),
+    )
+    if not summary['response_count']:
+        Candidate.objects.filter(phone_number=phone).delete()
+        return None
+    latest = (
+        responses.filter(transcript__isnull=False)
+        .exclude(transcript='')
+        .order_by('-created_at', '-id')
+        .values('id', 'question', 'transcript', 'created_at')[:LATEST_TRANSCRIPTS]
+    )
+    summary['latest_transcripts'] = [
+        dict(row, created_at=row['created_at'].isoformat()) for row in latest
+    ]
+    candidate, _ = Candidate.objects.update_or_create(phone_number=phone, defaults=summary)
+    return candidate
+
+
+def refresh_candidates(phone_numbers):
+    for phone in {normalize_phone(p) for p in phone_numbers} - {''}:
+        refresh_candidate(phone)
+
+
+def refresh_candidates_on_commit(phone_numbers):
+    phone_numbers = list(phone_numbers)
+    transaction.on_commit(lambda: refresh_candidates(phone_numbers))
+
+
+def refresh_candidates_in_bulk(phone_numbers):
+    """
+    refresh_candidate for many phones, with one read and one upsert per chunk
+    of phones instead of several queries per phone.
+    """
+    phones = sorted({normalize_phone(p) for p in phone_numbers} - {''})
+    for start in range(0, len(phones), BULK_CHUNK):
+        chunk = phones[start:start + BULK_CHUNK]
+        rows = (
+            CallResponse.objects.filter(phone_number__in=chunk + [f'+{phone}' for phone in chunk])
+            .order_by('-created_at', '-id')
+            .values_list('phone_number', 'call_sid', 'call_status', 'created_at', 'id', 'question', 'transcript')
+        )
+        summaries = {}
+        for phone_number, call_sid, status, created_at, row_id, question, transcript in rows:
+            summary = summaries.setdefault(normalize_phone(phone_number), {
+                'response_count': 0, 'calls': set(), 'completed': set(),
+                'first_call_at': created_at, 'last_call_at': created_at, 'latest_transcripts': [],
+            })
+            summary['response_count'] += 1
+            summary['first_call_at'] = created_at
+            if call_sid is not None:
+                summary['calls'].add(call_sid)
+                if status == 'completed':
+                    summary['completed'].add(call_sid)
+            if transcript and len(summary['latest_transcripts']) < LATEST_TRANSCRIPTS:
+                summary['latest_transcripts'].append({
+                    'id': row_id, 'question': question, 'transcript': transcript,
+                    'created_at': created_at.isoformat(),
+                })
+        candidates = [
+            Candidate(
+                phone_number=phone,
+                call_count=len(summary.pop('calls')),
+                completed_calls=len(summary.pop('completed')),
+                **summary,
+            )
+            for phone, summary in summaries.items()
+        ]
+        with transaction.atomic():
+            Candidate.objects.bulk_create(
+                candidates, update_conflicts=True, unique_fields=['phone_number'],
+                update_fields=['call_count', 'completed_calls', 'response_count', 'first_call_at',
+                               'last_call_at', 'latest_transcripts', 'updated_at'],
+            )
+            Candidate.objects.filter(phone_number__in=set(chunk) - set(summaries)).delete()
+
+
+def rebuild_candidates():
+    """Recompute every summary and drop those without responses; returns the number kept"""
+    phones = {
+        normalize_phone(p)
+        for p in CallResponse.objects.order_by().values_list('phone_number', flat=True).distinct()
+    } - {''}
+    for phone in phones:
+        refresh_candidate(phone)
+    stale = list(set(Candidate.objects.values_list('phone_number', flat=True)) - phones)
+    for start in range(0, len(stale), 500):
+        Candidate.objects.filter(phone_number__in=stale[start:start + 500]).delete()
+    return len(phones)
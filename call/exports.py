@@ -0,0 +1,218 @@
+"""
+Constant-memory CallResponse exports.
+
+Rows are read with values_list() in keyset-paginated chunks and formatted one
+at a time, so neither model instances nor the full dataset are ever held in
+memory, and no database cursor stays open for the length of an export.
+CSV is streamed straight to the client; XLSX goes through openpyxl's
+write-only mode into a temporary file that is then streamed from disk, with
+column widths estimated from the first rows instead of a second pass.
+Parquet output, for analytics, keeps typed columns and needs pyarrow.
+"""
+import csv
+import io
+import tempfile
+from itertools import chain, islice
+
+from django.db.models import Case, Max, Min, When
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+from .pagination import iterate_keyset
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+PARQUET_AVAILABLE = pa is not None
+
+EXPORT_ORDERING = ['-created_at', '-id']
+CHUNK_SIZE = 2000
+WIDTH_SAMPLE_ROWS = 500
+MAX_COLUMN_WIDTH = 80
+CSV_FLUSH_ROWS = 500
+
+
+def _or_na(value):
+    return value or 'N/A'
+
+
+def _timestamp(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else 'N/A'
+
+
+# (header, field, formatter) in export order
+EXPORT_COLUMNS = [
+    ('Phone Number', 'phone_number', str),
+    ('Question', 'question', _or_na),
+    ('Response', 'response', _or_na),
+    ('Recording URL', 'recording_url', _or_na),
+    ('Recording Duration (seconds)', 'recording_duration', _or_na),
+    ('Transcript', 'transcript', _or_na),
+    ('Transcript Status', 'transcript_status', str),
+    ('Call SID', 'call_sid', _or_na),
+    ('Call Duration (seconds)', 'call_duration', _or_na),
+    ('Call Status', 'call_status', _or_na),
+    ('Created At', 'created_at', _timestamp),
+    ('Updated At', 'updated_at', _timestamp),
+]
+HEADERS = [header for header, _, _ in EXPORT_COLUMNS]
+
+
+def _formatted(rows, formatters):
+    for row in rows:
+        yield [format_value(value) for format_value, value in zip(formatters, row)]
+
+
+def export_rows(queryset):
+    """
+    Formatted rows of `queryset`, newest first, read lazily in chunks. The
+    database alias is fixed here, before iteration starts, so a streamed
+    response keeps reading from the replica chosen by the view after the view
+    has returned.
+    """
+    queryset = queryset.using(queryset.db)
+    fields = [field for _, field, _ in EXPORT_COLUMNS]
+    formatters = [formatter for _, _, formatter in EXPORT_COLUMNS]
+    return _formatted(iterate_keyset(queryset, EXPORT_ORDERING, fields, CHUNK_SIZE), formatters)
+
+
+def pivot_headers(questions):
+    headers = ['Call SID', 'Phone Number', 'Started At']
+    for i, question in enumerate(questions, 1):
+        headers += [f'Q{i}: {question}', f'Q{i} Recording Duration (seconds)']
+    return headers
+
+
+def _pivot_chunks(queryset, aggregates):
+    """
+    Pivoted calls in call_sid order, CHUNK_SIZE calls per GROUP BY. Each
+    chunk's upper bound comes from a short scan of distinct call_sids on the
+    index, and the aggregation then covers only that call_sid range.
+    """
+    sids = queryset.order_by('call_sid').values_list('call_sid', flat=True).distinct()
+    calls = queryset.order_by('call_sid').values('call_sid').annotate(**aggregates)
+    fields = ['call_sid', *aggregates]
+    last = None
+    while True:
+        chunk = sids if last is None else sids.filter(call_sid__gt=last)
+        bounds = list(chunk[:CHUNK_SIZE])
+        if not bounds:
+            return
+        in_range = calls.filter(call_sid__lte=bounds[-1])
+        if last is not None:
+            in_range = in_range.filter(call_sid__gt=last)
+        for row in in_range:
+            yield [row[field] for field in fields]
+        if len(bounds) < CHUNK_SIZE:
+            return
+        last = bounds[-1]
+
+
+def pivot_rows(queryset, questions):
+    """
+    One formatted row per call_sid in `queryset`, in call_sid order, with a
+    transcript and a recording duration column per question. The pivot is a
+    GROUP BY with conditional aggregates, run over one call_sid range at a
+    time so no chunk re-aggregates the whole filtered set.
+    """
+    queryset = queryset.using(queryset.db).exclude(call_sid__isnull=True).exclude(call_sid='')
+    aggregates = {'phone': Max('phone_number'), 'started_at': Min('created_at')}
+    for i, question in enumerate(questions):
+        aggregates[f'q{i}_transcript'] = Max(Case(When(question=question, then='transcript')))
+        aggregates[f'q{i}_duration'] = Max(Case(When(question=question, then='recording_duration')))
+    formatters = [str, str, _timestamp] + [_or_na, _or_na] * len(questions)
+    return _formatted(_pivot_chunks(queryset, aggregates), formatters)
+
+
+def stream_csv(rows, headers=HEADERS):
+    """CSV text chunks for `rows`, header first"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % CSV_FLUSH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def column_widths(sample, headers=HEADERS):
+    """Column widths fitting the headers and the sampled rows"""
+    widths = [len(header) for header in headers]
+    for row in sample:
+        for i, value in enumerate(row):
+            widths[i] = max(widths[i], len(str(value)))
+    return [min(width + 2, MAX_COLUMN_WIDTH) for width in widths]
+
+
+def write_csv(rows, output):
+    """Write `rows` as CSV to the text file `output`"""
+    for chunk in stream_csv(rows):
+        output.write(chunk)
+
+
+def write_xlsx(rows, output=None, sheet_title='Call Responses', headers=HEADERS):
+    """
+    Write `rows` as XLSX to `output`, by default a new temporary file that is
+    returned rewound for the caller to serve and close.
+    """
+    rows = iter(rows)
+    sample = list(islice(rows, WIDTH_SAMPLE_ROWS))
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet_title)
+    # Write-only sheets take column widths only before the first row
+    for i, width in enumerate(column_widths(sample, headers), 1):
+        worksheet.column_dimensions[get_column_letter(i)].width = width
+    worksheet.append(headers)
+    for row in chain(sample, rows):
+        worksheet.append(row)
+
+    if output is None:
+        output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+RAW_FIELDS = [
+    'id', 'phone_number', 'question', 'response', 'recording_url', 'recording_sid',
+    'recording_duration', 'transcript', 'transcript_status', 'call_sid',
+    'call_duration', 'call_status', 'created_at', 'updated_at',
+]
+
+
+def _parquet_schema():
+    timestamp = pa.timestamp('us', tz='UTC')
+    types = {
+        'id': pa.int64(), 'recording_duration': pa.int32(), 'call_duration': pa.int32(),
+        'created_at': timestamp, 'updated_at': timestamp,
+    }
+    return pa.schema([(field, types.get(field, pa.string())) for field in RAW_FIELDS])
+
+
+def raw_rows(queryset, ordering=EXPORT_ORDERING, after=None):
+    """Unformatted RAW_FIELDS tuples of `queryset`, read lazily in chunks"""
+    queryset = queryset.using(queryset.db)
+    return iterate_keyset(queryset, ordering, RAW_FIELDS, CHUNK_SIZE, after=after)
+
+
+def write_parquet(rows, output):
+    """Write raw_rows() to `output`, one row group per CHUNK_SIZE rows"""
+    schema = _parquet_schema()
+    rows = iter(rows)
+    with pq.ParquetWriter(output, schema, compression='zstd') as writer:
+        while True:
+            batch = list(islice(rows, CHUNK_SIZE))
+            if not batch:
+                break
+            columns = zip(*batch)
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema,
+            ))
@@ -0,0 +1,38 @@
+"""
+The dashboard's response filters, shared by the list views, exports and
+background export jobs.
+"""
+from datetime import datetime
+
+from django.utils import timezone
+
+FILTER_PARAMS = ('status', 'since', 'until', 'phone')
+
+
+def parse_day(value, end_of_day=False):
+    """Parse a YYYY-MM-DD filter into an aware datetime bound"""
+    try:
+        day = datetime.strptime(value, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        return None
+    if end_of_day:
+        day = day.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return timezone.make_aware(day)
+
+
+def filter_call_responses(queryset, params):
+    """Apply the dashboard's status, date range and phone number filters"""
+    status = params.get('status')
+    if status:
+        queryset = queryset.filter(call_status=status)
+    since = parse_day(params.get('since'))
+    if since:
+        queryset = queryset.filter(created_at__gte=since)
+    until = parse_day(params.get('until'), end_of_day=True)
+    if until:
+        queryset = queryset.filter(created_at__lte=until)
+    phone = ''.join(filter(str.isdigit, params.get('phone', '')))
+    if phone:
+        # Numbers are stored both with and without the leading '+'
+        queryset = queryset.filter(phone_number__in=[phone, f'+{phone}'])
+    return queryset
@@ -0,0 +1,286 @@
+"""
+Offline import of exported Twilio call, recording and transcription dumps.
+
+Each dump file holds one kind of Twilio resource, as CSV, a JSON array, JSON
+Lines or saved API list pages ({"recordings": [...], "next_page_uri": ...}),
+optionally gzipped. Files are parsed as streams, one record at a time, and
+their keys normalized, so Twilio's API (call_sid), webhook (CallSid) and
+console CSV (Call Sid) spellings all read the same; the kind of each file is
+told apart by its keys.
+
+Calls are read first into a compact per-call lookup, so recordings, which
+become CallResponse rows keyed on recording_sid like fetch_twilio_transcripts,
+carry their call's phone number, status and duration. Transcriptions then
+fill in the transcripts of the recordings that exist. Rows are written with
+`bulk_create(update_conflicts=True)` in chunks, each in its own transaction.
+Bulk writes send no signals, so `DumpImport.run` afterwards gives questions
+to the new answers in recording order, refreshes the candidates and status
+counters and bumps the cache version.
+"""
+import csv
+import gzip
+import json
+import re
+from datetime import timezone as dt_timezone
+from email.utils import parsedate_to_datetime
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .cache import bump_data_version
+from .candidates import refresh_candidates_in_bulk
+from .models import CallResponse
+from .questions import load_questions
+from .scoring import SCORE_FIELDS, get_scorer
+from .stats import rebuild_status_counts
+
+# Processed in this order whatever the order of the files
+KINDS = ('calls', 'recordings', 'transcriptions')
+CHUNK_SIZE = 5000
+SID_CHUNK = 500
+READ_SIZE = 1 << 20
+_JSON_SEPARATORS = ' \t\r\n,[]'
+_CAMEL = re.compile(r'(?<=[a-z0-9])(?=[A-Z])')
+_SPACES = re.compile(r'[\s\-]+')
+TRANSCRIPT_STATUSES = {'completed': 'completed', 'failed': 'failed'}
+
+
+def normalize_key(key):
+    """call_sid for CallSid, Call Sid or call_sid"""
+    return _SPACES.sub('_', _CAMEL.sub('_', key.strip())).lower()
+
+
+def _open(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+def _json_values(f):
+    """
+    Top-level JSON values of `f`, decoded one at a time: the items of an
+    array, the lines of JSON Lines, or whole objects such as API pages.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, eof = '', 0, False
+    while True:
+        while position < len(buffer) and buffer[position] in _JSON_SEPARATORS:
+            position += 1
+        if position < len(buffer):
+            try:
+                value, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The value runs past the buffer, unless the file has ended
+                if eof:
+                    raise
+            else:
+                yield value
+                continue
+        elif eof:
+            return
+        chunk = f.read(READ_SIZE)
+        buffer, position, eof = buffer[position:] + chunk, 0, not chunk
+
+
+def read_records(path):
+    """The records of one dump file as dicts with normalized keys"""
+    with _open(path) as f:
+        if path.endswith(('.csv', '.csv.gz')):
+            values = csv.DictReader(f)
+        else:
+            values = _json_values(f)
+        for value in values:
+            # A saved API page wraps its records in a list named after the kind
+            items = next((value[kind] for kind in KINDS if isinstance(value.get(kind), list)), [value])
+            for item in items:
+                yield {normalize_key(key): field for key, field in item.items() if key}
+
+
+def detect_kind(path):
+    """'calls', 'recordings' or 'transcriptions' from the keys of the first record, or None"""
+    keys = next(read_records(path), None)
+    if keys is None:
+        return None
+    if 'transcription_text' in keys or 'recording_sid' in keys:
+        return 'transcriptions'
+    if {'from', 'to', 'direction'} & set(keys):
+        return 'calls'
+    if 'call_sid' in keys:
+        return 'recordings'
+    return None
+
+
+def parse_date(value):
+    """Aware datetime from ISO 8601 (API v2, CSV) or RFC 2822 (API 2010) text, or None"""
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value.replace(' UTC', '+00:00'))
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    return parsed if timezone.is_aware(parsed) else parsed.replace(tzinfo=dt_timezone.utc)
+
+
+def _seconds(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _chunks(records, size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class DumpImport:
+    """
+    One import run over a set of dump files. `progress(kind, done)` is called
+    after every chunk written.
+    """
+
+    def __init__(self, chunk_size=CHUNK_SIZE, progress=None):
+        self.chunk_size = chunk_size
+        self.progress = progress or (lambda kind, done: None)
+        # call_sid -> (phone number, status, duration); a few dozen bytes per call
+        self.calls = {}
+        self.call_sids = set()
+        self.phones = set()
+        self.counts = dict.fromkeys(('calls', 'recordings', 'transcriptions', 'skipped'), 0)
+
+    def run(self, paths):
+        """Import `paths` ({path: kind}); returns the counts per kind and of skipped records"""
+        for kind in KINDS:
+            for path in [path for path, path_kind in paths.items() if path_kind == kind]:
+                getattr(self, f'_import_{kind}')(read_records(path))
+        self._assign_questions()
+        refresh_candidates_in_bulk(self.phones)
+        rebuild_status_counts()
+        bump_data_version()
+        return self.counts
+
+    def _import_calls(self, records):
+        for record in records:
+            call_sid = record.get('call_sid') or record.get('sid')
+            if not call_sid:
+                self.counts['skipped'] += 1
+                continue
+            # Interviews are inbound calls; fetch_twilio_transcripts places outbound ones
+            outbound = (record.get('direction') or '').startswith('outbound')
+            phone = record.get('to' if outbound else 'from') or ''
+            self.calls[call_sid] = (phone, record.get('status') or None, _seconds(record.get('duration')))
+            self.counts['calls'] += 1
+
+    def _import_recordings(self, records):
+        for chunk in _chunks(records, self.chunk_size):
+            # Rows whose call is not in the dump keep their stored call details
+            with_call, without_call = [], []
+            for record in chunk:
+                recording_sid = record.get('sid') or record.get('recording_sid')
+                call_sid = record.get('call_sid')
+                if not recording_sid:
+                    self.counts['skipped'] += 1
+                    continue
+                row = CallResponse(
+                    recording_sid=recording_sid,
+                    call_sid=call_sid,
+                    phone_number='',
+                    recording_url=record.get('media_url') or record.get('uri') or None,
+                    recording_duration=_seconds(record.get('duration')),
+                    created_at=parse_date(record.get('start_time') or record.get('date_created')) or timezone.now(),
+                )
+                if call_sid in self.calls:
+                    row.phone_number, row.call_status, row.call_duration = self.calls[call_sid]
+                    self.phones.add(row.phone_number)
+                    with_call.append(row)
+                else:
+                    without_call.append(row)
+                if call_sid:
+                    self.call_sids.add(call_sid)
+
+            fields = ['call_sid', 'recording_url', 'recording_duration', 'updated_at']
+            with transaction.atomic():
+                self._upsert(with_call, fields + ['phone_number', 'call_status', 'call_duration'])
+                self._upsert(without_call, fields)
+            self.counts['recordings'] += len(with_call) + len(without_call)
+            self.progress('recordings', self.counts['recordings'])
+
+    def _import_transcriptions(self, records):
+        scorer = get_scorer()
+        for chunk in _chunks(records, self.chunk_size):
+            texts = {}
+            for record in chunk:
+                if record.get('recording_sid'):
+                    status = TRANSCRIPT_STATUSES.get(record.get('status'), 'pending')
+                    texts[record['recording_sid']] = (record.get('transcription_text') or None, status)
+            # Only recordings that exist: a transcription alone makes no response
+            sids = list(texts)
+            existing = {}
+            for start in range(0, len(sids), SID_CHUNK):
+                existing.update(
+                    CallResponse.objects.filter(recording_sid__in=sids[start:start + SID_CHUNK])
+                    .values_list('recording_sid', 'phone_number')
+                )
+            # Their candidates' latest transcripts change too
+            self.phones.update(existing.values())
+            rows = []
+            for recording_sid in existing:
+                transcript, status = texts[recording_sid]
+                row = CallResponse(recording_sid=recording_sid, phone_number='',
+                                   transcript=transcript, transcript_status=status)
+                for field, value in scorer.fields(transcript).items():
+                    setattr(row, field, value)
+                rows.append(row)
+            with transaction.atomic():
+                self._upsert(rows, ['transcript', 'transcript_status', *SCORE_FIELDS, 'updated_at'])
+            self.counts['transcriptions'] += len(rows)
+            self.counts['skipped'] += len(chunk) - len(rows)
+            if rows:
+                self.progress('transcriptions', self.counts['transcriptions'])
+
+    def _upsert(self, rows, update_fields):
+        if rows:
+            CallResponse.objects.bulk_create(
+                rows, batch_size=SID_CHUNK, update_conflicts=True,
+                unique_fields=['recording_sid'], update_fields=update_fields,
+            )
+
+    def _assign_questions(self):
+        """
+        Give unanswered questions to imported responses without one, by
+        recording order within each call: voice() records one answer per
+        question, in order.
+        """
+        questions = load_questions()
+        call_sids = sorted(self.call_sids)
+        for start in range(0, len(call_sids), SID_CHUNK):
+            rows = (
+                CallResponse.objects.filter(call_sid__in=call_sids[start:start + SID_CHUNK])
+                .order_by('call_sid', 'created_at', 'id')
+                .values_list('call_sid', 'id', 'question', 'phone_number')
+            )
+            by_question = {}
+            position, previous = 0, None
+            for call_sid, row_id, question, phone_number in rows:
+                position = position + 1 if call_sid == previous else 0
+                previous = call_sid
+                if question is None and position < len(questions):
+                    by_question.setdefault(questions[position], []).append(row_id)
+                    self.phones.add(phone_number)
+            # update() skips auto_now; a new question is a change like any other
+            now = timezone.now()
+            with transaction.atomic():
+                for question, ids in by_question.items():
+                    CallResponse.objects.filter(id__in=ids).update(question=question, updated_at=now)
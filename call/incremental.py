@@ -0,0 +1,201 @@
+"""
+Incremental CallResponse exports.
+
+An export directory holds a base part, delta parts and manifest.json. Each run
+appends a delta with the rows whose (updated_at, id) sorts after the
+manifest's watermark, so the cost follows the number of changed rows rather
+than the table size. Consumers rebuild the current data by reading the base
+and then every delta in order, keeping the last version of each id.
+
+Deletes leave no trace in a delta; `rebase` re-exports the table to drop
+them. `compact` merges the base and deltas into a new base, reading the parts
+newest first and keeping the first version of each id it meets.
+"""
+import csv
+import json
+import os
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .exports import RAW_FIELDS, raw_rows, write_parquet
+from .models import CallResponse
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+MANIFEST = 'manifest.json'
+WATERMARK_ORDERING = ['updated_at', 'id']
+_ID = RAW_FIELDS.index('id')
+_UPDATED_AT = RAW_FIELDS.index('updated_at')
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class IncrementalExport:
+    def __init__(self, directory, fmt=None):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST)
+        self.manifest = self._load() or self._empty_manifest(fmt or 'csv')
+        if fmt and self.manifest['format'] != fmt:
+            raise ValueError(
+                f"{directory} holds a {self.manifest['format']} export; "
+                f"use --full to restart it as {fmt}"
+            )
+
+    @staticmethod
+    def _empty_manifest(fmt):
+        return {
+            'format': fmt,
+            'fields': RAW_FIELDS,
+            'sequence': 0,
+            'watermark': None,
+            'base': None,
+            'deltas': [],
+        }
+
+    @property
+    def format(self):
+        return self.manifest['format']
+
+    def _load(self):
+        if not os.path.exists(self.manifest_path):
+            return None
+        with open(self.manifest_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save(self):
+        partial = f'{self.manifest_path}.part'
+        with open(partial, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(partial, self.manifest_path)
+
+    def _watermark(self):
+        if not self.manifest['watermark']:
+            return None
+        updated_at, row_id = self.manifest['watermark']
+        return [parse_datetime(updated_at), row_id]
+
+    def _next_path(self, kind):
+        self.manifest['sequence'] += 1
+        name = f"{kind}-{self.manifest['sequence']:06d}.{self.format}"
+        return name, os.path.join(self.directory, name)
+
+    def _write(self, rows, path):
+        """Write raw rows to `path`; returns (row count, last row)"""
+        state = {'count': 0, 'last': None}
+
+        def counted():
+            for row in rows:
+                state['count'] += 1
+                state['last'] = row
+                yield row
+
+        partial = f'{path}.part'
+        if self.format == 'parquet':
+            write_parquet(counted(), partial)
+        else:
+            with open(partial, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(RAW_FIELDS)
+                for row in counted():
+                    writer.writerow([_csv_value(value) for value in row])
+        os.replace(partial, path)
+        return state['count'], state['last']
+
+    def _read(self, name):
+        """Rows of a part file as tuples (CSV values come back as strings)"""
+        path = os.path.join(self.directory, name)
+        if self.format == 'parquet':
+            for batch in pq.ParquetFile(path).iter_batches():
+                yield from zip(*(column.to_pylist() for column in batch.columns))
+        else:
+            with open(path, newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                next(reader)
+                yield from reader
+
+    def _part(self, name, count, since, until):
+        return {
+            'file': name,
+            'rows': count,
+            'since': since,
+            'until': until,
+            'created_at': timezone.now().isoformat(),
+        }
+
+    def export_changes(self, lag_seconds=5):
+        """
+        Write the rows changed since the watermark to a new delta (the base on
+        the first run). Rows updated in the last `lag_seconds` wait for the next
+        run, so a transaction still committing cannot slip under the watermark.
+        Returns the manifest entry, or None if nothing changed.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        cutoff = timezone.now() - timedelta(seconds=lag_seconds)
+        queryset = CallResponse.objects.filter(updated_at__lte=cutoff)
+        since = self.manifest['watermark']
+        kind = 'delta' if self.manifest['base'] else 'base'
+        name, path = self._next_path(kind)
+        count, last = self._write(raw_rows(queryset, WATERMARK_ORDERING, after=self._watermark()), path)
+        if not count:
+            os.remove(path)
+            self.manifest['sequence'] -= 1
+            return None
+        until = [last[_UPDATED_AT].isoformat(), last[_ID]]
+        entry = self._part(name, count, since, until)
+        if kind == 'base':
+            self.manifest['base'] = entry
+        else:
+            self.manifest['deltas'].append(entry)
+        self.manifest['watermark'] = until
+        self._save()
+        return entry
+
+    def compact(self):
+        """Merge the base and every delta into a new base; returns its manifest entry"""
+        if not self.manifest['deltas']:
+            return self.manifest['base']
+        parts = [self.manifest['base']] + self.manifest['deltas']
+        seen = set()
+
+        def latest_versions():
+            for part in reversed(parts):
+                for row in self._read(part['file']):
+                    row_id = int(row[_ID])
+                    if row_id not in seen:
+                        seen.add(row_id)
+                        yield row
+
+        name, path = self._next_path('base')
+        count, _ = self._write(latest_versions(), path)
+        entry = self._part(name, count, None, self.manifest['watermark'])
+        self.manifest['base'] = entry
+        self.manifest['deltas'] = []
+        self._save()
+        for part in parts:
+            os.remove(os.path.join(self.directory, part['file']))
+        return entry
+
+    def rebase(self, fmt=None):
+        """Drop every part so the next run starts again from a full export"""
+        parts = [self.manifest['base']] + self.manifest['deltas'] if self.manifest['base'] else []
+        sequence = self.manifest['sequence']
+        self.manifest = self._empty_manifest(fmt or self.format)
+        # Keep numbering parts upwards so a consumer never sees a name reused
+        self.manifest['sequence'] = sequence
+        os.makedirs(self.directory, exist_ok=True)
+        self._save()
+        for part in parts:
+            path = os.path.join(self.directory, part['file'])
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,21 @@
+"""
+Jinja2 environment for the templates under call/jinja2/.
+
+Only the hot templates (dashboard rows, response page) have Jinja2 versions;
+they mirror their Django twins in call/templates/ and must be kept in step.
+The `date` filter applies Django's formats and local time so both engines
+produce identical markup.
+"""
+from django.template.defaultfilters import date as date_filter
+from django.utils.timezone import template_localtime
+from jinja2 import Environment
+
+
+def _date(value, arg=None):
+    return date_filter(template_localtime(value), arg)
+
+
+def environment(**options):
+    env = Environment(**options)
+    env.filters['date'] = _date
+    return env
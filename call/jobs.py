@@ -0,0 +1,235 @@
+"""
+Background export jobs.
+
+`submit_export` records an ExportJob and hands it to a small thread pool in the
+web process (CALL_EXPORT_WORKERS threads; 0 leaves every job to `manage.py
+run_export_jobs`). Whichever worker claims a queued job first builds the file
+under CALL_EXPORT_DIR, reporting progress as it goes. A job's cache_key covers
+its format, its filters and a fingerprint of the matching rows, so submitting
+the same export against unchanged data returns the existing artifact, or the
+job still building it. A queued or running job without progress for
+CALL_EXPORT_STALE_MINUTES lost its thread to a restart or deploy; submitting
+it again requeues it instead of returning the dead job.
+
+The in-process workers also do the housekeeping of `run_export_jobs`: before a
+job, at most once per HOUSEKEEPING_SECONDS, a worker requeues (and runs again)
+abandoned jobs and purges those finished more than CALL_EXPORT_KEEP_DAYS ago.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .exports import (PARQUET_AVAILABLE, export_rows, raw_rows, write_csv,
+                      write_parquet, write_xlsx)
+from .filters import FILTER_PARAMS, filter_call_responses
+from .models import CallResponse, ExportJob
+
+logger = logging.getLogger(__name__)
+
+# format: (file extension, content type)
+FORMATS = {
+    'csv': ('.csv', 'text/csv; charset=utf-8'),
+    'xlsx': ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+PROGRESS_EVERY = 2000
+HOUSEKEEPING_SECONDS = 300
+
+_executor = None
+_executor_lock = threading.Lock()
+_last_housekeeping = None
+
+
+def available_formats():
+    return [fmt for fmt in FORMATS if fmt != 'parquet' or PARQUET_AVAILABLE]
+
+
+def _matching(params):
+    return filter_call_responses(CallResponse.objects.all(), params)
+
+
+def data_fingerprint(params):
+    """Changes whenever a row matching `params` is added, updated or deleted"""
+    summary = _matching(params).order_by().aggregate(
+        rows=Count('id'), last_update=Max('updated_at'), last_id=Max('id'),
+    )
+    last_update = summary['last_update'].isoformat() if summary['last_update'] else ''
+    return f"{summary['rows']}:{last_update}:{summary['last_id']}"
+
+
+def _cache_key(fmt, params):
+    payload = json.dumps([fmt, params, data_fingerprint(params)], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def submit_export(fmt, params):
+    """Queue an export of the responses matching `params`; returns (job, reused)"""
+    params = {key: params[key] for key in FILTER_PARAMS if params.get(key)}
+    cache_key = _cache_key(fmt, params)
+    existing = (
+        ExportJob.objects.filter(cache_key=cache_key)
+        .exclude(status='failed')
+        .order_by('-created_at')
+        .first()
+    )
+    if existing and existing.status == 'done' and os.path.exists(existing.file_path):
+        return existing, True
+    if existing and existing.status in ('queued', 'running'):
+        if existing.updated_at >= _stale_cutoff():
+            return existing, True
+        # No progress for too long: its worker thread went away with a restart
+        # or deploy. Take the job over unless another request just did.
+        taken_over = ExportJob.objects.filter(id=existing.id, updated_at=existing.updated_at).update(
+            status='queued', rows_written=0, updated_at=timezone.now(),
+        )
+        if taken_over:
+            logger.warning(f"Requeued stale export job {existing.id}")
+            _schedule(existing.id)
+        existing.refresh_from_db()
+        return existing, True
+    job = ExportJob.objects.create(format=fmt, params=params, cache_key=cache_key)
+    _schedule(job.id)
+    return job, False
+
+
+def _stale_cutoff(minutes=None):
+    return timezone.now() - timedelta(minutes=minutes or settings.CALL_EXPORT_STALE_MINUTES)
+
+
+def _schedule(job_id):
+    if settings.CALL_EXPORT_WORKERS > 0:
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_thread, job_id))
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.CALL_EXPORT_WORKERS, thread_name_prefix='call-export',
+            )
+        return _executor
+
+
+def _housekeep():
+    """Requeue abandoned jobs and purge expired ones, at most once per HOUSEKEEPING_SECONDS"""
+    global _last_housekeeping
+    with _executor_lock:
+        now = time.monotonic()
+        if _last_housekeeping is not None and now - _last_housekeeping < HOUSEKEEPING_SECONDS:
+            return
+        _last_housekeeping = now
+    try:
+        requeued = requeue_stale_jobs()
+        if requeued:
+            logger.warning(f"Requeued {requeued} stale export jobs")
+            queued = ExportJob.objects.filter(status='queued').order_by('created_at').values_list('id', flat=True)
+            for job_id in queued:
+                _get_executor().submit(_run_in_thread, job_id)
+        purge_expired_jobs(settings.CALL_EXPORT_KEEP_DAYS)
+    except Exception as e:
+        logger.error(f"Export job housekeeping failed: {str(e)}")
+
+
+def _run_in_thread(job_id):
+    try:
+        _housekeep()
+        run_export_job(job_id)
+    finally:
+        # Worker threads own their connection; do not leave it open between jobs
+        connection.close()
+
+
+def _track(rows, job_id):
+    """Pass `rows` through, recording the running count on the job"""
+    count = 0
+    for row in rows:
+        yield row
+        count += 1
+        if count % PROGRESS_EVERY == 0:
+            ExportJob.objects.filter(id=job_id).update(rows_written=count, updated_at=timezone.now())
+
+
+def run_export_job(job_id):
+    """Build the file for a queued job; returns False if another worker claimed it first"""
+    now = timezone.now()
+    claimed = ExportJob.objects.filter(id=job_id, status='queued').update(
+        status='running', started_at=now, updated_at=now,
+    )
+    if not claimed:
+        return False
+
+    job = ExportJob.objects.get(id=job_id)
+    extension, _ = FORMATS[job.format]
+    os.makedirs(settings.CALL_EXPORT_DIR, exist_ok=True)
+    path = os.path.join(settings.CALL_EXPORT_DIR, f'export-{job.id}{extension}')
+    # A stalled run may still be writing after the job was taken over, so each
+    # run writes its own partial file and only the current claim (started_at)
+    # finishes the job
+    partial = f'{path}.{os.getpid()}-{threading.get_ident()}.part'
+    claim = ExportJob.objects.filter(id=job.id, started_at=now)
+    try:
+        queryset = _matching(job.params)
+        total = queryset.count()
+        ExportJob.objects.filter(id=job.id).update(rows_total=total, updated_at=timezone.now())
+        if job.format == 'parquet':
+            write_parquet(_track(raw_rows(queryset), job.id), partial)
+        elif job.format == 'xlsx':
+            with open(partial, 'wb') as output:
+                write_xlsx(_track(export_rows(queryset), job.id), output)
+        else:
+            with open(partial, 'w', newline='', encoding='utf-8') as output:
+                write_csv(_track(export_rows(queryset), job.id), output)
+        os.replace(partial, path)
+        claim.update(
+            status='done', rows_written=total, file_path=path, file_size=os.path.getsize(path),
+            finished_at=timezone.now(), updated_at=timezone.now(),
+        )
+        logger.info(f"Export job {job.id} wrote {total} rows to {path}")
+    except Exception as e:
+        logger.error(f"Export job {job.id} failed: {str(e)}")
+        if os.path.exists(partial):
+            os.remove(partial)
+        claim.update(
+            status='failed', error=str(e), finished_at=timezone.now(), updated_at=timezone.now(),
+        )
+    return True
+
+
+def requeue_stale_jobs(minutes=None):
+    """Queue again running jobs that reported no progress for `minutes` (their worker died)"""
+    return ExportJob.objects.filter(status='running', updated_at__lt=_stale_cutoff(minutes)).update(
+        status='queued', rows_written=0, updated_at=timezone.now(),
+    )
+
+
+def run_queued_jobs():
+    """Run every queued job in submission order; returns how many this process ran"""
+    ran = 0
+    queued = list(ExportJob.objects.filter(status='queued').order_by('created_at').values_list('id', flat=True))
+    for job_id in queued:
+        ran += run_export_job(job_id)
+    return ran
+
+
+def purge_expired_jobs(days):
+    """Delete jobs finished more than `days` ago together with their files"""
+    cutoff = timezone.now() - timedelta(days=days)
+    expired = ExportJob.objects.filter(status__in=['done', 'failed'], finished_at__lt=cutoff)
+    for path in expired.exclude(file_path='').values_list('file_path', flat=True):
+        # Another process may be purging the same job
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    return expired.delete()[0]
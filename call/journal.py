@@ -0,0 +1,186 @@
+"""
+Append-only journal of the raw Twilio webhook events.
+
+Every hit on a journaled view is appended to a binary segment file as
+
+    timestamp (float64) | route code (uint8) | CallSid length (uint16) |
+    payload length (uint32) | CallSid bytes | compact JSON payload
+
+Each worker process writes its own segments and starts a new one when the
+current file reaches CALL_JOURNAL_SEGMENT_BYTES, so writers never contend on a
+file. `JournalReader` memory-maps the segments and walks the records in place,
+so scanning millions of events never loads them into memory, and CallSid/route
+filters are applied before any payload is decoded.
+
+Payloads hold the request's GET and POST parameters, the milliseconds the view
+took ('ms') and the CALL_DEPLOYMENT that served it ('deploy').
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import namedtuple
+from functools import wraps
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+ROUTES = ('answer', 'voice', 'recording_status', 'transcription_webhook')
+_ROUTE_CODES = {route: code for code, route in enumerate(ROUTES)}
+
+MAGIC = b'CJRNL01\n'
+_RECORD = struct.Struct('<dBHI')
+
+
+class Event(namedtuple('Event', 'timestamp route call_sid raw_payload')):
+    __slots__ = ()
+
+    @property
+    def payload(self):
+        return json.loads(self.raw_payload) if self.raw_payload else {}
+
+
+class JournalWriter:
+    """Per-process writer that rotates segment files by size"""
+
+    def __init__(self, directory, segment_bytes):
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self._pid = None
+
+    def _segment(self):
+        # A forked worker must not keep writing to its parent's segment
+        if self._file is None or self._pid != os.getpid() or self._size >= self.segment_bytes:
+            if self._file is not None and self._pid == os.getpid():
+                self._file.close()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._pid = os.getpid()
+            path = self.directory / f'events-{time.time_ns():020d}-{self._pid}.seg'
+            self._file = open(path, 'ab')
+            self._file.write(MAGIC)
+            self._size = len(MAGIC)
+        return self._file
+
+    def append(self, timestamp, route, call_sid, payload):
+        sid = (call_sid or '').encode('utf-8')
+        data = json.dumps(payload, separators=(',', ':')).encode('utf-8') if payload else b''
+        record = _RECORD.pack(timestamp, _ROUTE_CODES[route], len(sid), len(data)) + sid + data
+        with self._lock:
+            f = self._segment()
+            f.write(record)
+            f.flush()
+            self._size += len(record)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class JournalReader:
+    """Memory-mapped iterator over the journal segments"""
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory or settings.CALL_JOURNAL_DIR)
+
+    def segments(self):
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob('events-*.seg'))
+
+    def events(self, call_sid=None, route=None, since=None):
+        """
+        Yield events segment by segment in the order they were written.
+
+        Events from different worker processes interleave across segments, so
+        sort the result by timestamp when a strict global order matters.
+        """
+        wanted_sid = call_sid.encode('utf-8') if call_sid is not None else None
+        wanted_route = _ROUTE_CODES[route] if route is not None else None
+        for path in self.segments():
+            if os.path.getsize(path) <= len(MAGIC):
+                continue
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                if m[:len(MAGIC)] != MAGIC:
+                    logger.warning(f"Skipping journal segment with bad header: {path}")
+                    continue
+                yield from self._scan(m, wanted_sid, wanted_route, since)
+
+    def _scan(self, m, wanted_sid, wanted_route, since):
+        end = len(m)
+        offset = len(MAGIC)
+        while offset + _RECORD.size <= end:
+            timestamp, code, sid_len, data_len = _RECORD.unpack_from(m, offset)
+            sid_start = offset + _RECORD.size
+            data_start = sid_start + sid_len
+            next_offset = data_start + data_len
+            if next_offset > end:
+                # Torn tail of a segment that is still being written
+                return
+            offset = next_offset
+            if wanted_route is not None and code != wanted_route:
+                continue
+            if since is not None and timestamp < since:
+                continue
+            if wanted_sid is not None and m[sid_start:data_start] != wanted_sid:
+                continue
+            yield Event(
+                timestamp,
+                ROUTES[code],
+                m[sid_start:data_start].decode('utf-8'),
+                m[data_start:next_offset],
+            )
+
+    def timeline(self, call_sid):
+        """All events for one call in arrival order"""
+        return sorted(self.events(call_sid=call_sid), key=lambda event: event.timestamp)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = JournalWriter(settings.CALL_JOURNAL_DIR, settings.CALL_JOURNAL_SEGMENT_BYTES)
+    return _writer
+
+
+def journaled(route):
+    """Decorator: append every request the webhook view receives to the journal"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            arrived = time.time()
+            started = time.perf_counter()
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                try:
+                    # Server time and deployment let call.latency split each
+                    # turn's dead air between this app and Twilio
+                    payload = {
+                        'ms': round((time.perf_counter() - started) * 1000, 1),
+                        'deploy': settings.CALL_DEPLOYMENT,
+                    }
+                    if request.GET:
+                        payload['GET'] = request.GET.dict()
+                    if request.POST:
+                        payload['POST'] = request.POST.dict()
+                    get_writer().append(arrived, route, request.POST.get('CallSid', ''), payload)
+                except Exception as e:
+                    logger.error(f"Failed to journal {route} event: {e}")
+        return wrapper
+    return decorator
@@ -0,0 +1,153 @@
+"""
+Caller-perceived latency per interview turn, derived from the webhook journal.
+
+voice?q=N asks question N and records the answer with action voice?q=N+1,
+so the arrival of q=N+1 marks the end of answer N as Twilio saw it. For each
+such turn:
+
+- server_ms: how long this app took to answer that webhook;
+- hop_ms: Twilio's round trip for the call, measured on its pure <Redirect>
+  from /answer/ to voice?q=0 (response sent -> redirected request arrives);
+- dead_air_ms: what the candidate hears between finishing an answer and the
+  next question: the <Record> silence timeout that ends the answer, one
+  Twilio round trip and server_ms;
+- turn_ms and recording_ms: prompt sent -> answer posted, and the recorded
+  answer length Twilio reports, for breaking turns down further.
+
+`update_turn_latency` re-reads the journal from an hour before its watermark,
+so turns whose events span two runs are still paired, and upserts the turns
+on (call_sid, step).
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.utils import timezone
+
+from .journal import JournalReader
+from .models import RollupWatermark, TurnLatency
+from .questions import load_questions
+
+WATERMARK = 'turn-latency'
+RESCAN_SECONDS = 3600
+# voice() leaves <Record timeout> at Twilio's default: an answer ends after
+# this much silence
+RECORD_TIMEOUT_MS = 5000
+METRICS = ['dead_air_ms', 'server_ms', 'hop_ms']
+PERCENTILES = [50, 95]
+WRITE_BATCH = 500
+
+
+def _step(payload):
+    try:
+        return int(payload.get('GET', {}).get('q'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _recording_ms(payload):
+    try:
+        return int(float(payload['POST']['RecordingDuration']) * 1000)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def call_turns(call_sid, events):
+    """TurnLatency rows for one call's (timestamp, route, payload) events in arrival order"""
+    answer = hop = None
+    prompts = {}
+    turns = {}
+    for timestamp, route, payload in events:
+        ms = payload.get('ms')
+        if ms is None:
+            # Journaled before server times were recorded
+            continue
+        if route == 'answer':
+            answer = (timestamp, ms)
+            continue
+        step = _step(payload)
+        if step is None:
+            continue
+        if step == 0 and answer is not None:
+            hop = max(0.0, (timestamp - answer[0]) * 1000 - answer[1])
+        if step - 1 >= 1 and step - 1 in prompts:
+            prompt_at, prompt_ms = prompts[step - 1]
+            turns[step - 1] = TurnLatency(
+                call_sid=call_sid,
+                step=step - 1,
+                deployment=payload.get('deploy', ''),
+                answered_at=datetime.fromtimestamp(timestamp, tz=dt_timezone.utc),
+                server_ms=round(ms),
+                hop_ms=round(hop) if hop is not None else None,
+                recording_ms=_recording_ms(payload),
+                turn_ms=round((timestamp - prompt_at) * 1000 - prompt_ms),
+                dead_air_ms=round(RECORD_TIMEOUT_MS + hop + ms) if hop is not None else None,
+            )
+        prompts[step] = (timestamp, ms)
+    return list(turns.values())
+
+
+def update_turn_latency(since=None, directory=None):
+    """
+    Derive the turns journaled since the watermark (or the `since` timestamp)
+    and upsert them; returns (calls, turns).
+    """
+    watermark, _ = RollupWatermark.objects.get_or_create(name=WATERMARK)
+    if since is None and watermark.updated_at:
+        since = watermark.updated_at.timestamp() - RESCAN_SECONDS
+
+    calls = defaultdict(list)
+    newest = None
+    for event in JournalReader(directory).events(since=since):
+        newest = max(newest or event.timestamp, event.timestamp)
+        if event.call_sid and event.route in ('answer', 'voice'):
+            calls[event.call_sid].append((event.timestamp, event.route, event.payload))
+
+    turns = []
+    for call_sid, events in calls.items():
+        # Segments from different workers interleave; restore arrival order
+        events.sort(key=lambda event: event[0])
+        turns += call_turns(call_sid, events)
+    for start in range(0, len(turns), WRITE_BATCH):
+        TurnLatency.objects.bulk_create(
+            turns[start:start + WRITE_BATCH], update_conflicts=True, unique_fields=['call_sid', 'step'],
+            update_fields=['deployment', 'answered_at', 'server_ms', 'hop_ms', 'recording_ms', 'turn_ms', 'dead_air_ms'],
+        )
+
+    if newest is not None:
+        watermark.updated_at = datetime.fromtimestamp(newest, tz=dt_timezone.utc)
+        watermark.save()
+    return len(calls), len(turns)
+
+
+def _summarize(groups):
+    summaries = []
+    for key, rows in groups.items():
+        values = np.array(rows, dtype=np.float64)
+        summary = {'key': key, 'turns': len(rows)}
+        for i, metric in enumerate(METRICS):
+            column = values[:, i]
+            column = column[~np.isnan(column)]
+            for p, value in zip(PERCENTILES, np.percentile(column, PERCENTILES) if len(column) else [None] * 2):
+                summary[f'{metric}_p{p}'] = round(float(value)) if value is not None else None
+        summaries.append(summary)
+    return summaries
+
+
+def latency_report(days=7):
+    """p50/p95 of dead air, server time and Twilio hop per question and per deployment"""
+    since = timezone.now() - timedelta(days=days)
+    rows = TurnLatency.objects.filter(answered_at__gte=since).values_list('step', 'deployment', *METRICS)
+    by_step, by_deployment = defaultdict(list), defaultdict(list)
+    for step, deployment, *values in rows.iterator(chunk_size=5000):
+        values = [np.nan if value is None else value for value in values]
+        by_step[step].append(values)
+        by_deployment[deployment or 'unknown'].append(values)
+
+    questions = load_questions()
+    steps = sorted(_summarize(by_step), key=lambda summary: summary['key'])
+    for summary in steps:
+        step = summary['key']
+        summary['question'] = questions[step - 1] if 0 < step <= len(questions) else ''
+    deployments = sorted(_summarize(by_deployment), key=lambda summary: summary['key'])
+    return {'questions': steps, 'deployments': deployments}
@@ -0,0 +1,148 @@
+"""
+Change feed behind the live dashboard stream.
+
+One background thread per process polls CallResponse for rows changed since the
+last poll, ordered by (updated_at, id), and keeps the most recent changes in a
+ring buffer. Connected dashboards are served from that buffer, so the database
+sees one small query per poll interval no matter how many tabs are open. A
+client whose cursor is older than the buffer gets a single catch-up query, or a
+reset if it is too far behind.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import CallResponse
+from .pagination import seek_filter
+
+logger = logging.getLogger(__name__)
+
+DELTA_FIELDS = [
+    'id', 'phone_number', 'question', 'call_status', 'recording_url',
+    'recording_duration', 'transcript_status', 'keyword_score', 'keyword_hits',
+    'created_at', 'updated_at',
+]
+
+# Rows whose transaction commits late can carry an updated_at slightly older
+# than changes already seen; every poll also re-reads the last few seconds and
+# drops what was already delivered.
+_OVERLAP_SECONDS = 2.0
+
+
+def _key(row):
+    return (row['updated_at'], row['id'])
+
+
+def _sortable(key):
+    # An empty table has no updated_at yet; it sorts before everything
+    return (key[0] is not None, key[0] or 0, key[1])
+
+
+class ChangeFeed:
+    """Process-wide ring buffer of recent CallResponse changes"""
+
+    def __init__(self, interval, buffer_size):
+        self.interval = interval
+        self._changes = deque(maxlen=buffer_size)
+        self._delivered = {}
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._head = None
+        # Changes at or before this key may be missing from the buffer
+        self._floor = None
+        self.version = 0
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='call-live-feed', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning(f"Live feed poll failed: {e}")
+            finally:
+                close_old_connections()
+            time.sleep(self.interval)
+
+    def poll(self):
+        queryset = CallResponse.objects.order_by('updated_at', 'id').values(*DELTA_FIELDS)
+        if self._head is None:
+            latest = queryset.reverse().first()
+            with self._lock:
+                self._head = _key(latest) if latest else (None, 0)
+                self._floor = self._head
+            return
+        if self._head[0] is not None:
+            queryset = queryset.filter(
+                seek_filter(['updated_at', 'id'], self._head)
+                | Q(updated_at__gte=timezone.now() - timedelta(seconds=_OVERLAP_SECONDS))
+            )
+        rows = list(queryset[:1000])
+        fresh = [row for row in rows if self._delivered.get(row['id']) != row['updated_at']]
+        if not fresh:
+            return
+        with self._lock:
+            for row in fresh:
+                if len(self._changes) == self._changes.maxlen:
+                    self._floor = max(self._floor, _key(self._changes[0]), key=_sortable)
+                self._changes.append(row)
+                self._delivered[row['id']] = row['updated_at']
+            if len(self._delivered) > 4 * self._changes.maxlen:
+                kept = {row['id'] for row in self._changes}
+                self._delivered = {k: v for k, v in self._delivered.items() if k in kept}
+            self._head = max([self._head] + [_key(row) for row in fresh], key=_sortable)
+            self.version += 1
+
+    def changes_since(self, cursor):
+        """
+        Rows changed after `cursor` ((updated_at, id)) from the buffer.
+
+        Returns None when the buffer may not hold every change after `cursor`.
+        """
+        cursor = tuple(cursor)
+        with self._lock:
+            if self._floor is None or _sortable(cursor) < _sortable(self._floor):
+                return None
+            return sorted(
+                (row for row in self._changes if _key(row) > cursor),
+                key=_key,
+            )
+
+
+def catch_up(cursor, limit=500):
+    """One-off query for a client that connects with an old cursor"""
+    ordering = ['updated_at', 'id']
+    rows = list(
+        CallResponse.objects.filter(seek_filter(ordering, cursor))
+        .order_by(*ordering)
+        .values(*DELTA_FIELDS)[:limit + 1]
+    )
+    if len(rows) > limit:
+        return None
+    return rows
+
+
+_feed = None
+_feed_lock = threading.Lock()
+
+
+def get_feed():
+    global _feed
+    if _feed is None:
+        with _feed_lock:
+            if _feed is None:
+                _feed = ChangeFeed(settings.CALL_LIVE_POLL_INTERVAL, settings.CALL_LIVE_BUFFER_SIZE)
+    _feed.start()
+    return _feed
@@ -0,0 +1,86 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from call.audio import FEATURE_FIELDS, analyze_batch, recording_path
+from call.models import CallResponse, RecordingFeatures
+from call.pagination import iterate_keyset
+import os
+import time
+
+class Command(BaseCommand):
+    help = 'Extract audio features from downloaded recordings, skipping those already analyzed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=settings.CALL_RECORDINGS_DIR,
+                            help='Directory holding <recording_sid>.wav or .mp3 files')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Decoding processes (1 analyzes in this process)')
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Recordings per worker task and per bulk write')
+        parser.add_argument('--retry-failed', action='store_true',
+                            help='Also analyze again recordings that failed to decode')
+        parser.add_argument('--all', action='store_true',
+                            help='Analyze every recording again')
+
+    def handle(self, *args, **options):
+        queryset = CallResponse.objects.exclude(recording_sid__isnull=True).exclude(recording_sid='')
+        if options['retry_failed']:
+            queryset = queryset.exclude(audio_features__error='')
+        elif not options['all']:
+            queryset = queryset.filter(audio_features__isnull=True)
+
+        self.missing = 0
+        batches = self._batches(queryset, options['dir'], options['batch_size'])
+        start = time.perf_counter()
+        analyzed = failed = 0
+        if options['workers'] > 1:
+            with ProcessPoolExecutor(options['workers']) as pool:
+                # A bounded window of batches in flight keeps every worker busy
+                # without listing the whole table ahead of the writes
+                pending = deque()
+                for batch in batches:
+                    pending.append(pool.submit(analyze_batch, batch))
+                    if len(pending) >= 2 * options['workers']:
+                        analyzed, failed = self._save(pending.popleft().result(), analyzed, failed)
+                while pending:
+                    analyzed, failed = self._save(pending.popleft().result(), analyzed, failed)
+        else:
+            for batch in batches:
+                analyzed, failed = self._save(analyze_batch(batch), analyzed, failed)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Analyzed {analyzed} recordings ({failed} failed) in {elapsed:.2f}s, "
+            f"{self.missing} not downloaded yet"
+        ))
+
+    def _batches(self, queryset, directory, size):
+        """Lists of (response id, file path) for the recordings found in `directory`"""
+        rows = iterate_keyset(queryset, ['id'], ['id', 'recording_sid'], 2000)
+        batch = []
+        for response_id, recording_sid in rows:
+            path = recording_path(directory, recording_sid)
+            if path is None:
+                self.missing += 1
+                continue
+            batch.append((response_id, path))
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _save(self, results, analyzed, failed):
+        """Upsert one batch of results; returns the updated (analyzed, failed) totals"""
+        now = timezone.now()
+        features = [
+            RecordingFeatures(response_id=response_id, error=error, analyzed_at=now, **(values or {}))
+            for response_id, values, error in results
+        ]
+        RecordingFeatures.objects.bulk_create(
+            features, update_conflicts=True, unique_fields=['response'],
+            update_fields=[*FEATURE_FIELDS, 'error', 'analyzed_at'],
+        )
+        return analyzed + len(results), failed + sum(1 for _, _, error in results if error)
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.utils import timezone
+from call.models import CallResponse
+from call.archive import ARCHIVE_FIELDS, delete_archived, write_segment
+from datetime import timedelta
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Move CallResponse rows older than the retention age into compressed archive segments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=settings.CALL_ARCHIVE_AFTER_DAYS,
+                            help='Archive rows created more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=settings.CALL_ARCHIVE_SEGMENT_ROWS,
+                            help='Rows per archive segment')
+        parser.add_argument('--dir', default=str(settings.CALL_ARCHIVE_DIR),
+                            help='Directory that holds the archive segments')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many rows would be archived')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        candidates = CallResponse.objects.filter(created_at__lt=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(f"{candidates.count()} rows created before {cutoff:%Y-%m-%d %H:%M} would be archived")
+            return
+
+        start = time.perf_counter()
+        archived = 0
+        segments = 0
+        while True:
+            rows = list(
+                candidates.order_by('created_at', 'id').values(*ARCHIVE_FIELDS)[:options['batch_size']]
+            )
+            if not rows:
+                break
+
+            # The segment is durable on disk before the rows leave the live table
+            segment_path = write_segment(options['dir'], rows)
+            delete_archived(rows)
+
+            archived += len(rows)
+            segments += 1
+            self.stdout.write(f"Archived {len(rows)} rows to {segment_path.name}")
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {archived} rows into {segments} segments in {elapsed:.2f}s'
+        ))
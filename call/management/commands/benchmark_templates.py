@@ -0,0 +1,55 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from call.models import CallResponse
+from call.views import render_rows
+
+class Command(BaseCommand):
+    help = 'Time rendering of the dashboard rows with each available template engine'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000, 10000],
+                            help='Row counts to render (default: 100 1000 10000)')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Renders per measurement; the best time is reported')
+
+    def handle(self, *args, **options):
+        engines = ['django'] + (['jinja2'] if settings.JINJA2_AVAILABLE else [])
+        if not settings.JINJA2_AVAILABLE:
+            self.stdout.write('Jinja2 is not installed; timing the Django engine only')
+        self.stdout.write(f"Configured engine: {settings.CALL_TEMPLATE_ENGINE}")
+
+        for count in options['rows']:
+            rows = self._sample_rows(count)
+            timings = []
+            for engine in engines:
+                render_rows(rows[:1], using=engine)  # compile and cache the template first
+                best = None
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    render_rows(rows, using=engine)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                timings.append(f"{engine}={best * 1000:.1f}ms ({best * 1e6 / count:.1f}µs/row)")
+            self.stdout.write(f"{count:>6} rows: " + '  '.join(timings))
+
+    def _sample_rows(self, count):
+        """Unsaved responses covering every branch of the row template"""
+        now = timezone.now()
+        statuses = ['completed', 'in-progress', 'failed', 'initiated']
+        return [
+            CallResponse(
+                id=i + 1,
+                phone_number=f'+9198765{i:05d}',
+                question=f'Question {i % 5 + 1}' if i % 7 else None,
+                call_status=statuses[i % len(statuses)],
+                recording_url=f'https://api.twilio.com/recordings/RE{i:032d}' if i % 3 else None,
+                recording_duration=i % 120 or None,
+                created_at=now - timedelta(minutes=i),
+            )
+            for i in range(count)
+        ]
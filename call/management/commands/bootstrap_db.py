@@ -0,0 +1,107 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.migrations.state import ModelState
+from django.db.migrations.writer import MigrationWriter
+from importlib import import_module
+from pathlib import Path
+import hashlib
+import pkgutil
+import time
+
+def _model_state_digest():
+    """Hash of the installed models, serialized the way makemigrations would write them"""
+    digest = hashlib.sha256()
+    for model in sorted(apps.get_models(include_auto_created=True), key=lambda m: m._meta.label):
+        state = ModelState.from_model(model)
+        digest.update(state.app_label.encode() + b'.' + state.name.encode())
+        for name, field in state.fields.items():
+            digest.update(name.encode() + MigrationWriter.serialize(field.deconstruct()[1:])[0].encode())
+        digest.update(MigrationWriter.serialize(state.options)[0].encode())
+    return digest.hexdigest()
+
+def _migration_files():
+    """Names of the migration modules on disk, found without importing them"""
+    names = []
+    for app_config in apps.get_app_configs():
+        try:
+            package = import_module(f'{app_config.name}.migrations')
+        except ImportError:
+            continue
+        for module in pkgutil.iter_modules(package.__path__):
+            if not module.name.startswith('_'):
+                names.append((app_config.label, module.name))
+    return sorted(names)
+
+class Command(BaseCommand):
+    help = 'Bring the database schema up to date, skipping all work when nothing has changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database alias to bootstrap')
+        parser.add_argument('--force', action='store_true',
+                            help='Ignore the stored fingerprint and check migrations anyway')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        alias = options['database']
+        connection = connections[alias]
+        fingerprint_path = Path(settings.CALL_SCHEMA_FINGERPRINT_DIR) / f'.schema_fingerprint.{alias}'
+
+        fingerprint = self.fingerprint(connection)
+        stored = fingerprint_path.read_text().strip() if fingerprint_path.exists() else None
+        if fingerprint == stored and not options['force']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Schema unchanged ({fingerprint[:12]}), nothing to do [{self.elapsed(start)}]'
+            ))
+            return
+
+        from django.db.migrations.executor import MigrationExecutor
+        executor = MigrationExecutor(connection)
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        checked = time.perf_counter()
+
+        if plan:
+            self.stdout.write(f'Applying {len(plan)} pending migrations:')
+            for migration, backwards in plan:
+                self.stdout.write(f'  {migration.app_label}.{migration.name}')
+            try:
+                call_command('migrate', database=alias, interactive=False, verbosity=0)
+            except Exception as e:
+                raise CommandError(f'Migration failed: {e}')
+            self.stdout.write(self.style.SUCCESS(f'Migrations applied [{self.elapsed(checked)}]'))
+        else:
+            self.stdout.write('No pending migrations')
+
+        from django.db.migrations.autodetector import MigrationAutodetector
+        from django.db.migrations.state import ProjectState
+        changes = MigrationAutodetector(
+            executor.loader.project_state(),
+            ProjectState.from_apps(apps),
+        ).changes(graph=executor.loader.graph)
+        if changes:
+            # No fingerprint: the next run must check (and warn) again
+            fingerprint_path.unlink(missing_ok=True)
+            self.stdout.write(self.style.WARNING(
+                f"Models have changes not covered by migrations in: {', '.join(sorted(changes))}"
+            ))
+        else:
+            fingerprint_path.parent.mkdir(parents=True, exist_ok=True)
+            fingerprint_path.write_text(self.fingerprint(connection))
+        self.stdout.write(self.style.SUCCESS(f'Schema ready [{self.elapsed(start)}]'))
+
+    def fingerprint(self, connection):
+        """Hash of the applied migrations, the migration files and the model state"""
+        recorder = MigrationRecorder(connection)
+        applied = sorted(recorder.applied_migrations()) if recorder.has_table() else []
+        digest = hashlib.sha256()
+        digest.update(repr(applied).encode())
+        digest.update(repr(_migration_files()).encode())
+        digest.update(_model_state_digest().encode())
+        return digest.hexdigest()
+
+    def elapsed(self, start):
+        return f'{(time.perf_counter() - start) * 1000:.0f} ms'
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from call.cache import cache_stats, data_version
+
+class Command(BaseCommand):
+    help = 'Report hit rates of the cached dashboard and response pages (all processes with Redis, else this process)'
+
+    def handle(self, *args, **options):
+        backend = settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1]
+        self.stdout.write(f"Backend: {backend}, data version: {data_version()}")
+        if backend != 'RedisCache':
+            self.stdout.write(self.style.WARNING('Hit counters are per process without Redis; these are this process only'))
+        for name, (hits, misses) in cache_stats().items():
+            total = hits + misses
+            rate = f"{100 * hits / total:.1f}%" if total else 'n/a'
+            self.stdout.write(f"{name:<18} hits={hits} misses={misses} hit rate={rate}")
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from call.latency import METRICS, latency_report, update_turn_latency
+import time
+
+class Command(BaseCommand):
+    help = 'Derive per-turn latency from the webhook journal and print p50/p95 per question and deployment'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', help='Journal directory (default CALL_JOURNAL_DIR)')
+        parser.add_argument('--since-hours', type=float,
+                            help='Re-derive turns journaled in the last N hours instead of since the last run')
+        parser.add_argument('--days', type=int, default=7, help='Window of the printed report')
+
+    def handle(self, *args, **options):
+        since = time.time() - options['since_hours'] * 3600 if options['since_hours'] is not None else None
+        start = time.perf_counter()
+        calls, turns = update_turn_latency(since=since, directory=options['dir'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Derived {turns} turns from {calls} calls in {time.perf_counter() - start:.2f}s"
+        ))
+
+        report = latency_report(options['days'])
+        columns = [f'{metric}_p{p}' for metric in METRICS for p in (50, 95)]
+        for title, rows in (('Question', report['questions']), ('Deployment', report['deployments'])):
+            self.stdout.write(f"\n{title:<14} {'turns':>7} " + ' '.join(f'{column:>16}' for column in columns))
+            for row in rows:
+                values = ' '.join(f"{'-' if row[column] is None else row[column]:>16}" for column in columns)
+                self.stdout.write(f"{str(row['key'])[:14]:<14} {row['turns']:>7} {values}")
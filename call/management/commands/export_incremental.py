@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from call.exports import PARQUET_AVAILABLE
+from call.incremental import IncrementalExport
+import os
+import time
+
+class Command(BaseCommand):
+    help = 'Append CallResponse rows changed since the last run to an incremental export'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=os.path.join(settings.CALL_EXPORT_DIR, 'incremental'),
+                            help='Export directory holding manifest.json and the part files')
+        parser.add_argument('--format', choices=['csv', 'parquet'],
+                            help='Part file format (default: the existing export\'s, else csv)')
+        parser.add_argument('--lag-seconds', type=int, default=5,
+                            help='Leave rows changed this recently for the next run')
+        parser.add_argument('--compact', action='store_true',
+                            help='After exporting, merge the base and all deltas into a new base')
+        parser.add_argument('--full', action='store_true',
+                            help='Discard existing parts and start again with a full base export')
+
+    def handle(self, *args, **options):
+        if options['format'] == 'parquet' and not PARQUET_AVAILABLE:
+            raise CommandError('Parquet output needs pyarrow installed')
+        try:
+            if options['full']:
+                export = IncrementalExport(options['dir'])
+                export.rebase(options['format'])
+            else:
+                export = IncrementalExport(options['dir'], options['format'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        if export.format == 'parquet' and not PARQUET_AVAILABLE:
+            raise CommandError('This export is in Parquet format, which needs pyarrow installed')
+
+        start = time.perf_counter()
+        entry = export.export_changes(options['lag_seconds'])
+        if entry:
+            self.stdout.write(self.style.SUCCESS(
+                f"Wrote {entry['rows']} rows to {entry['file']} in {time.perf_counter() - start:.2f}s"
+            ))
+        else:
+            self.stdout.write('No rows changed since the last run')
+
+        if options['compact']:
+            start = time.perf_counter()
+            base = export.compact()
+            if base:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Compacted into {base['file']} ({base['rows']} rows) in {time.perf_counter() - start:.2f}s"
+                ))
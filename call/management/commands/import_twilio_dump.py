@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from call.imports import CHUNK_SIZE, KINDS, DumpImport, detect_kind
+import os
+import time
+
+class Command(BaseCommand):
+    help = 'Import exported Twilio call, recording and transcription dumps (CSV or JSON) into CallResponse'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Dump files, or directories of them')
+        parser.add_argument('--kind', choices=KINDS,
+                            help='Kind of every file, instead of telling it from the first record')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help='Records per bulk upsert and transaction')
+
+    def handle(self, *args, **options):
+        files = []
+        for path in options['paths']:
+            if os.path.isdir(path):
+                files += sorted(os.path.join(path, name) for name in os.listdir(path)
+                                if name.endswith(('.csv', '.json', '.jsonl', '.gz')))
+            elif os.path.exists(path):
+                files.append(path)
+            else:
+                raise CommandError(f'No such file: {path}')
+
+        paths = {}
+        for path in files:
+            kind = options['kind'] or detect_kind(path)
+            if kind is None:
+                self.stdout.write(self.style.WARNING(f'Skipping {path}: not a Twilio call, recording or transcription dump'))
+                continue
+            self.stdout.write(f'{path}: {kind}')
+            paths[path] = kind
+
+        start = time.perf_counter()
+
+        def progress(kind, done):
+            self.stdout.write(f'{kind}: {done} records after {time.perf_counter() - start:.1f}s')
+
+        counts = DumpImport(options['chunk_size'], progress).run(paths)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {counts['calls']} calls, {counts['recordings']} recordings and "
+            f"{counts['transcriptions']} transcriptions ({counts['skipped']} skipped) "
+            f"in {time.perf_counter() - start:.2f}s"
+        ))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from call.journal import JournalReader, ROUTES
+from collections import Counter
+from datetime import datetime, timezone
+import time
+
+class Command(BaseCommand):
+    help = 'Print the webhook event timeline of a call, or summarize the whole journal'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--call-sid', help='Print the timeline of this call')
+        parser.add_argument('--route', choices=ROUTES, help='Only include events for this webhook')
+        parser.add_argument('--since-hours', type=float, help='Only include events from the last N hours')
+        parser.add_argument('--dir', help='Journal directory (defaults to CALL_JOURNAL_DIR)')
+
+    def handle(self, *args, **options):
+        reader = JournalReader(options['dir'])
+        since = time.time() - options['since_hours'] * 3600 if options['since_hours'] else None
+
+        if options['call_sid']:
+            events = [
+                event for event in reader.timeline(options['call_sid'])
+                if (not options['route'] or event.route == options['route'])
+                and (since is None or event.timestamp >= since)
+            ]
+            for event in events:
+                when = datetime.fromtimestamp(event.timestamp, tz=timezone.utc)
+                self.stdout.write(f"{when:%Y-%m-%d %H:%M:%S.%f} {event.route:<22} {event.payload}")
+            self.stdout.write(f"{len(events)} events")
+            return
+
+        start = time.perf_counter()
+        per_route = Counter()
+        calls = set()
+        for event in reader.events(route=options['route'], since=since):
+            per_route[event.route] += 1
+            calls.add(event.call_sid)
+        total = sum(per_route.values())
+        for route, count in per_route.most_common():
+            self.stdout.write(f"{route:<22} {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} events for {len(calls)} calls scanned in {time.perf_counter() - start:.2f}s"
+        ))
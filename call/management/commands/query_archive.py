@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from call.archive import ArchiveReader
+from datetime import date
+import json
+
+class Command(BaseCommand):
+    help = 'Query archived CallResponse rows by phone number and date range'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--phone', help='Exact phone number as stored on the response')
+        parser.add_argument('--since', type=date.fromisoformat, help='First day to include (YYYY-MM-DD)')
+        parser.add_argument('--until', type=date.fromisoformat, help='Last day to include (YYYY-MM-DD)')
+        parser.add_argument('--limit', type=int, help='Stop after this many rows')
+        parser.add_argument('--dir', help='Archive directory (defaults to CALL_ARCHIVE_DIR)')
+
+    def handle(self, *args, **options):
+        reader = ArchiveReader(options['dir'])
+        rows = reader.query(
+            phone_number=options['phone'],
+            since=options['since'],
+            until=options['until'],
+            limit=options['limit'],
+        )
+        for row in rows:
+            self.stdout.write(json.dumps(row, cls=DjangoJSONEncoder))
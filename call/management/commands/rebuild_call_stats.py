@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from call.stats import read_status_counts, rebuild_status_counts
+import time
+
+class Command(BaseCommand):
+    help = 'Rebuild the dashboard status counters from the CallResponse table'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        before = read_status_counts()
+        after = rebuild_status_counts()
+        for status in sorted(set(before) | set(after)):
+            old, new = before.get(status, 0), after.get(status, 0)
+            note = '' if old == new else f' (was {old})'
+            self.stdout.write(f"{status or 'no status'}: {new}{note}")
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt status counters in {time.perf_counter() - start:.2f}s'
+        ))
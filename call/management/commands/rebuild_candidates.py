@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from call.candidates import rebuild_candidates
+import time
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-candidate summaries from the CallResponse table'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        count = rebuild_candidates()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {count} candidate summaries in {time.perf_counter() - start:.2f}s'
+        ))
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from call.routers import refresh_snapshot
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Refresh the SQLite snapshot that the reporting views read as their replica'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=float,
+                            help='Keep running and refresh every this many seconds '
+                                 '(default: once; half of CALL_REPLICA_MAX_STALENESS keeps reports on the replica)')
+
+    def handle(self, *args, **options):
+        if not settings.CALL_REPLICA_SNAPSHOT_PATH:
+            raise CommandError('No SQLite replica snapshot is configured (CALL_REPLICA_ENABLED or REPLICA_DATABASE_URL)')
+        while True:
+            start = time.perf_counter()
+            try:
+                refreshed = refresh_snapshot()
+            except Exception as e:
+                if not options['every']:
+                    raise CommandError(f'Snapshot failed: {e}')
+                logger.error(f"Replica snapshot failed: {e}")
+            else:
+                if refreshed and not options['every']:
+                    self.stdout.write(self.style.SUCCESS(
+                        f'Refreshed {settings.CALL_REPLICA_SNAPSHOT_PATH} in {time.perf_counter() - start:.2f}s'
+                    ))
+                elif not refreshed:
+                    self.stdout.write(self.style.WARNING('Another process is refreshing the snapshot'))
+            if not options['every']:
+                return
+            time.sleep(max(0.0, options['every'] - (time.perf_counter() - start)))
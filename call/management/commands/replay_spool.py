@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from call.spool import get_spool, replay_record
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Replay CallResponse writes spooled while the database was unavailable'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true',
+                            help='Keep running and drain the spool whenever the database is healthy')
+        parser.add_argument('--interval', type=float, default=30.0,
+                            help='Seconds between drain attempts in --watch mode')
+
+    def handle(self, *args, **options):
+        while True:
+            self.drain_once()
+            if not options['watch']:
+                return
+            time.sleep(options['interval'])
+
+    def drain_once(self):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(f'Database unavailable, spool left in place: {e}'))
+            connection.close()
+            return
+
+        start = time.perf_counter()
+        try:
+            count, dead = get_spool().drain(replay_record)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Replay stopped, will retry on next run: {e}'))
+            logger.error(f"Error replaying spool: {str(e)}")
+            return
+
+        if dead:
+            self.stdout.write(self.style.WARNING(
+                f'{dead} spooled writes could not be applied and were moved to the dead-letter file'
+            ))
+        if count:
+            elapsed = time.perf_counter() - start
+            self.stdout.write(self.style.SUCCESS(f'Replayed {count} spooled writes in {elapsed:.2f}s'))
+        elif not dead:
+            self.stdout.write('Spool is empty')
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from call.rollups import update_rollups
+import time
+
+class Command(BaseCommand):
+    help = 'Recompute the hourly and daily funnel rollups for calls changed since the last run'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lag-seconds', type=int, default=5,
+                            help='Leave rows changed this recently for the next run')
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Drop every rollup and recompute them from the whole table')
+        parser.add_argument('--watch', action='store_true',
+                            help='Keep running, updating the rollups every --interval seconds')
+        parser.add_argument('--interval', type=int, default=60)
+
+    def handle(self, *args, **options):
+        rebuild = options['rebuild']
+        while True:
+            start = time.perf_counter()
+            calls, hours, days = update_rollups(options['lag_seconds'], rebuild=rebuild)
+            rebuild = False
+            if calls:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Recomputed {hours} hours and {days} days for {calls} changed calls "
+                    f"in {time.perf_counter() - start:.2f}s"
+                ))
+            elif not options['watch']:
+                self.stdout.write('No calls changed since the last run')
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
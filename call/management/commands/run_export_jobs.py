@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from call.jobs import purge_expired_jobs, requeue_stale_jobs, run_queued_jobs
+import time
+
+class Command(BaseCommand):
+    help = 'Build queued background exports, requeue abandoned ones and purge expired artifacts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true',
+                            help='Keep running and pick up new jobs as they are queued')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Seconds between queue checks in --watch mode')
+        parser.add_argument('--stale-minutes', type=int, default=settings.CALL_EXPORT_STALE_MINUTES,
+                            help='Requeue running jobs without progress for this long')
+        parser.add_argument('--keep-days', type=int, default=settings.CALL_EXPORT_KEEP_DAYS,
+                            help='Delete finished jobs and their files after this many days')
+
+    def handle(self, *args, **options):
+        while True:
+            requeued = requeue_stale_jobs(options['stale_minutes'])
+            if requeued:
+                self.stdout.write(self.style.WARNING(f'Requeued {requeued} abandoned jobs'))
+            purged = purge_expired_jobs(options['keep_days'])
+            if purged:
+                self.stdout.write(f'Purged {purged} expired jobs')
+            ran = run_queued_jobs()
+            if ran or not options['watch']:
+                self.stdout.write(self.style.SUCCESS(f'Ran {ran} export jobs'))
+            if not options['watch']:
+                return
+            time.sleep(options['interval'])
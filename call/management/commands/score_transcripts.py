@@ -0,0 +1,77 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from call.cache import bump_data_version
+from call.models import CallResponse
+from call.pagination import iterate_keyset
+from call.scoring import get_scorer, init_worker, score_batch
+import os
+import time
+
+class Command(BaseCommand):
+    help = 'Score transcripts against the keyword list, skipping rows already scored with the current list'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Scoring processes (1 scores in this process)')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Transcripts per worker task and per bulk update')
+        parser.add_argument('--all', action='store_true',
+                            help='Rescore every transcript, not only stale ones')
+
+    def handle(self, *args, **options):
+        scorer = get_scorer()
+        if not scorer.weights:
+            self.stdout.write(self.style.WARNING('The keyword list is empty; every transcript scores 0'))
+        batch_size = options['batch_size']
+
+        queryset = CallResponse.objects.exclude(Q(transcript__isnull=True) | Q(transcript=''))
+        if not options['all']:
+            queryset = queryset.exclude(keyword_version=scorer.version)
+        rows = iterate_keyset(queryset, ['id'], ['id', 'transcript'], batch_size)
+        batches = iter(lambda: list(islice(rows, batch_size)), [])
+
+        start = time.perf_counter()
+        scored = 0
+        if options['workers'] > 1:
+            with ProcessPoolExecutor(options['workers'], initializer=init_worker,
+                                     initargs=(scorer.weights,)) as pool:
+                # A bounded window of batches in flight keeps every worker busy
+                # without reading the whole table ahead of the writes
+                pending = deque()
+                for batch in batches:
+                    pending.append(pool.submit(score_batch, batch))
+                    if len(pending) >= 2 * options['workers']:
+                        scored += self._save(pending.popleft().result(), scorer.version)
+                while pending:
+                    scored += self._save(pending.popleft().result(), scorer.version)
+        else:
+            init_worker(scorer.weights)
+            for batch in batches:
+                scored += self._save(score_batch(batch), scorer.version)
+
+        if scored:
+            bump_data_version()
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {scored} transcripts (keywords {scorer.version}) in {time.perf_counter() - start:.2f}s"
+        ))
+
+    def _save(self, results, version):
+        # Transcripts mostly share a few hit sets, so one UPDATE per distinct
+        # (score, hits) beats bulk_update's CASE per row. update() does not
+        # touch auto_now, so updated_at is set here: a new score is a change
+        # like any other for the (updated_at, id) change feeds.
+        groups = {}
+        now = timezone.now()
+        for row_id, score, hits in results:
+            groups.setdefault((score, tuple(hits)), []).append(row_id)
+        with transaction.atomic():
+            for (score, hits), ids in groups.items():
+                CallResponse.objects.filter(id__in=ids).update(
+                    keyword_score=score, keyword_hits=list(hits), keyword_version=version, updated_at=now,
+                )
+        return len(results)
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call', '0004_alter_callresponse_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='callresponse',
+            index=models.Index(fields=['created_at', 'id'], name='callresp_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='callresponse',
+            index=models.Index(fields=['phone_number', 'created_at', 'id'], name='callresp_phone_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='callresponse',
+            index=models.Index(fields=['call_status', 'created_at', 'id'], name='callresp_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='callresponse',
+            index=models.Index(fields=['call_sid'], name='callresp_call_sid_idx'),
+        ),
+    ]
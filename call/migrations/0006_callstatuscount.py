@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:48
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_responses(apps, schema_editor):
+    CallResponse = apps.get_model('call', 'CallResponse')
+    CallStatusCount = apps.get_model('call', 'CallStatusCount')
+    counts = {}
+    for row in CallResponse.objects.order_by().values('call_status').annotate(n=Count('id')):
+        status = row['call_status'] or ''
+        counts[status] = counts.get(status, 0) + row['n']
+    CallStatusCount.objects.bulk_create(
+        CallStatusCount(call_status=status, count=n) for status, n in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call', '0005_callresponse_dashboard_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CallStatusCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('call_status', models.CharField(blank=True, max_length=20, unique=True)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_existing_responses, migrations.RunPython.noop),
+    ]
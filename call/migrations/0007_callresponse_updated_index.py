@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call', '0006_callstatuscount'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='callresponse',
+            index=models.Index(fields=['updated_at', 'id'], name='callresp_updated_id_idx'),
+        ),
+    ]
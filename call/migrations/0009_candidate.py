@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:57
+
+from django.db import migrations, models
+
+
+def summarize_existing_responses(apps, schema_editor):
+    CallResponse = apps.get_model('call', 'CallResponse')
+    Candidate = apps.get_model('call', 'Candidate')
+    summaries = {}
+    rows = CallResponse.objects.order_by('created_at', 'id').values(
+        'id', 'phone_number', 'call_sid', 'call_status', 'question', 'transcript', 'created_at'
+    )
+    for row in rows.iterator():
+        phone = ''.join(filter(str.isdigit, row['phone_number'] or ''))
+        # Call SIDs stored as phone_number by transcription_webhook are not candidates
+        if not phone or (row['phone_number'] or '').strip()[:2].upper() == 'CA' or len(phone) > 15:
+            continue
+        summary = summaries.setdefault(phone, {
+            'calls': set(), 'completed': set(), 'responses': 0,
+            'first': row['created_at'], 'last': None, 'transcripts': [],
+        })
+        summary['responses'] += 1
+        summary['last'] = row['created_at']
+        if row['call_sid']:
+            summary['calls'].add(row['call_sid'])
+            if row['call_status'] == 'completed':
+                summary['completed'].add(row['call_sid'])
+        if row['transcript']:
+            summary['transcripts'] = [{
+                'id': row['id'],
+                'question': row['question'],
+                'transcript': row['transcript'],
+                'created_at': row['created_at'].isoformat(),
+            }] + summary['transcripts'][:4]
+    Candidate.objects.bulk_create([
+        Candidate(
+            phone_number=phone,
+            call_count=len(summary['calls']),
+            completed_calls=len(summary['completed']),
+            response_count=summary['responses'],
+            first_call_at=summary['first'],
+            last_call_at=summary['last'],
+            latest_transcripts=summary['transcripts'],
+        )
+        for phone, summary in summaries.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call', '0008_transcript_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Candidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone_number', models.CharField(max_length=20, unique=True)),
+                ('call_count', models.IntegerField(default=0)),
+                ('completed_calls', models.IntegerField(default=0)),
+                ('response_count', models.IntegerField(default=0)),
+                ('first_call_at', models.DateTimeField(blank=True, null=True)),
+                ('last_call_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('latest_transcripts', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(summarize_existing_responses, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call', '0010_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('updated_at', models.DateTimeField(blank=True, null=True)),
+                ('row_id', models.BigIntegerField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyFunnel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('step', models.SmallIntegerField()),
+                ('question', models.TextField(blank=True)),
+                ('calls_reached', models.IntegerField(default=0)),
+                ('calls_completed', models.IntegerField(default=0)),
+                ('answers_timed', models.IntegerField(default=0)),
+                ('duration_total', models.BigIntegerField(default=0)),
+                ('transcripts_completed', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['bucket', 'step'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(fields=('bucket', 'step'), name='dailyfunnel_bucket_step_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='HourlyFunnel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('step', models.SmallIntegerField()),
+                ('question', models.TextField(blank=True)),
+                ('calls_reached', models.IntegerField(default=0)),
+                ('calls_completed', models.IntegerField(default=0)),
+                ('answers_timed', models.IntegerField(default=0)),
+                ('duration_total', models.BigIntegerField(default=0)),
+                ('transcripts_completed', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['bucket', 'step'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(fields=('bucket', 'step'), name='hourlyfunnel_bucket_step_uniq')],
+            },
+        ),
+    ]
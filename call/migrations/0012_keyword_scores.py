@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call', '0011_funnel_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callresponse',
+            name='keyword_hits',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='callresponse',
+            name='keyword_score',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='callresponse',
+            name='keyword_version',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+        migrations.AddIndex(
+            model_name='callresponse',
+            index=models.Index(fields=['keyword_score', 'id'], name='callresp_score_id_idx'),
+        ),
+    ]
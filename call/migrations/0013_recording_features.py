@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:38
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call', '0012_keyword_scores'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecordingFeatures',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('duration_seconds', models.FloatField(blank=True, null=True)),
+                ('speech_ratio', models.FloatField(blank=True, null=True)),
+                ('speaking_seconds', models.FloatField(blank=True, null=True)),
+                ('silence_gaps', models.IntegerField(blank=True, null=True)),
+                ('longest_silence_seconds', models.FloatField(blank=True, null=True)),
+                ('loudness_dbfs', models.FloatField(blank=True, null=True)),
+                ('peak_dbfs', models.FloatField(blank=True, null=True)),
+                ('sample_rate', models.IntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('analyzed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('response', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='audio_features', to='call.callresponse')),
+            ],
+        ),
+    ]
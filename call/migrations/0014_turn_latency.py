@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call', '0013_recording_features'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TurnLatency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('call_sid', models.CharField(db_index=True, max_length=100)),
+                ('step', models.PositiveSmallIntegerField()),
+                ('deployment', models.CharField(blank=True, max_length=40)),
+                ('answered_at', models.DateTimeField(db_index=True)),
+                ('server_ms', models.IntegerField()),
+                ('hop_ms', models.IntegerField(blank=True, null=True)),
+                ('recording_ms', models.IntegerField(blank=True, null=True)),
+                ('turn_ms', models.IntegerField(blank=True, null=True)),
+                ('dead_air_ms', models.IntegerField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-answered_at'],
+                'constraints': [models.UniqueConstraint(fields=('call_sid', 'step'), name='turnlatency_call_step_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+def drop_call_sid_candidates(apps, schema_editor):
+    """Delete summaries built from call SIDs that transcription_webhook stored as phone_number"""
+    CallResponse = apps.get_model('call', 'CallResponse')
+    Candidate = apps.get_model('call', 'Candidate')
+    phones = set()
+    for value in CallResponse.objects.order_by().values_list('phone_number', flat=True).distinct().iterator():
+        value = (value or '').strip()
+        digits = ''.join(filter(str.isdigit, value))
+        if digits and value[:2].upper() != 'CA' and len(digits) <= 15:
+            phones.add(digits)
+    fake = [phone for phone in Candidate.objects.values_list('phone_number', flat=True) if phone not in phones]
+    for start in range(0, len(fake), 500):
+        Candidate.objects.filter(phone_number__in=fake[start:start + 500]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call', '0014_turn_latency'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_call_sid_candidates, migrations.RunPython.noop),
+    ]
@@ -31,11 +31,199 @@ class CallResponse(models.Model):
     call_sid = models.CharField(max_length=100, blank=True, null=True)
     call_duration = models.IntegerField(blank=True, null=True)
     call_status = models.CharField(max_length=20, blank=True, null=True)
+    # Set by call.scoring from the transcript; keyword_version is blank until scored
+    keyword_score = models.IntegerField(default=0)
+    keyword_hits = models.JSONField(default=list, blank=True)
+    keyword_version = models.CharField(max_length=16, blank=True, default='')
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination and filters on the dashboard
+            models.Index(fields=['created_at', 'id'], name='callresp_created_id_idx'),
+            models.Index(fields=['phone_number', 'created_at', 'id'], name='callresp_phone_created_idx'),
+            models.Index(fields=['call_status', 'created_at', 'id'], name='callresp_status_created_idx'),
+            # Per-call lookups from the voice webhooks
+            models.Index(fields=['call_sid'], name='callresp_call_sid_idx'),
+            # Change feeds ordered by (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='callresp_updated_id_idx'),
+            # Dashboard sorted by keyword score
+            models.Index(fields=['keyword_score', 'id'], name='callresp_score_id_idx'),
+        ]
 
     def __str__(self):
-        return f"Call to {self.phone_number} at {self.created_at}"
\ No newline at end of file
+        return f"Call to {self.phone_number} at {self.created_at}"
+
+
+class CallStatusCount(models.Model):
+    """Number of CallResponse rows per call_status, kept up to date by call.stats"""
+    call_status = models.CharField(max_length=20, unique=True, blank=True)
+    count = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.call_status or 'no status'}: {self.count}"
+
+
+class Candidate(models.Model):
+    """Per-phone summary of CallResponse rows, kept up to date by call.candidates"""
+    # Digits only: calls are stored both with and without the leading '+'
+    phone_number = models.CharField(max_length=20, unique=True)
+    call_count = models.IntegerField(default=0)
+    completed_calls = models.IntegerField(default=0)
+    response_count = models.IntegerField(default=0)
+    first_call_at = models.DateTimeField(blank=True, null=True)
+    last_call_at = models.DateTimeField(blank=True, null=True, db_index=True)
+    latest_transcripts = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Candidate {self.phone_number} ({self.call_count} calls)"
+
+    @property
+    def completion_rate(self):
+        """Share of calls that completed, as a percentage"""
+        if not self.call_count:
+            return 0
+        return round(100 * self.completed_calls / self.call_count)
+
+
+class RecordingFeatures(models.Model):
+    """Audio features of a response's recording, written by `manage.py analyze_recordings`"""
+    response = models.OneToOneField(CallResponse, on_delete=models.CASCADE, related_name='audio_features')
+    duration_seconds = models.FloatField(blank=True, null=True)
+    speech_ratio = models.FloatField(blank=True, null=True)
+    speaking_seconds = models.FloatField(blank=True, null=True)
+    silence_gaps = models.IntegerField(blank=True, null=True)
+    longest_silence_seconds = models.FloatField(blank=True, null=True)
+    loudness_dbfs = models.FloatField(blank=True, null=True)
+    peak_dbfs = models.FloatField(blank=True, null=True)
+    sample_rate = models.IntegerField(blank=True, null=True)
+    # Set when the file could not be decoded; the features are then empty
+    error = models.TextField(blank=True)
+    analyzed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Features of response {self.response_id}"
+
+
+class ExportJob(models.Model):
+    """A CallResponse export built in the background by call.jobs"""
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('xlsx', 'Excel'),
+        ('parquet', 'Parquet'),
+    ]
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    params = models.JSONField(default=dict, blank=True)
+    # Format, parameters and a fingerprint of the matching data
+    cache_key = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    rows_total = models.IntegerField(blank=True, null=True)
+    rows_written = models.IntegerField(default=0)
+    file_path = models.CharField(max_length=500, blank=True)
+    file_size = models.BigIntegerField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='exportjob_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_format_display()} export #{self.id} ({self.status})"
+
+    @property
+    def progress(self):
+        """Percentage of rows written"""
+        if self.status == 'done':
+            return 100
+        if not self.rows_total:
+            return 0
+        return min(99, int(100 * self.rows_written / self.rows_total))
+
+
+class FunnelRollup(models.Model):
+    """
+    Interview funnel counts for the calls that started in one time bucket.
+
+    Step 0 counts every call; step N counts the calls that reached question N.
+    Maintained by call.rollups, never written directly.
+    """
+    bucket = models.DateTimeField()
+    step = models.SmallIntegerField()
+    question = models.TextField(blank=True)
+    calls_reached = models.IntegerField(default=0)
+    calls_completed = models.IntegerField(default=0)
+    answers_timed = models.IntegerField(default=0)
+    duration_total = models.BigIntegerField(default=0)
+    transcripts_completed = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+        ordering = ['bucket', 'step']
+
+    def __str__(self):
+        return f"{self.bucket:%Y-%m-%d %H:%M} step {self.step}: {self.calls_reached} calls"
+
+
+class HourlyFunnel(FunnelRollup):
+    class Meta(FunnelRollup.Meta):
+        constraints = [
+            models.UniqueConstraint(fields=['bucket', 'step'], name='hourlyfunnel_bucket_step_uniq'),
+        ]
+
+
+class DailyFunnel(FunnelRollup):
+    class Meta(FunnelRollup.Meta):
+        constraints = [
+            models.UniqueConstraint(fields=['bucket', 'step'], name='dailyfunnel_bucket_step_uniq'),
+        ]
+
+
+class RollupWatermark(models.Model):
+    """How far (by updated_at, id) a rollup has consumed CallResponse changes"""
+    name = models.CharField(max_length=50, unique=True)
+    updated_at = models.DateTimeField(blank=True, null=True)
+    row_id = models.BigIntegerField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.name} at ({self.updated_at}, {self.row_id})"
+
+
+class TurnLatency(models.Model):
+    """
+    One interview turn as timed from the webhook journal by call.latency:
+    step N ends when Twilio posts the answer to question N. Times are in ms.
+    """
+    call_sid = models.CharField(max_length=100, db_index=True)
+    step = models.PositiveSmallIntegerField()
+    deployment = models.CharField(max_length=40, blank=True)
+    answered_at = models.DateTimeField(db_index=True)
+    server_ms = models.IntegerField()
+    hop_ms = models.IntegerField(blank=True, null=True)
+    recording_ms = models.IntegerField(blank=True, null=True)
+    turn_ms = models.IntegerField(blank=True, null=True)
+    dead_air_ms = models.IntegerField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-answered_at']
+        constraints = [
+            models.UniqueConstraint(fields=['call_sid', 'step'], name='turnlatency_call_step_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.call_sid} step {self.step}: {self.dead_air_ms} ms dead air"
@@ -0,0 +1,29 @@
+import json
+import logging
+import os
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_QUESTIONS = [
+    "Hi, please tell us your full name.",
+    "What is your work experience?",
+    "What was your previous job role?",
+    "Why do you want to join our company?"
+]
+
+
+def load_questions():
+    """Load the interview questions from questions.json"""
+    try:
+        questions_path = os.path.join(settings.BASE_DIR, "questions.json")
+        with open(questions_path, "r", encoding="utf-8") as f:
+            questions = json.load(f)
+        logger.info(f"Loaded {len(questions)} questions from JSON file")
+    except Exception as e:
+        logger.error(f"Error loading questions: {e}")
+        # Fallback questions
+        questions = FALLBACK_QUESTIONS
+        logger.info(f"Using fallback questions: {len(questions)} questions")
+    return questions
@@ -0,0 +1,164 @@
+"""
+Hourly and daily interview funnel rollups.
+
+`update_rollups` reads the CallResponse rows changed since its watermark
+through the (updated_at, id) index, finds the hour each affected call started
+in and recomputes those hours from scratch, then rebuilds the days containing
+them from the hourly rows. Whole buckets are recomputed rather than adjusted by
+deltas, so a transcript or status that arrives long after its call is handled
+like any other change: the write bumps updated_at and the call's bucket is
+rebuilt. Deletes (e.g. archived rows) do not bump anything, so rollups keep
+counting archived calls until `--rebuild`.
+"""
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.utils import timezone
+
+from .models import CallResponse, DailyFunnel, HourlyFunnel, RollupWatermark
+from .pagination import iterate_keyset
+from .questions import load_questions
+
+WATERMARK = 'funnel'
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+CHUNK_SIZE = 2000
+SID_CHUNK = 500
+METRICS = ['calls_reached', 'calls_completed', 'answers_timed', 'duration_total', 'transcripts_completed']
+
+
+def _hour(value):
+    return value.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _day(value):
+    return _hour(value).replace(hour=0)
+
+
+def _changed_calls(after, cutoff):
+    """call_sids of rows changed after the `after` key, and the key of the last such row"""
+    rows = iterate_keyset(
+        CallResponse.objects.filter(updated_at__lte=cutoff),
+        ['updated_at', 'id'], ['call_sid', 'updated_at', 'id'], CHUNK_SIZE, after=after,
+    )
+    call_sids, last = set(), None
+    for call_sid, updated_at, row_id in rows:
+        if call_sid:
+            call_sids.add(call_sid)
+        last = (updated_at, row_id)
+    return call_sids, last
+
+
+def _start_hours(call_sids):
+    """Hours in which the given calls started"""
+    call_sids = list(call_sids)
+    hours = set()
+    for i in range(0, len(call_sids), SID_CHUNK):
+        starts = (
+            CallResponse.objects.filter(call_sid__in=call_sids[i:i + SID_CHUNK])
+            .order_by()
+            .values('call_sid')
+            .annotate(start=Min('created_at'))
+            .values_list('start', flat=True)
+        )
+        hours.update(_hour(start) for start in starts)
+    return hours
+
+
+def _calls_started_in(bucket, questions):
+    """One aggregated row per call that started in the hour `bucket`"""
+    candidates = (
+        CallResponse.objects.filter(created_at__gte=bucket, created_at__lt=bucket + HOUR)
+        .exclude(call_sid__isnull=True)
+        .exclude(call_sid='')
+        .values('call_sid')
+    )
+    aggregates = {
+        'start': Min('created_at'),
+        'completed': Count('id', filter=Q(call_status='completed')),
+    }
+    for step, question in enumerate(questions, 1):
+        aggregates[f'reached_{step}'] = Count('id', filter=Q(question=question))
+        aggregates[f'duration_{step}'] = Max('recording_duration', filter=Q(question=question))
+        aggregates[f'transcribed_{step}'] = Count('id', filter=Q(question=question, transcript_status='completed'))
+    return list(
+        CallResponse.objects.filter(call_sid__in=candidates)
+        .order_by()
+        .values('call_sid')
+        .annotate(**aggregates)
+        .filter(start__gte=bucket, start__lt=bucket + HOUR)
+    )
+
+
+def rebuild_hour(bucket, questions):
+    calls = _calls_started_in(bucket, questions)
+    rows = []
+    if calls:
+        rows.append(HourlyFunnel(
+            bucket=bucket, step=0,
+            calls_reached=len(calls),
+            calls_completed=sum(1 for call in calls if call['completed']),
+        ))
+    for step, question in enumerate(questions, 1):
+        reached = [call for call in calls if call[f'reached_{step}']]
+        if not reached:
+            continue
+        durations = [call[f'duration_{step}'] for call in reached if call[f'duration_{step}'] is not None]
+        rows.append(HourlyFunnel(
+            bucket=bucket, step=step, question=question,
+            calls_reached=len(reached),
+            calls_completed=sum(1 for call in reached if call['completed']),
+            answers_timed=len(durations),
+            duration_total=sum(durations),
+            transcripts_completed=sum(1 for call in reached if call[f'transcribed_{step}']),
+        ))
+    with transaction.atomic():
+        HourlyFunnel.objects.filter(bucket=bucket).delete()
+        HourlyFunnel.objects.bulk_create(rows)
+
+
+def rebuild_day(day):
+    totals = (
+        HourlyFunnel.objects.filter(bucket__gte=day, bucket__lt=day + DAY)
+        .values('step')
+        .annotate(question_text=Max('question'), **{metric: Sum(metric) for metric in METRICS})
+        .order_by('step')
+    )
+    rows = [
+        DailyFunnel(bucket=day, step=row['step'], question=row['question_text'],
+                    **{metric: row[metric] for metric in METRICS})
+        for row in totals
+    ]
+    with transaction.atomic():
+        DailyFunnel.objects.filter(bucket=day).delete()
+        DailyFunnel.objects.bulk_create(rows)
+
+
+def update_rollups(lag_seconds=5, rebuild=False):
+    """
+    Bring the rollups up to date; returns (calls, hours, days) recomputed.
+    Rows changed in the last `lag_seconds` wait for the next run, so a commit
+    still in flight cannot slip under the watermark.
+    """
+    watermark, _ = RollupWatermark.objects.get_or_create(name=WATERMARK)
+    if rebuild:
+        HourlyFunnel.objects.all().delete()
+        DailyFunnel.objects.all().delete()
+        watermark.updated_at = watermark.row_id = None
+
+    after = [watermark.updated_at, watermark.row_id] if watermark.updated_at else None
+    call_sids, last = _changed_calls(after, timezone.now() - timedelta(seconds=lag_seconds))
+    hours = sorted(_start_hours(call_sids))
+    days = sorted({_day(hour) for hour in hours})
+    questions = load_questions()
+    for hour in hours:
+        rebuild_hour(hour, questions)
+    for day in days:
+        rebuild_day(day)
+
+    # Advanced only once every affected bucket is rebuilt; a crash just redoes them
+    if last:
+        watermark.updated_at, watermark.row_id = last
+    watermark.save()
+    return len(call_sids), len(hours), len(days)
@@ -0,0 +1,167 @@
+"""
+Database routing for the reporting views.
+
+Views wrapped in `reporting_view` (dashboard, exports, response pages) read from
+the `replica` alias so heavy reports do not compete with the webhook writes on
+the primary. Everything else, including all writes and management commands,
+stays on `default`.
+
+With SQLite the replica is a read-only connection to a snapshot of the primary
+taken with the online backup API by `manage.py refresh_replica --every N`, one
+process per machine. The copy is made a few pages at a time, so the primary is
+only read-locked for a step and webhook writes get in between steps. While the
+snapshot is older than CALL_REPLICA_MAX_STALENESS seconds (or missing) reports
+read from the primary. A real replica configured through REPLICA_DATABASE_URL
+is checked for replication lag instead.
+"""
+import contextvars
+import fcntl
+import logging
+import os
+import sqlite3
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA_ALIAS = 'replica'
+# Pages copied per backup step, and the pause that lets writers in between steps
+BACKUP_PAGES = 256
+BACKUP_SLEEP = 0.005
+
+_use_replica = contextvars.ContextVar('call_use_replica', default=False)
+
+
+class ReportingRouter:
+    """Send reads from reporting views to the replica, everything else to the primary"""
+
+    def db_for_read(self, model, **hints):
+        # Sessions, auth and messages must see their own writes immediately
+        if _use_replica.get() and model._meta.app_label == 'call':
+            return REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+def reporting_view(view):
+    """Decorator: route the view's reads to the replica when it is fresh enough"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not replica_is_fresh():
+            return view(request, *args, **kwargs)
+        token = _use_replica.set(True)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+    return wrapper
+
+
+def reading_from_replica():
+    """True inside a reporting view that is currently routed to the replica"""
+    return _use_replica.get()
+
+
+def replica_is_fresh():
+    """True if the replica lags the primary by no more than the staleness tolerance"""
+    if REPLICA_ALIAS not in settings.DATABASES:
+        return False
+    try:
+        if settings.CALL_REPLICA_SNAPSHOT_PATH:
+            return _snapshot.is_fresh()
+        return _replication_lag() <= settings.CALL_REPLICA_MAX_STALENESS
+    except Exception as e:
+        logger.warning(f"Replica unavailable, reading from primary: {e}")
+        return False
+
+
+class SQLiteSnapshot:
+    """Copy of the primary SQLite database, refreshed by `manage.py refresh_replica`"""
+
+    def age(self):
+        try:
+            return time.time() - os.path.getmtime(settings.CALL_REPLICA_SNAPSHOT_PATH)
+        except OSError:
+            return None
+
+    def is_fresh(self):
+        age = self.age()
+        return age is not None and age <= settings.CALL_REPLICA_MAX_STALENESS
+
+    def refresh(self, primary=None, target=None):
+        """
+        Replace the snapshot with a fresh copy of the primary; returns False
+        without copying if another process is refreshing it.
+        """
+        primary = str(primary or settings.DATABASES['default']['NAME'])
+        target = str(target or settings.CALL_REPLICA_SNAPSHOT_PATH)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(f"{target}.lock", 'a') as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            start = time.perf_counter()
+            try:
+                source = sqlite3.connect(primary)
+                try:
+                    dest = sqlite3.connect(tmp)
+                    try:
+                        # The read lock is released after every step; the pause in
+                        # the progress callback gives waiting writers their turn
+                        source.backup(dest, pages=BACKUP_PAGES, progress=_pause)
+                    finally:
+                        dest.close()
+                finally:
+                    source.close()
+                os.replace(tmp, target)
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except FileNotFoundError:
+                    pass
+                raise
+        logger.info(f"Replica snapshot refreshed in {time.perf_counter() - start:.2f}s")
+        return True
+
+
+def _pause(status, remaining, total):
+    time.sleep(BACKUP_SLEEP)
+
+
+_snapshot = SQLiteSnapshot()
+
+
+def refresh_snapshot():
+    """Refresh the SQLite replica snapshot; False if another process is already at it"""
+    return _snapshot.refresh()
+
+_lag_cache = {'checked': 0.0, 'lag': float('inf')}
+
+
+def _replication_lag():
+    """Seconds the replica is behind the primary, re-checked at most every 5s"""
+    now = time.monotonic()
+    if now - _lag_cache['checked'] < 5:
+        return _lag_cache['lag']
+    lag = 0.0
+    connection = connections[REPLICA_ALIAS]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+            )
+            lag = float(cursor.fetchone()[0])
+    _lag_cache.update(checked=now, lag=lag)
+    return lag
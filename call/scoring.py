@@ -0,0 +1,159 @@
+"""
+Keyword scoring of interview transcripts.
+
+keywords.json maps each role to its skills, as {phrase: weight} or a plain
+list (weight 1). The phrases of the role chosen by CALL_SCORING_ROLE compile
+into a single case-insensitive regex shaped as a prefix trie, so a transcript
+is scored in one pass whatever the number of phrases. A transcript scores
+the sum of the weights of the distinct phrases it mentions. Every scored row
+records the version of the keyword list it was scored with, so
+`manage.py score_transcripts` only revisits rows when the list changes.
+
+This module holds no model code so that score_transcripts' worker processes
+can import it cheaply.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+SCORE_FIELDS = ['keyword_score', 'keyword_hits', 'keyword_version']
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize(text):
+    return _WHITESPACE.sub(' ', text.strip().casefold())
+
+
+def _trie_pattern(phrases):
+    """
+    Regex for `phrases` factored into a character trie, e.g. team|team lead
+    becomes team(?:\s+lead)?. A plain alternation retries every phrase at
+    each position; the trie walks one branch, like an Aho-Corasick automaton,
+    so matching speed barely depends on the number of phrases.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [
+            (r'\s+' if char == ' ' else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ''
+        group = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy: the longest phrase wins, shorter ones remain as fallbacks
+        return f'(?:{group})?' if '' in node else group
+
+    return build(trie)
+
+
+class KeywordScorer:
+    def __init__(self, weights):
+        self.weights = {normalize(phrase): weight for phrase, weight in weights.items() if normalize(phrase)}
+        payload = json.dumps(sorted(self.weights.items())).encode()
+        self.version = hashlib.sha1(payload).hexdigest()[:16]
+        # (?<!\w) / (?!\w) rather than \b so phrases may start or end with symbols like C++
+        self.pattern = (
+            re.compile(r'(?<!\w)(?:' + _trie_pattern(self.weights) + r')(?!\w)', re.IGNORECASE)
+            if self.weights else None
+        )
+
+    def score(self, text):
+        """(score, sorted list of matched phrases) for one transcript"""
+        if not text or self.pattern is None:
+            return 0, []
+        # Normalize each distinct spelling once, not every occurrence
+        hits = {self._phrase(match) for match in set(self.pattern.findall(text))}
+        hits.discard(None)
+        return sum(self.weights[hit] for hit in hits), sorted(hits)
+
+    def _phrase(self, match):
+        """The phrase a regex match stands for"""
+        phrase = normalize(match)
+        if phrase in self.weights:
+            return phrase
+        # The regex matches case-insensitively character by character, which
+        # casefold() does not always agree with: 'KİT' matches kit but folds to 'ki̇t'
+        for candidate in self.weights:
+            if re.fullmatch(_trie_pattern([candidate]), match, re.IGNORECASE):
+                return candidate
+        return None
+
+    def fields(self, text):
+        """
+        CallResponse field values recording the score of `text`; empty if
+        scoring fails, so the transcript is still saved and scored later by
+        score_transcripts.
+        """
+        try:
+            score, hits = self.score(text)
+        except Exception as e:
+            logger.error(f"Error scoring transcript: {e}")
+            return {}
+        return {'keyword_score': score, 'keyword_hits': hits, 'keyword_version': self.version}
+
+
+def load_keywords(role=None):
+    """{phrase: weight} for `role` (default CALL_SCORING_ROLE) from the keywords file"""
+    role = role or settings.CALL_SCORING_ROLE
+    try:
+        with open(settings.CALL_KEYWORDS_PATH, "r", encoding="utf-8") as f:
+            roles = json.load(f)
+        keywords = roles[role]
+    except Exception as e:
+        logger.error(f"Error loading keywords for role {role}: {e}")
+        return {}
+    if isinstance(keywords, list):
+        return {phrase: 1 for phrase in keywords}
+    return keywords
+
+
+_scorer = None
+_scorer_key = None
+_scorer_lock = threading.Lock()
+
+
+def get_scorer():
+    """Compiled scorer for the configured role, rebuilt when the keywords file changes"""
+    global _scorer, _scorer_key
+    try:
+        mtime = os.path.getmtime(settings.CALL_KEYWORDS_PATH)
+    except OSError:
+        mtime = None
+    key = (settings.CALL_KEYWORDS_PATH, settings.CALL_SCORING_ROLE, mtime)
+    with _scorer_lock:
+        if _scorer is None or _scorer_key != key:
+            _scorer = KeywordScorer(load_keywords())
+            _scorer_key = key
+        return _scorer
+
+
+def keyword_fields(text):
+    return get_scorer().fields(text)
+
+
+# Process pool workers for score_transcripts: the parent compiles nothing
+# per batch, each worker compiles the keyword list once in its initializer.
+_worker_scorer = None
+
+
+def init_worker(weights):
+    global _worker_scorer
+    _worker_scorer = KeywordScorer(weights)
+
+
+def score_batch(rows):
+    """[(id, score, hits)] for [(id, transcript)], run in a worker process"""
+    return [(row_id, *_worker_scorer.score(text)) for row_id, text in rows]
@@ -0,0 +1,138 @@
+"""
+Full-text search over CallResponse transcripts.
+
+SQLite keeps an FTS5 index (call_transcript_fts) that mirrors the transcript
+column through triggers; PostgreSQL gets a generated tsvector column with a GIN
+index. Either way the database maintains the index on every write, whichever
+code path stores the transcript. Django's SQLite schema editor rebuilds tables
+for some migrations and drops their triggers in the process, so
+`install_search_index` also runs after every migrate and re-creates anything
+that is missing.
+"""
+import re
+from collections import namedtuple
+
+from django.db import connections, router
+from django.utils.html import escape
+
+from .models import CallResponse
+
+SearchHit = namedtuple('SearchHit', 'response rank snippet')
+
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+_SQLITE_TRIGGERS = {
+    'call_transcript_fts_ai': """
+        CREATE TRIGGER call_transcript_fts_ai AFTER INSERT ON call_callresponse
+        WHEN new.transcript IS NOT NULL BEGIN
+            INSERT INTO call_transcript_fts(rowid, transcript) VALUES (new.id, new.transcript);
+        END
+    """,
+    'call_transcript_fts_ad': """
+        CREATE TRIGGER call_transcript_fts_ad AFTER DELETE ON call_callresponse
+        WHEN old.transcript IS NOT NULL BEGIN
+            INSERT INTO call_transcript_fts(call_transcript_fts, rowid, transcript)
+            VALUES ('delete', old.id, old.transcript);
+        END
+    """,
+    'call_transcript_fts_au': """
+        CREATE TRIGGER call_transcript_fts_au AFTER UPDATE OF transcript ON call_callresponse
+        WHEN old.transcript IS NOT new.transcript BEGIN
+            INSERT INTO call_transcript_fts(call_transcript_fts, rowid, transcript)
+            SELECT 'delete', old.id, old.transcript WHERE old.transcript IS NOT NULL;
+            INSERT INTO call_transcript_fts(rowid, transcript)
+            SELECT new.id, new.transcript WHERE new.transcript IS NOT NULL;
+        END
+    """,
+}
+
+
+def install_search_index(connection):
+    """Create the transcript index and its maintenance hooks if they are missing"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE name = 'call_transcript_fts' OR name LIKE 'call_transcript_fts_a_'"
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            missing = [name for name in _SQLITE_TRIGGERS if name not in existing]
+            if 'call_transcript_fts' in existing and not missing:
+                return
+            if 'call_transcript_fts' not in existing:
+                cursor.execute(
+                    "CREATE VIRTUAL TABLE call_transcript_fts USING fts5("
+                    "transcript, content='call_callresponse', content_rowid='id', "
+                    "tokenize='porter unicode61')"
+                )
+            for name in missing:
+                cursor.execute(_SQLITE_TRIGGERS[name])
+            # Writes made while the triggers were missing are not indexed yet
+            cursor.execute("INSERT INTO call_transcript_fts(call_transcript_fts) VALUES ('rebuild')")
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                "ALTER TABLE call_callresponse ADD COLUMN IF NOT EXISTS transcript_tsv tsvector "
+                "GENERATED ALWAYS AS (to_tsvector('english', coalesce(transcript, ''))) STORED"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS call_callresponse_transcript_tsv_idx "
+                "ON call_callresponse USING GIN (transcript_tsv)"
+            )
+
+
+def remove_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for name in _SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute("DROP TABLE IF EXISTS call_transcript_fts")
+        elif connection.vendor == 'postgresql':
+            cursor.execute("DROP INDEX IF EXISTS call_callresponse_transcript_tsv_idx")
+            cursor.execute("ALTER TABLE call_callresponse DROP COLUMN IF EXISTS transcript_tsv")
+
+
+def _snippet_html(snippet):
+    return escape(snippet).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def search_transcripts(query, limit=20):
+    """Best matching responses for `query`, each with its rank and an HTML snippet"""
+    terms = re.findall(r'\w+', query or '')
+    if not terms:
+        return []
+    connection = connections[router.db_for_read(CallResponse)]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            # Quote every term so user input can never be parsed as FTS syntax
+            match = ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+            cursor.execute(
+                "SELECT rowid, bm25(call_transcript_fts), "
+                "snippet(call_transcript_fts, 0, char(2), char(3), '…', 16) "
+                "FROM call_transcript_fts WHERE call_transcript_fts MATCH %s "
+                "ORDER BY bm25(call_transcript_fts) LIMIT %s",
+                [match, limit],
+            )
+            matches = [(row_id, -rank, snippet) for row_id, rank, snippet in cursor.fetchall()]
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                "SELECT id, ts_rank(transcript_tsv, q), "
+                "ts_headline('english', transcript, q, "
+                "'StartSel=' || chr(2) || ', StopSel=' || chr(3) || ', MaxWords=24, MinWords=8') "
+                "FROM call_callresponse, plainto_tsquery('english', %s) q "
+                "WHERE transcript_tsv @@ q ORDER BY 2 DESC LIMIT %s",
+                [' '.join(terms), limit],
+            )
+            matches = cursor.fetchall()
+        else:
+            queryset = CallResponse.objects.all()
+            for term in terms:
+                queryset = queryset.filter(transcript__icontains=term)
+            matches = [(row_id, 0.0, transcript[:200]) for row_id, transcript in
+                       queryset.values_list('id', 'transcript')[:limit]]
+
+    responses = CallResponse.objects.in_bulk([row_id for row_id, _, _ in matches])
+    return [
+        SearchHit(responses[row_id], rank, _snippet_html(snippet))
+        for row_id, rank, snippet in matches
+        if row_id in responses
+    ]
@@ -0,0 +1,68 @@
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models.signals import post_delete, post_init, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import bump_data_version_on_commit
+from .candidates import refresh_candidates_on_commit
+from .models import CallResponse
+from .search import install_search_index
+from .stats import adjust_status_counts
+
+# call_status was deferred when the instance was loaded
+_UNKNOWN = object()
+
+
+@receiver(post_init, sender=CallResponse)
+def remember_call_status(sender, instance, **kwargs):
+    instance._stats_call_status = instance.__dict__.get('call_status', _UNKNOWN)
+
+
+@receiver(post_save, sender=CallResponse)
+def count_saved_response(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    previous = instance._stats_call_status
+    if update_fields is not None and 'call_status' not in update_fields:
+        return
+    if created:
+        adjust_status_counts({instance.call_status: 1})
+    elif previous is not _UNKNOWN and instance.call_status != previous:
+        adjust_status_counts({previous: -1, instance.call_status: 1})
+    instance._stats_call_status = instance.call_status
+
+
+@receiver(pre_delete, sender=CallResponse)
+def load_deleted_call_status(sender, instance, **kwargs):
+    # A deferred call_status can only be read back while the row still exists
+    if instance._stats_call_status is _UNKNOWN:
+        instance._stats_call_status = instance.call_status
+
+
+@receiver(post_delete, sender=CallResponse)
+def count_deleted_response(sender, instance, **kwargs):
+    adjust_status_counts({instance._stats_call_status: -1})
+
+
+@receiver(post_save, sender=CallResponse)
+@receiver(post_delete, sender=CallResponse)
+def invalidate_cached_pages(sender, raw=False, **kwargs):
+    if not raw:
+        bump_data_version_on_commit()
+
+
+@receiver(post_save, sender=CallResponse)
+@receiver(post_delete, sender=CallResponse)
+def refresh_candidate_summary(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_candidates_on_commit([instance.phone_number])
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, using, **kwargs):
+    if sender.label != 'call':
+        return
+    connection = connections[using]
+    applied = MigrationRecorder(connection).applied_migrations()
+    if ('call', '0008_transcript_search_index') in applied:
+        install_search_index(connection)
@@ -0,0 +1,259 @@
+"""
+Local spool for CallResponse writes that fail while the database is unavailable.
+
+The call flow never waits on the database (see DATABASE_INDEPENDENT_SOLUTION.md),
+so when a write fails the operation is appended to a local file instead of being
+dropped. Each record is a 4-byte big-endian length followed by a compact JSON
+body. Appends only hit the OS page cache; a background thread fsyncs in batches
+so webhooks never block on the disk. The `replay_spool` management command
+drains the file back into the database once it is healthy again.
+
+Writers (web workers) and the drainer (a separate process) hand the file over
+with an `fcntl.flock` on it: the drainer renames the spool only while holding
+the lock, and a writer that then finds the path pointing at another inode
+reopens it, so no append can land in a file that has already been replayed.
+"""
+import atexit
+import fcntl
+import json
+import logging
+import os
+import struct
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct('>I')
+# Errors that mean the database is unavailable: the drain stops and retries
+# later. Any other error dead-letters the record so it cannot block the spool.
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+
+class Spool:
+    """Append-only, length-prefixed record file with batched fsync"""
+
+    def __init__(self, path, fsync_batch=64, fsync_interval=1.0):
+        self.path = Path(path)
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._file = None
+        self._unsynced = 0
+        self._wakeup = threading.Event()
+        self._flusher = None
+
+    def _open(self):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'ab')
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._flush_loop, name='call-spool-fsync', daemon=True)
+            self._flusher.start()
+        return self._file
+
+    def _locked_file(self):
+        """The open spool, flocked, reopened if a drainer has renamed it away"""
+        while True:
+            f = self._open()
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                if os.stat(self.path).st_ino == os.fstat(f.fileno()).st_ino:
+                    return f
+            except FileNotFoundError:
+                pass
+            fcntl.flock(f, fcntl.LOCK_UN)
+            f.close()
+            self._file = None
+            self._unsynced = 0
+
+    def append(self, record):
+        """Append one record; durability follows within `fsync_interval` seconds"""
+        data = json.dumps(record, separators=(',', ':'), default=str).encode('utf-8')
+        with self._lock:
+            f = self._locked_file()
+            try:
+                f.write(_HEADER.pack(len(data)) + data)
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_batch:
+                self._wakeup.set()
+
+    def sync(self):
+        with self._lock:
+            if self._file is not None and self._unsynced:
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+
+    def _flush_loop(self):
+        while True:
+            self._wakeup.wait(self.fsync_interval)
+            self._wakeup.clear()
+            try:
+                self.sync()
+            except Exception as e:
+                logger.error(f"Spool fsync failed: {e}")
+
+    def close(self):
+        self.sync()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def drain(self, apply, transient=TRANSIENT_ERRORS):
+        """
+        Feed every spooled record to `apply` and remove the spool afterwards;
+        returns (applied, dead-lettered) counts.
+
+        The live file is renamed under its flock so appends from any process
+        go to a fresh spool while the old one is replayed. If `apply` raises
+        one of `transient`, the renamed file is kept and the next drain carries
+        on from the failing record; a crash mid-drain starts the file over, so
+        `apply` must be idempotent. Records failing with any other error are
+        appended to the dead-letter file with the error and skipped.
+        """
+        draining = self.path.with_name(self.path.name + '.draining')
+        if not draining.exists():
+            if not self.path.exists():
+                return 0, 0
+            with open(self.path, 'ab') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                os.fsync(f.fileno())
+                os.replace(self.path, draining)
+
+        applied = dead = 0
+        for offset, record in _records(draining):
+            try:
+                apply(record)
+                applied += 1
+            except transient:
+                # Keep only the records from this one on, so the retry neither
+                # re-applies nor dead-letters again the records handled here
+                _drop_prefix(draining, offset)
+                raise
+            except Exception as e:
+                logger.error(f"Dead-lettering spooled {record.get('op')} for {record.get('lookup')}: {e}")
+                self.dead_letter(record, e)
+                dead += 1
+        draining.unlink()
+        return applied, dead
+
+    def dead_letter(self, record, error):
+        data = json.dumps(dict(record, error=f'{type(error).__name__}: {error}'),
+                          separators=(',', ':'), default=str).encode('utf-8')
+        with open(self.path.with_name(self.path.name + '.dead'), 'ab') as f:
+            f.write(_HEADER.pack(len(data)) + data)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _records(path):
+    """(offset, record) for each record of a spool file, ignoring a torn record at the tail"""
+    with open(path, 'rb') as f:
+        while True:
+            offset = f.tell()
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            (length,) = _HEADER.unpack(header)
+            data = f.read(length)
+            if len(data) < length:
+                logger.warning(f"Ignoring truncated spool record in {path}")
+                return
+            yield offset, json.loads(data)
+
+
+def read_records(path):
+    """Yield records from a spool file, ignoring a torn record at the tail"""
+    for _, record in _records(path):
+        yield record
+
+
+def _drop_prefix(path, offset):
+    """Atomically cut the first `offset` bytes from the file at `path`"""
+    if not offset:
+        return
+    partial = path.with_name(path.name + '.tmp')
+    with open(path, 'rb') as src, open(partial, 'wb') as dst:
+        src.seek(offset)
+        while True:
+            block = src.read(1 << 20)
+            if not block:
+                break
+            dst.write(block)
+        dst.flush()
+        os.fsync(dst.fileno())
+    os.replace(partial, path)
+
+
+_spool = None
+_spool_lock = threading.Lock()
+
+
+def get_spool():
+    global _spool
+    if _spool is None:
+        with _spool_lock:
+            if _spool is None:
+                _spool = Spool(
+                    settings.CALL_SPOOL_PATH,
+                    fsync_batch=settings.CALL_SPOOL_FSYNC_BATCH,
+                    fsync_interval=settings.CALL_SPOOL_FSYNC_INTERVAL,
+                )
+                atexit.register(_spool.close)
+    return _spool
+
+
+def spool_callresponse_write(op, lookup, values=None):
+    """
+    Record a CallResponse write that could not reach the database.
+
+    `op` is 'get_or_create' (create the row matching `lookup` with `values` as
+    defaults) or 'update' (set `values` on every row matching `lookup`). Never
+    raises: losing the spool record must not break the call flow either.
+    """
+    try:
+        get_spool().append({
+            'op': op,
+            'lookup': lookup,
+            'values': values or {},
+            'ts': timezone.now().isoformat(),
+        })
+    except Exception as e:
+        logger.error(f"Failed to spool CallResponse {op} for {lookup}: {e}")
+
+
+def replay_record(record):
+    """Apply one spooled record to the database; safe to run more than once"""
+    from .models import CallResponse
+    from .cache import bump_data_version_on_commit
+    from .candidates import refresh_candidates_on_commit
+    from .stats import update_call_status
+
+    op = record['op']
+    lookup = record['lookup']
+    values = dict(record.get('values') or {})
+    if op == 'get_or_create':
+        values.setdefault('created_at', parse_datetime(record['ts']))
+        CallResponse.objects.get_or_create(**lookup, defaults=values)
+    elif op == 'update':
+        queryset = CallResponse.objects.filter(**lookup)
+        if 'call_status' in values:
+            update_call_status(queryset, values.pop('call_status'))
+        if values:
+            # Like a save: bump updated_at for change feeds and rollups, and
+            # refresh the summaries update() would otherwise leave stale
+            phones = list(queryset.order_by().values_list('phone_number', flat=True).distinct())
+            queryset.update(**values, updated_at=timezone.now())
+            bump_data_version_on_commit()
+            refresh_candidates_on_commit(phones)
+    else:
+        raise ValueError(f"Unknown spool operation: {op}")
@@ -0,0 +1,78 @@
+"""
+Incrementally maintained CallResponse counters for the dashboard.
+
+CallStatusCount holds one row per call_status. Saves and deletes adjust it
+through the signal handlers in call.signals; bulk status changes must go through
+`update_call_status` because QuerySet.update() sends no signals (it also bumps
+the cache data version and refreshes the affected candidate summaries). The
+`rebuild_call_stats` command recomputes the table from scratch.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .cache import bump_data_version_on_commit
+from .candidates import refresh_candidates_on_commit
+from .models import CallResponse, CallStatusCount
+
+
+def _key(status):
+    return status or ''
+
+
+def adjust_status_counts(deltas):
+    """Apply {call_status: delta} to the counters"""
+    for status, delta in deltas.items():
+        if not delta:
+            continue
+        status = _key(status)
+        updated = CallStatusCount.objects.filter(call_status=status).update(count=F('count') + delta)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    CallStatusCount.objects.create(call_status=status, count=delta)
+            except IntegrityError:
+                # Another writer created the row first
+                CallStatusCount.objects.filter(call_status=status).update(count=F('count') + delta)
+
+
+def update_call_status(queryset, status):
+    """QuerySet.update(call_status=status) that keeps the counters in step"""
+    with transaction.atomic():
+        previous = (
+            queryset.exclude(call_status=status)
+            .order_by()
+            .values('call_status')
+            .annotate(n=Count('id'))
+        )
+        deltas = {}
+        for row in previous:
+            deltas[_key(row['call_status'])] = deltas.get(_key(row['call_status']), 0) - row['n']
+        moved = -sum(deltas.values())
+        if not moved:
+            return 0
+        phones = list(queryset.exclude(call_status=status).order_by().values_list('phone_number', flat=True).distinct())
+        queryset.exclude(call_status=status).update(call_status=status, updated_at=timezone.now())
+        deltas[_key(status)] = deltas.get(_key(status), 0) + moved
+        adjust_status_counts(deltas)
+        bump_data_version_on_commit()
+        refresh_candidates_on_commit(phones)
+    return moved
+
+
+def read_status_counts():
+    """{call_status: count} for every status, in a single query"""
+    return dict(CallStatusCount.objects.values_list('call_status', 'count'))
+
+
+def rebuild_status_counts():
+    """Recompute the counters from CallResponse; returns the new counts"""
+    counts = {}
+    for row in CallResponse.objects.order_by().values('call_status').annotate(n=Count('id')):
+        counts[_key(row['call_status'])] = counts.get(_key(row['call_status']), 0) + row['n']
+    with transaction.atomic():
+        CallStatusCount.objects.all().delete()
+        CallStatusCount.objects.bulk_create(
+            CallStatusCount(call_status=status, count=n) for status, n in counts.items()
+        )
+    return counts
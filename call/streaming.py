@@ -0,0 +1,71 @@
+"""
+Streaming response bodies that stay streamed under the ASGI server.
+
+Django serves a StreamingHttpResponse (and so a FileResponse) built on a
+synchronous iterator under ASGI by reading the whole iterator into a list
+first (StreamingHttpResponse.__aiter__), so every large download would be
+held in memory before its first byte is sent. `async_chunks` wraps a
+synchronous iterator in an async generator that pulls roughly CHUNK_BYTES at
+a time in Django's sync thread, where the ORM can run, and hands each batch
+to the event loop as it is produced.
+
+Under WSGI (runserver, the test client) Django consumes async iterators the
+same buffered way, so these helpers are meant for the ASGI deployment.
+"""
+import os
+
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+CHUNK_BYTES = 64 * 1024
+FILE_BLOCK_BYTES = 64 * 1024
+
+
+async def async_chunks(iterator, min_bytes=CHUNK_BYTES):
+    """Async generator over the str or bytes chunks of a synchronous iterator"""
+    iterator = iter(iterator)
+
+    def pull():
+        parts, size = [], 0
+        for part in iterator:
+            parts.append(part)
+            size += len(part)
+            if size >= min_bytes:
+                break
+        return parts
+
+    try:
+        while True:
+            parts = await sync_to_async(pull)()
+            if not parts:
+                return
+            for part in parts:
+                yield part
+    finally:
+        # Client gone or body finished: release the iterator's file or query
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+def read_file(f, start=0, length=None, block_size=FILE_BLOCK_BYTES):
+    """Blocks of the open binary file `f` from `start`, closing it when done"""
+    with f:
+        f.seek(start)
+        remaining = length if length is not None else float('inf')
+        while remaining > 0:
+            block = f.read(int(min(block_size, remaining)))
+            if not block:
+                return
+            remaining -= len(block)
+            yield block
+
+
+def file_response(f, filename, content_type):
+    """FileResponse(f, as_attachment=True, ...) streamed without buffering under ASGI"""
+    size = os.fstat(f.fileno()).st_size - f.tell()
+    response = StreamingHttpResponse(async_chunks(read_file(f, f.tell())), content_type=content_type)
+    response['Content-Length'] = str(size)
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    return response
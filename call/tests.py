@@ -1,3 +1,1102 @@
-from django.test import TestCase
+import fcntl
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import wave
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.core.management.sql import emit_post_migrate_signal
+from django.http import HttpResponse
+from django.db import OperationalError
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import views
+from .analytics import PERCENTILES, duration_distribution, weighted_percentiles
+from .archive import ArchiveReader
+from .audio import decode_wav, extract_features
+from .cache import bump_data_version, cache_stats, cached_fragment, data_version
+from .candidates import normalize_phone, rebuild_candidates, refresh_candidates, refresh_candidates_in_bulk
+from .exports import RAW_FIELDS, pivot_headers, pivot_rows
+from .incremental import MANIFEST, IncrementalExport
+from .imports import DumpImport, detect_kind
+from . import jobs
+from .jobs import run_export_job, submit_export
+from .journal import MAGIC, JournalReader, JournalWriter, journaled
+from .latency import call_turns, latency_report, update_turn_latency
+from .models import CallResponse, Candidate, DailyFunnel, ExportJob, HourlyFunnel, TurnLatency
+from .pagination import decode_cursor, encode_cursor, iterate_keyset, keyset_page, seek_filter
+from .rollups import update_rollups
+from .routers import SQLiteSnapshot
+from .scoring import KeywordScorer
+from .search import search_transcripts
+from .spool import Spool, read_records, replay_record
+from .stats import read_status_counts, rebuild_status_counts, update_call_status
+from .streaming import async_chunks
+
+
+def streamed_body(response):
+    """Body of a response streamed from an async iterator, read in a test"""
+    async def collect():
+        return b''.join([part async for part in response])
+    return async_to_sync(collect)()
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'call-tests'}})
+class CallTestCase(TestCase):
+    """Keeps tests off the shared file cache under BASE_DIR/cache"""
+
+
+class SpoolTests(CallTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'callresponse.spool'
+
+    def spool(self):
+        spool = Spool(self.path)
+        self.addCleanup(spool.close)
+        return spool
+
+    def test_drain_replays_records_in_order(self):
+        writer = self.spool()
+        for i in range(3):
+            writer.append({'n': i})
+        seen = []
+        self.assertEqual(self.spool().drain(lambda record: seen.append(record['n'])), (3, 0))
+        self.assertEqual(seen, [0, 1, 2])
+        self.assertFalse(self.path.with_name('callresponse.spool.draining').exists())
+
+    def test_appends_after_a_drain_go_to_the_new_spool(self):
+        # Two Spool objects hold separate open files, like a web worker and
+        # the replay_spool process
+        writer, drainer = self.spool(), self.spool()
+        writer.append({'n': 1})
+        seen = []
+        drainer.drain(lambda record: seen.append(record['n']))
+        writer.append({'n': 2})
+        self.assertEqual([record['n'] for record in read_records(self.path)], [2])
+        drainer.drain(lambda record: seen.append(record['n']))
+        self.assertEqual(seen, [1, 2])
+
+    def test_failing_record_is_dead_lettered(self):
+        writer = self.spool()
+        for i in range(3):
+            writer.append({'n': i})
+
+        def apply(record):
+            if record['n'] == 1:
+                raise ValueError('never applies')
+
+        self.assertEqual(self.spool().drain(apply), (2, 1))
+        dead = list(read_records(self.path.with_name('callresponse.spool.dead')))
+        self.assertEqual([record['n'] for record in dead], [1])
+        self.assertEqual(dead[0]['error'], 'ValueError: never applies')
+
+    def test_transient_error_keeps_the_spool(self):
+        writer = self.spool()
+        writer.append({'n': 1})
+
+        def unavailable(record):
+            raise OperationalError('database is locked')
+
+        with self.assertRaises(OperationalError):
+            self.spool().drain(unavailable)
+        seen = []
+        self.assertEqual(self.spool().drain(lambda record: seen.append(record['n'])), (1, 0))
+        self.assertEqual(seen, [1])
+
+    def test_retry_after_transient_error_does_not_repeat_records(self):
+        writer = self.spool()
+        for i in range(4):
+            writer.append({'n': i})
+        seen = []
+
+        def apply(record):
+            if record['n'] == 1:
+                raise ValueError('never applies')
+            if record['n'] == 2 and not seen.count(2):
+                seen.append(2)
+                raise OperationalError('database is locked')
+            seen.append(record['n'])
+
+        with self.assertRaises(OperationalError):
+            self.spool().drain(apply)
+        self.assertEqual(self.spool().drain(apply), (2, 0))
+        self.assertEqual(seen, [0, 2, 2, 3])
+        dead = list(read_records(self.path.with_name('callresponse.spool.dead')))
+        self.assertEqual([record['n'] for record in dead], [1])
+
+    def test_recording_status_spools_when_the_database_fails(self):
+        response = CallResponse.objects.create(phone_number='+15550003', call_sid='CA3', question='Q1')
+        client = mock.Mock()
+        client.calls.return_value.fetch.return_value = mock.Mock(status='in-progress', duration='40')
+        client.recordings.return_value.fetch.return_value = mock.Mock(uri='/RE3.json', duration='12')
+        client.transcriptions.list.return_value = []
+        request = RequestFactory().post(f'/recording-status/?response_id={response.id}',
+                                        {'RecordingSid': 'RE3', 'CallSid': 'CA3'})
+        # recording_status is not routed; Twilio reaches it only through its own callbacks
+        with mock.patch('call.views.Client', return_value=client), \
+                mock.patch('call.journal.get_writer'), \
+                mock.patch('call.views.spool_callresponse_write') as spool_write, \
+                mock.patch.object(CallResponse.objects, 'get', side_effect=OperationalError('database is locked')):
+            reply = views.recording_status(request)
+        self.assertEqual(reply.status_code, 200)
+        spool_write.assert_called_once_with('update', {'id': str(response.id)}, {
+            'recording_sid': 'RE3', 'recording_url': '/RE3.json', 'recording_duration': '12',
+            'call_status': 'in-progress', 'call_duration': '40', 'transcript_status': 'pending',
+        })
+
+    def test_replayed_update_is_a_change_event(self):
+        response = CallResponse.objects.create(phone_number='+15550001', call_sid='CA1', question='Q1')
+        stale = timezone.now() - timedelta(hours=1)
+        CallResponse.objects.filter(id=response.id).update(updated_at=stale)
+        with self.captureOnCommitCallbacks(execute=True):
+            replay_record({
+                'op': 'update',
+                'lookup': {'call_sid': 'CA1', 'question': 'Q1'},
+                'values': {'transcript': 'hello', 'transcript_status': 'completed'},
+                'ts': timezone.now().isoformat(),
+            })
+        response.refresh_from_db()
+        self.assertEqual(response.transcript, 'hello')
+        self.assertGreater(response.updated_at, stale)
+        candidate = Candidate.objects.get(phone_number='15550001')
+        self.assertEqual([row['transcript'] for row in candidate.latest_transcripts], ['hello'])
+
+    def test_replayed_get_or_create_is_idempotent(self):
+        record = {
+            'op': 'get_or_create',
+            'lookup': {'call_sid': 'CA2', 'question': 'Q1'},
+            'values': {'phone_number': '+15550002', 'call_status': 'in-progress'},
+            'ts': timezone.now().isoformat(),
+        }
+        replay_record(record)
+        replay_record(record)
+        self.assertEqual(CallResponse.objects.filter(call_sid='CA2').count(), 1)
+
+
+class KeysetPaginationTests(CallTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        start = timezone.now() - timedelta(days=1)
+        # Pairs of rows share a created_at, so the id tie-breaker matters
+        CallResponse.objects.bulk_create(
+            CallResponse(phone_number=f'+1555{i:04d}', created_at=start + timedelta(minutes=i // 2))
+            for i in range(25)
+        )
+        cls.ordering = ['-created_at', '-id']
+        cls.expected = list(CallResponse.objects.order_by(*cls.ordering).values_list('id', flat=True))
+
+    def test_pages_cover_every_row_once_in_order(self):
+        seen, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(CallResponse.objects.all(), self.ordering, cursor, 10)
+            seen += [row.id for row in rows]
+            if cursor is None:
+                break
+        self.assertEqual(seen, self.expected)
+
+    def test_pages_of_dicts(self):
+        rows, cursor = keyset_page(CallResponse.objects.values('id', 'created_at'), self.ordering, None, 10)
+        rows, _ = keyset_page(CallResponse.objects.values('id', 'created_at'), self.ordering, cursor, 10)
+        self.assertEqual([row['id'] for row in rows], self.expected[10:20])
+
+    def test_seek_filter_is_strictly_after(self):
+        anchor = CallResponse.objects.get(id=self.expected[7])
+        after = CallResponse.objects.filter(seek_filter(self.ordering, [anchor.created_at, anchor.id]))
+        self.assertEqual(list(after.order_by(*self.ordering).values_list('id', flat=True)), self.expected[8:])
+
+    def test_ascending_seek_filter(self):
+        ordering = ['created_at', 'id']
+        ascending = self.expected[::-1]
+        anchor = CallResponse.objects.get(id=ascending[4])
+        after = CallResponse.objects.filter(seek_filter(ordering, [anchor.created_at, anchor.id]))
+        self.assertEqual(list(after.order_by(*ordering).values_list('id', flat=True)), ascending[5:])
+
+    def test_cursor_round_trip(self):
+        now = timezone.now()
+        self.assertEqual(decode_cursor(encode_cursor([now, 42])), [now, 42])
+        self.assertIsNone(decode_cursor('not a cursor!'))
+        self.assertIsNone(decode_cursor(''))
+
+    def test_malformed_cursor_starts_from_the_top(self):
+        rows, _ = keyset_page(CallResponse.objects.all(), self.ordering, 'garbage', 5)
+        self.assertEqual([row.id for row in rows], self.expected[:5])
+
+    def test_iterate_keyset_in_chunks(self):
+        rows = list(iterate_keyset(CallResponse.objects.all(), self.ordering, ['id'], 4))
+        self.assertEqual([row[0] for row in rows], self.expected)
+
+
+class AsyncChunksTests(CallTestCase):
+    def collect(self, iterator, **kwargs):
+        async def run():
+            return [part async for part in async_chunks(iterator, **kwargs)]
+        return async_to_sync(run)()
+
+    def test_yields_every_chunk_in_order(self):
+        self.assertEqual(self.collect(iter(['a', 'bc', '', 'd']), min_bytes=2), ['a', 'bc', '', 'd'])
+
+    def test_pulls_lazily_and_closes_the_iterator(self):
+        pulled = []
+
+        def chunks():
+            try:
+                for i in range(100):
+                    pulled.append(i)
+                    yield b'x' * 10
+            finally:
+                pulled.append('closed')
+
+        async def first_part():
+            stream = async_chunks(chunks(), min_bytes=30)
+            part = await stream.__anext__()
+            await stream.aclose()
+            return part
+
+        self.assertEqual(async_to_sync(first_part)(), b'x' * 10)
+        self.assertEqual(pulled, [0, 1, 2, 'closed'])
+
+
+@override_settings(CALL_EXPORT_WORKERS=0)
+class ExportJobTests(CallTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_override = override_settings(CALL_EXPORT_DIR=directory.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        CallResponse.objects.create(phone_number='+15550100', call_sid='CA100', transcript='hello')
+
+    def test_live_job_is_reused(self):
+        job, reused = submit_export('csv', {})
+        self.assertFalse(reused)
+        again, reused = submit_export('csv', {})
+        self.assertEqual((again.id, reused), (job.id, True))
+
+    def test_stale_job_is_requeued_and_finishes(self):
+        job, _ = submit_export('csv', {})
+        ExportJob.objects.filter(id=job.id).update(
+            status='running', started_at=timezone.now(), updated_at=timezone.now() - timedelta(hours=1),
+        )
+        again, reused = submit_export('csv', {})
+        self.assertEqual((again.id, again.status, reused), (job.id, 'queued', True))
+        self.assertTrue(run_export_job(job.id))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+
+    @override_settings(CALL_EXPORT_KEEP_DAYS=7)
+    def test_workers_requeue_and_purge(self):
+        stale, _ = submit_export('csv', {})
+        ExportJob.objects.filter(id=stale.id).update(status='running', updated_at=timezone.now() - timedelta(hours=1))
+        expired = ExportJob.objects.create(format='csv', params={}, cache_key='old', status='done',
+                                           finished_at=timezone.now() - timedelta(days=8))
+        executor = mock.Mock()
+        with mock.patch.object(jobs, '_last_housekeeping', None), \
+                mock.patch.object(jobs, '_get_executor', return_value=executor):
+            jobs._housekeep()
+            jobs._housekeep()
+        executor.submit.assert_called_once_with(jobs._run_in_thread, stale.id)
+        self.assertEqual(ExportJob.objects.get(id=stale.id).status, 'queued')
+        self.assertFalse(ExportJob.objects.filter(id=expired.id).exists())
+
+    def test_download_honours_ranges(self):
+        job, _ = submit_export('csv', {})
+        run_export_job(job.id)
+        job.refresh_from_db()
+        with open(job.file_path, 'rb') as f:
+            content = f.read()
+        url = f'/exports/{job.id}/download/'
+        response = self.client.get(url)
+        self.assertEqual(streamed_body(response), content)
+        response = self.client.get(url, HTTP_RANGE='bytes=5-9')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 5-9/{len(content)}')
+        self.assertEqual(streamed_body(response), content[5:10])
+
+
+class ApiTests(CallTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        start = timezone.now() - timedelta(days=1)
+        for i in range(5):
+            response = CallResponse.objects.create(phone_number=f'+1555020{i}', call_sid=f'CA20{i}')
+            CallResponse.objects.filter(id=response.id).update(updated_at=start + timedelta(minutes=i))
+
+    def test_cursor_walks_changes_oldest_first(self):
+        first = self.client.get('/api/responses/', {'limit': 3}).json()
+        self.assertTrue(first['has_more'])
+        second = self.client.get('/api/responses/', {'limit': 3, 'cursor': first['next_cursor']}).json()
+        self.assertFalse(second['has_more'])
+        sids = [row['call_sid'] for row in first['results'] + second['results']]
+        self.assertEqual(sids, [f'CA20{i}' for i in range(5)])
+        # Nothing new: the poller keeps its cursor
+        empty = self.client.get('/api/responses/', {'cursor': second['next_cursor']}).json()
+        self.assertEqual((empty['results'], empty['next_cursor']), ([], second['next_cursor']))
+
+    def test_recent_changes_wait_out_the_lag(self):
+        last = self.client.get('/api/responses/').json()['next_cursor']
+        CallResponse.objects.create(phone_number='+15550299', call_sid='CA299')
+        self.assertEqual(self.client.get('/api/responses/', {'cursor': last}).json()['results'], [])
+        later = timezone.now() + timedelta(seconds=10)
+        with mock.patch('call.api.timezone.now', return_value=later):
+            page = self.client.get('/api/responses/', {'cursor': last}).json()
+        self.assertEqual([row['call_sid'] for row in page['results']], ['CA299'])
+
+    def test_invalid_cursor_is_rejected(self):
+        self.assertEqual(self.client.get('/api/responses/', {'cursor': 'garbage'}).status_code, 400)
+
+    def test_unchanged_page_is_not_modified(self):
+        response = self.client.get('/api/responses/', {'limit': 2})
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/api/responses/', {'limit': 2}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        CallResponse.objects.filter(call_sid='CA200').update(transcript='changed', updated_at=timezone.now())
+        self.assertEqual(self.client.get('/api/responses/', {'limit': 2}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_etag(self):
+        row_id = CallResponse.objects.get(call_sid='CA201').id
+        response = self.client.get(f'/api/responses/{row_id}/', {'fields': 'call_sid'})
+        self.assertEqual(response.json(), {'id': row_id, 'call_sid': 'CA201'})
+        again = self.client.get(f'/api/responses/{row_id}/', {'fields': 'call_sid'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+    @override_settings(CALL_API_TOKEN='secret')
+    def test_token_is_required(self):
+        self.assertEqual(self.client.get('/api/responses/').status_code, 401)
+        self.assertEqual(self.client.get('/api/responses/', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        self.assertEqual(self.client.get('/api/responses/', HTTP_AUTHORIZATION='Bearer secré').status_code, 401)
+        self.assertEqual(self.client.get('/api/responses/', HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
+
+
+class CandidateTests(CallTestCase):
+    call_sid = 'CA0123456789abcdef0123456789abcdef'
+
+    def setUp(self):
+        CallResponse.objects.create(phone_number='+15550300', call_sid='CA300', call_status='completed')
+        # transcription_webhook stores the call SID in phone_number
+        CallResponse.objects.create(phone_number=self.call_sid, call_sid=self.call_sid, transcript='hi')
+
+    def test_normalize_phone_rejects_call_sids(self):
+        self.assertEqual(normalize_phone('+1 (555) 0300'), '15550300')
+        self.assertEqual(normalize_phone(self.call_sid), '')
+        self.assertEqual(normalize_phone('1' * 16), '')
+
+    def test_refresh_skips_call_sids(self):
+        refresh_candidates(['+15550300', self.call_sid])
+        self.assertEqual(list(Candidate.objects.values_list('phone_number', flat=True)), ['15550300'])
+
+    def test_bulk_refresh_skips_call_sids(self):
+        refresh_candidates_in_bulk(['+15550300', self.call_sid])
+        candidate = Candidate.objects.get()
+        self.assertEqual((candidate.phone_number, candidate.completed_calls), ('15550300', 1))
+
+    def test_rebuild_drops_call_sid_candidates(self):
+        Candidate.objects.create(phone_number=normalize_phone('+15550300'))
+        Candidate.objects.create(phone_number='01234567890123456789')
+        self.assertEqual(rebuild_candidates(), 1)
+        self.assertEqual(list(Candidate.objects.values_list('phone_number', flat=True)), ['15550300'])
+
+
+class PivotExportTests(CallTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        start = timezone.now() - timedelta(days=1)
+        for n, call_sid in enumerate(['CA402', 'CA400', 'CA401']):
+            for i, question in enumerate(['Q1', 'Q2', 'Other']):
+                CallResponse.objects.create(
+                    phone_number=f'+155504{n:02d}', call_sid=call_sid, question=question,
+                    transcript=f'{call_sid} {question}' if question != 'Q2' else None,
+                    recording_duration=i + 1, created_at=start + timedelta(minutes=10 * n + i),
+                )
+        CallResponse.objects.create(phone_number='+15550499', question='Q1')
+
+    def test_one_row_per_call_across_chunks(self):
+        with mock.patch('call.exports.CHUNK_SIZE', 2):
+            rows = list(pivot_rows(CallResponse.objects.all(), ['Q1', 'Q2']))
+        self.assertEqual([row[0] for row in rows], ['CA400', 'CA401', 'CA402'])
+        started = CallResponse.objects.filter(call_sid='CA400', question='Q1').get().created_at
+        self.assertEqual(rows[0][1:], [
+            '+15550401', started.strftime('%Y-%m-%d %H:%M:%S'), 'CA400 Q1', 1, 'N/A', 2,
+        ])
+
+    def test_csv_download(self):
+        response = self.client.get('/export-pivot/')
+        lines = streamed_body(response).decode().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[1].startswith('CA400,'))
+
+    def test_headers(self):
+        self.assertEqual(pivot_headers(['Q1'])[3:], ['Q1: Q1', 'Q1 Recording Duration (seconds)'])
+
+
+@mock.patch('call.rollups.load_questions', return_value=['Q1', 'Q2'])
+class RollupTests(CallTestCase):
+    def setUp(self):
+        self.hour = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(days=1)
+        self.changed = timezone.now() - timedelta(minutes=5)
+        # CA500 answers both questions and completes; CA501 hangs up after Q1
+        self.add('CA500', 'Q1', minutes=10, duration=30, status='completed', transcribed=True)
+        self.add('CA500', 'Q2', minutes=12, duration=50, status='completed')
+        self.add('CA501', 'Q1', minutes=20, duration=10, status='no-answer')
+
+    def add(self, call_sid, question, minutes, duration, status, transcribed=False):
+        response = CallResponse.objects.create(
+            phone_number='+15550500', call_sid=call_sid, question=question,
+            recording_duration=duration, call_status=status,
+            transcript_status='completed' if transcribed else 'pending',
+            created_at=self.hour + timedelta(minutes=minutes),
+        )
+        CallResponse.objects.filter(id=response.id).update(updated_at=self.changed)
+        return response
+
+    def funnel(self, model=HourlyFunnel):
+        return {
+            row.step: (row.calls_reached, row.calls_completed, row.answers_timed,
+                       row.duration_total, row.transcripts_completed)
+            for row in model.objects.all()
+        }
+
+    def test_hourly_and_daily_funnel(self, load_questions):
+        self.assertEqual(update_rollups(), (2, 1, 1))
+        expected = {0: (2, 1, 0, 0, 0), 1: (2, 1, 2, 40, 1), 2: (1, 1, 1, 50, 0)}
+        self.assertEqual(self.funnel(), expected)
+        self.assertEqual(self.funnel(DailyFunnel), expected)
+
+    def test_late_change_rebuilds_its_bucket_once(self, load_questions):
+        update_rollups()
+        self.assertEqual(update_rollups(), (0, 0, 0))
+        CallResponse.objects.filter(call_sid='CA501').update(
+            transcript_status='completed', updated_at=timezone.now() - timedelta(minutes=1),
+        )
+        self.assertEqual(update_rollups(), (1, 1, 1))
+        self.assertEqual(self.funnel()[1], (2, 1, 2, 40, 2))
+
+    def test_recent_changes_wait_for_the_lag(self, load_questions):
+        CallResponse.objects.update(updated_at=timezone.now())
+        self.assertEqual(update_rollups(lag_seconds=60), (0, 0, 0))
+        self.assertEqual(update_rollups(lag_seconds=0), (2, 1, 1))
+
+
+class DurationAnalyticsTests(CallTestCase):
+    def test_weighted_percentiles_match_numpy(self):
+        rng = np.random.default_rng(46)
+        for size in (1, 2, 7, 50):
+            durations = rng.choice(np.arange(0, 120), size=size, replace=False).astype(np.float64)
+            counts = rng.integers(1, 20, size=size)
+            np.testing.assert_allclose(
+                weighted_percentiles(durations, counts),
+                np.percentile(np.repeat(durations, counts), PERCENTILES),
+            )
+
+    @mock.patch('call.analytics.load_questions', return_value=['Q2', 'Q1'])
+    def test_distribution_matches_numpy_over_rows(self, load_questions):
+        durations = {'Q1': [3, 3, 5, 8, 13, 30, 30, 30], 'Q2': [1, 2, 2, 40]}
+        for question, values in durations.items():
+            CallResponse.objects.bulk_create(
+                CallResponse(phone_number='+15550600', question=question, recording_duration=value)
+                for value in values
+            )
+        CallResponse.objects.create(phone_number='+15550600', question='Q1')
+        result = duration_distribution('recording_duration', 'question', bins=4)
+
+        everything = sum(durations.values(), [])
+        overall = result['overall']
+        self.assertEqual(overall['count'], len(everything))
+        self.assertEqual(
+            list(overall['percentiles'].values()),
+            [round(float(value), 2) for value in np.percentile(everything, PERCENTILES)],
+        )
+        self.assertEqual(overall['histogram'], np.histogram(everything, result['bin_edges'])[0].tolist())
+        self.assertEqual(overall['at_limit'], round(4 / 12, 4))
+        self.assertEqual([group['key'] for group in result['groups']], ['Q2', 'Q1'])
+        self.assertEqual(result['groups'][1]['percentiles']['p50'], float(np.median(durations['Q1'])))
+
+    def test_empty_distribution(self):
+        result = duration_distribution('call_duration')
+        self.assertEqual(result['overall']['count'], 0)
+        self.assertIsNone(result['overall']['percentiles']['p50'])
+
+
+class ScoreTranscriptsTests(CallTestCase):
+    def test_rescoring_is_a_change_event(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / 'keywords.json'
+        path.write_text(json.dumps({'default': {'python': 3, 'django': 2}}))
+        response = CallResponse.objects.create(phone_number='+15550700', transcript='Python and Django')
+        stale = timezone.now() - timedelta(hours=1)
+        CallResponse.objects.filter(id=response.id).update(updated_at=stale)
+        with override_settings(CALL_KEYWORDS_PATH=str(path), CALL_SCORING_ROLE='default'):
+            call_command('score_transcripts', workers=1, stdout=io.StringIO())
+        response.refresh_from_db()
+        self.assertEqual(response.keyword_score, 5)
+        self.assertGreater(response.updated_at, stale)
+
+
+class KeywordScorerTests(CallTestCase):
+    def test_case_variants_score_their_phrase(self):
+        scorer = KeywordScorer({'SQL': 2, 'kit': 1, 'Straße': 4, 'team lead': 3})
+        self.assertEqual(scorer.score('ſql, KİT, STRASSE and Team\n Lead'), (10, ['kit', 'sql', 'strasse', 'team lead']))
+
+    def test_scoring_errors_do_not_block_the_transcript(self):
+        with mock.patch.object(KeywordScorer, 'score', side_effect=KeyError('x')):
+            self.assertEqual(KeywordScorer({'sql': 1}).fields('sql'), {})
+            response = self.client.post('/transcription/', {
+                'TranscriptionText': 'I know SQL', 'CallSid': 'CA800', 'RecordingSid': 'RE800',
+            })
+        self.assertEqual(response.status_code, 200)
+        stored = CallResponse.objects.get(recording_sid='RE800')
+        self.assertEqual((stored.transcript, stored.keyword_version), ('I know SQL', ''))
+
+
+class AudioFeatureTests(CallTestCase):
+    rate = 8000
+
+    def signal(self):
+        """0.5 s noise, 1 s tone, 0.5 s noise, 0.5 s tone, 0.5 s noise"""
+        rng = np.random.default_rng(48)
+        t = np.arange(self.rate) / self.rate
+        tone = 0.5 * np.sin(2 * np.pi * 400 * t).astype(np.float32)
+
+        def noise(seconds):
+            return rng.normal(0, 1e-3, int(seconds * self.rate)).astype(np.float32)
+
+        return np.concatenate([noise(0.5), tone, noise(0.5), tone[:self.rate // 2], noise(0.5)])
+
+    def test_features_of_a_synthetic_signal(self):
+        features = extract_features(self.signal(), self.rate)
+        self.assertEqual(features['duration_seconds'], 3.0)
+        self.assertEqual(features['sample_rate'], self.rate)
+        self.assertEqual(features['speech_ratio'], 0.5)
+        # From the first to the last tone frame, minus the 0.5 s gap
+        self.assertEqual(features['speaking_seconds'], 1.5)
+        self.assertEqual(features['silence_gaps'], 1)
+        self.assertEqual(features['longest_silence_seconds'], 0.5)
+        self.assertAlmostEqual(features['loudness_dbfs'], 10 * np.log10(0.125), places=1)
+        self.assertAlmostEqual(features['peak_dbfs'], 20 * np.log10(0.5), places=1)
+
+    def test_silence_and_short_input(self):
+        silent = extract_features(np.zeros(self.rate, dtype=np.float32), self.rate)
+        self.assertEqual((silent['speech_ratio'], silent['silence_gaps']), (0.0, 0))
+        self.assertIsNone(silent['loudness_dbfs'])
+        short = extract_features(np.ones(10, dtype=np.float32), self.rate)
+        self.assertIsNone(short['peak_dbfs'])
+
+    def test_decoded_wav_gives_the_same_features(self):
+        samples = self.signal()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = str(Path(directory.name) / 'RE1.wav')
+        with wave.open(path, 'wb') as f:
+            f.setnchannels(2)
+            f.setsampwidth(2)
+            f.setframerate(self.rate)
+            pcm = np.round(samples * (2 ** 15 - 1)).astype('<i2')
+            f.writeframes(np.repeat(pcm, 2).tobytes())
+        decoded, rate = decode_wav(path)
+        self.assertEqual((len(decoded), rate), (len(samples), self.rate))
+        features = extract_features(decoded, rate)
+        self.assertEqual(features['speaking_seconds'], 1.5)
+        self.assertEqual(features['silence_gaps'], 1)
+
+
+class TurnLatencyTests(CallTestCase):
+    def events(self, start=1000.0):
+        """answer, the redirect to q=0, then questions 1-3 answered about 9-10 s apart"""
+        return [
+            (start, 'answer', {'ms': 5, 'deploy': 'abc'}),
+            (start + 0.105, 'voice', {'ms': 10, 'GET': {'q': '0'}}),
+            (start + 1, 'voice', {'ms': 20, 'GET': {'q': '1'}}),
+            # Journaled before server times were recorded
+            (start + 5, 'voice', {'GET': {'q': '2'}}),
+            (start + 10, 'voice', {'ms': 30, 'deploy': 'abc', 'GET': {'q': '2'}, 'POST': {'RecordingDuration': '3'}}),
+            (start + 20, 'voice', {'ms': 40, 'deploy': 'abc', 'GET': {'q': '3'}}),
+        ]
+
+    def test_call_turns(self):
+        turns = {turn.step: turn for turn in call_turns('CA800', self.events())}
+        self.assertEqual(sorted(turns), [1, 2])
+        first = turns[1]
+        self.assertEqual(
+            (first.server_ms, first.hop_ms, first.recording_ms, first.turn_ms, first.dead_air_ms),
+            (30, 100, 3000, 8980, 5130),
+        )
+        self.assertEqual((turns[2].turn_ms, turns[2].dead_air_ms, turns[2].recording_ms), (9970, 5140, None))
+        self.assertEqual(first.deployment, 'abc')
+
+    def test_no_hop_without_the_answer_redirect(self):
+        turns = call_turns('CA801', self.events()[2:])
+        self.assertEqual([(turn.step, turn.hop_ms, turn.dead_air_ms) for turn in turns], [(1, None, None), (2, None, None)])
+
+    @mock.patch('call.latency.load_questions', return_value=['Q1', 'Q2', 'Q3'])
+    def test_update_from_the_journal_and_report(self, load_questions):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        writer = JournalWriter(directory.name, 1024 * 1024)
+        self.addCleanup(writer.close)
+        start = timezone.now().timestamp() - 60
+        for timestamp, route, payload in self.events(start):
+            writer.append(timestamp, route, 'CA802', payload)
+        writer.append(start, 'recording_status', 'CA802', {'ms': 1})
+
+        self.assertEqual(update_turn_latency(since=0, directory=directory.name), (1, 2))
+        # Rescanning the same events upserts the same turns
+        self.assertEqual(update_turn_latency(since=0, directory=directory.name), (1, 2))
+        self.assertEqual(TurnLatency.objects.count(), 2)
+
+        report = latency_report()
+        self.assertEqual([(row['key'], row['question']) for row in report['questions']], [(1, 'Q1'), (2, 'Q2')])
+        self.assertEqual(report['deployments'][0]['dead_air_ms_p50'], 5135)
+
+
+@mock.patch('call.imports.load_questions', return_value=['Q1', 'Q2'])
+class DumpImportTests(CallTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.calls = self.write('calls.csv', (
+            'Call Sid,From,To,Direction,Status,Duration\n'
+            'CA900,+15550900,+15559999,inbound,completed,95\n'
+        ))
+        self.recordings = self.write('recordings.json', json.dumps({'recordings': [
+            {'sid': 'RE902', 'call_sid': 'CA900', 'duration': '20', 'start_time': '2026-10-01T10:02:00Z'},
+            {'sid': 'RE901', 'call_sid': 'CA900', 'duration': '12', 'start_time': '2026-10-01T10:01:00Z'},
+        ], 'next_page_uri': None}))
+        self.transcriptions = self.write('transcriptions.jsonl', (
+            '{"RecordingSid": "RE901", "TranscriptionText": "first answer", "Status": "completed"}\n'
+            '{"RecordingSid": "RE999", "TranscriptionText": "no recording", "Status": "completed"}\n'
+        ))
+
+    def write(self, name, content):
+        path = self.directory / name
+        path.write_text(content)
+        return str(path)
+
+    def test_detect_kind(self, load_questions):
+        kinds = [detect_kind(path) for path in (self.calls, self.recordings, self.transcriptions)]
+        self.assertEqual(kinds, ['calls', 'recordings', 'transcriptions'])
+
+    def test_import_dumps(self, load_questions):
+        counts = DumpImport(chunk_size=1).run({
+            self.transcriptions: 'transcriptions', self.recordings: 'recordings', self.calls: 'calls',
+        })
+        self.assertEqual(counts, {'calls': 1, 'recordings': 2, 'transcriptions': 1, 'skipped': 1})
+        rows = CallResponse.objects.order_by('created_at').values_list(
+            'recording_sid', 'phone_number', 'call_status', 'call_duration', 'question', 'transcript',
+        )
+        self.assertEqual(list(rows), [
+            ('RE901', '+15550900', 'completed', 95, 'Q1', 'first answer'),
+            ('RE902', '+15550900', 'completed', 95, 'Q2', None),
+        ])
+        candidate = Candidate.objects.get(phone_number='15550900')
+        self.assertEqual((candidate.call_count, candidate.response_count), (1, 2))
+        self.assertEqual([row['question'] for row in candidate.latest_transcripts], ['Q1'])
+
+    def test_transcription_only_import_is_a_change_event(self, load_questions):
+        DumpImport().run({self.calls: 'calls', self.recordings: 'recordings'})
+        stale = timezone.now() - timedelta(hours=1)
+        CallResponse.objects.update(updated_at=stale)
+        self.assertEqual(Candidate.objects.get().latest_transcripts, [])
+
+        DumpImport().run({self.transcriptions: 'transcriptions'})
+        response = CallResponse.objects.get(recording_sid='RE901')
+        self.assertGreater(response.updated_at, stale)
+        self.assertEqual([row['transcript'] for row in Candidate.objects.get().latest_transcripts], ['first answer'])
+
+    def test_assigned_questions_bump_updated_at(self, load_questions):
+        DumpImport().run({self.calls: 'calls'})
+        # Recorded before the dumped recordings, so it answers the first question
+        response = CallResponse.objects.create(
+            phone_number='+15550900', call_sid='CA900', recording_sid='RE900',
+            created_at=parse_datetime('2026-10-01T10:00:00Z'),
+        )
+        stale = timezone.now() - timedelta(hours=1)
+        CallResponse.objects.filter(id=response.id).update(updated_at=stale)
+        DumpImport().run({self.recordings: 'recordings'})
+        response.refresh_from_db()
+        self.assertEqual(response.question, 'Q1')
+        self.assertGreater(response.updated_at, stale)
+
+
+class ArchiveTests(CallTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        old = timezone.now() - timedelta(days=100)
+        # +15551000 only has old calls, +15551001 has one old and one recent
+        for i, (phone, days_ago, status) in enumerate([
+            ('+15551000', 100, 'completed'), ('+15551000', 99, 'completed'),
+            ('+15551001', 98, 'no-answer'), ('+15551001', 1, 'completed'),
+        ]):
+            CallResponse.objects.create(
+                phone_number=phone, call_sid=f'CA100{i}', call_status=status, transcript=f'answer {i}',
+                created_at=timezone.now() - timedelta(days=days_ago),
+            )
+        rebuild_status_counts()
+        rebuild_candidates()
+        self.old = old
+
+    def archive(self, **options):
+        call_command('archive_responses', older_than_days=30, batch_size=2, dir=self.directory,
+                     stdout=io.StringIO(), **options)
+
+    def test_dry_run_changes_nothing(self):
+        self.archive(dry_run=True)
+        self.assertEqual(CallResponse.objects.count(), 4)
+        self.assertEqual(list(ArchiveReader(self.directory).segments()), [])
+
+    def test_rows_move_to_segments(self):
+        self.archive()
+        self.assertEqual(list(CallResponse.objects.values_list('call_sid', flat=True)), ['CA1003'])
+        reader = ArchiveReader(self.directory)
+        self.assertEqual([index['rows'] for _, index in reader.segments()], [2, 1])
+        self.assertEqual([row['call_sid'] for row in reader.query()], ['CA1000', 'CA1001', 'CA1002'])
+        self.assertEqual([row['call_sid'] for row in reader.query(phone_number='+15551001')], ['CA1002'])
+        day = (self.old + timedelta(days=1)).date()
+        self.assertEqual([row['call_sid'] for row in reader.query(since=day, until=day)], ['CA1001'])
+        self.assertEqual(next(reader.query(limit=1))['created_at'].date(), self.old.date())
+
+    def test_live_summaries_follow_the_live_table(self):
+        self.archive()
+        self.assertEqual(read_status_counts(), {'completed': 1, 'no-answer': 0})
+        candidate = Candidate.objects.get()
+        self.assertEqual((candidate.phone_number, candidate.response_count), ('15551001', 1))
+        self.assertEqual([row['transcript'] for row in candidate.latest_transcripts], ['answer 3'])
+        # Exactly what the rebuild commands compute from the live table
+        self.assertEqual(rebuild_candidates(), 1)
+        self.assertEqual(Candidate.objects.get().response_count, 1)
+        self.assertEqual(rebuild_status_counts(), {'completed': 1})
+
+
+class ReplicaSnapshotTests(CallTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.primary = self.directory / 'primary.sqlite3'
+        self.target = self.directory / 'replica.sqlite3'
+        with sqlite3.connect(self.primary) as db:
+            db.execute('CREATE TABLE t (id INTEGER PRIMARY KEY, body TEXT)')
+            db.executemany('INSERT INTO t (body) VALUES (?)', (('x' * 200,) for _ in range(20000)))
+
+    def rows(self, path):
+        with sqlite3.connect(path) as db:
+            return db.execute('SELECT COUNT(*) FROM t').fetchone()[0]
+
+    def test_refresh_copies_the_primary(self):
+        self.assertTrue(SQLiteSnapshot().refresh(self.primary, self.target))
+        self.assertEqual(self.rows(self.target), 20000)
+        self.assertEqual(sorted(path.name for path in self.directory.iterdir()),
+                         ['primary.sqlite3', 'replica.sqlite3', 'replica.sqlite3.lock'])
+
+    def test_writes_get_in_between_backup_steps(self):
+        steps = []
+
+        def write_between_steps(status, remaining, total):
+            steps.append(remaining)
+            if len(steps) <= 3:
+                # timeout=0: fails at once if the backup still held the primary
+                writer = sqlite3.connect(self.primary, timeout=0)
+                try:
+                    with writer:
+                        writer.execute("INSERT INTO t (body) VALUES ('late')")
+                finally:
+                    writer.close()
+
+        with mock.patch('call.routers._pause', write_between_steps):
+            self.assertTrue(SQLiteSnapshot().refresh(self.primary, self.target))
+        self.assertGreater(len(steps), 3)
+        # The backup restarts after a write, so the snapshot includes all of them
+        self.assertEqual(self.rows(self.target), 20003)
+
+    def test_failed_refresh_leaves_no_temporary_file(self):
+        self.primary.write_bytes(b'not a database' * 1000)
+        with self.assertRaises(sqlite3.DatabaseError):
+            SQLiteSnapshot().refresh(self.primary, self.target)
+        self.assertEqual(sorted(path.name for path in self.directory.iterdir()),
+                         ['primary.sqlite3', 'replica.sqlite3.lock'])
+
+    def test_only_one_refresh_at_a_time(self):
+        with open(f'{self.target}.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.assertFalse(SQLiteSnapshot().refresh(self.primary, self.target))
+        self.assertFalse(self.target.exists())
+
+
+class JournalTests(CallTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def writer(self, segment_bytes=1024 * 1024):
+        writer = JournalWriter(self.directory, segment_bytes)
+        self.addCleanup(writer.close)
+        return writer
+
+    def test_segments_rotate_and_read_back_in_order(self):
+        writer = self.writer(segment_bytes=200)
+        for i in range(10):
+            writer.append(1000.0 + i, 'voice', f'CA30{i % 2}', {'ms': i, 'GET': {'q': str(i)}})
+        reader = JournalReader(self.directory)
+        self.assertGreater(len(reader.segments()), 1)
+        events = list(reader.events())
+        self.assertEqual([event.payload['ms'] for event in events], list(range(10)))
+        self.assertEqual(events[3].call_sid, 'CA301')
+        self.assertEqual(events[3].route, 'voice')
+
+    def test_filters(self):
+        writer = self.writer()
+        writer.append(1000.0, 'answer', 'CA310', {'ms': 1})
+        writer.append(1001.0, 'voice', 'CA310', {'ms': 2})
+        writer.append(1002.0, 'voice', 'CA311', None)
+        reader = JournalReader(self.directory)
+        self.assertEqual([e.timestamp for e in reader.events(call_sid='CA310')], [1000.0, 1001.0])
+        self.assertEqual([e.call_sid for e in reader.events(route='voice')], ['CA310', 'CA311'])
+        self.assertEqual([e.timestamp for e in reader.events(since=1001.0)], [1001.0, 1002.0])
+        self.assertEqual(list(reader.events(route='voice', since=1002.0))[0].payload, {})
+
+    def test_torn_tail_and_bad_segments_are_skipped(self):
+        writer = self.writer()
+        writer.append(1000.0, 'voice', 'CA320', {'ms': 1})
+        writer.append(1001.0, 'voice', 'CA320', {'ms': 2})
+        writer.close()
+        segment = JournalReader(self.directory).segments()[0]
+        with open(segment, 'r+b') as f:
+            f.truncate(segment.stat().st_size - 3)
+        (self.directory / 'events-0-1.seg').write_bytes(b'NOTAJRNL' + b'x' * 40)
+        (self.directory / 'events-0-2.seg').write_bytes(MAGIC)
+        self.assertEqual([e.payload['ms'] for e in JournalReader(self.directory).events()], [1])
+
+    def test_timeline_sorts_events_from_several_writers(self):
+        first, second = self.writer(), self.writer()
+        first.append(1002.0, 'voice', 'CA330', {'ms': 3})
+        second.append(1001.0, 'answer', 'CA330', {'ms': 2})
+        self.assertEqual([e.route for e in JournalReader(self.directory).timeline('CA330')], ['answer', 'voice'])
+
+    @override_settings(CALL_DEPLOYMENT='abc123')
+    def test_journaled_view_records_the_request(self):
+        writer = self.writer()
+        view = journaled('answer')(lambda request: HttpResponse('ok'))
+        request = RequestFactory().post('/answer/?x=1', {'CallSid': 'CA340', 'From': '+15550340'})
+        with mock.patch('call.journal.get_writer', return_value=writer):
+            self.assertEqual(view(request).content, b'ok')
+        (event,) = JournalReader(self.directory).events()
+        self.assertEqual((event.route, event.call_sid), ('answer', 'CA340'))
+        self.assertEqual(event.payload['GET'], {'x': '1'})
+        self.assertEqual(event.payload['POST'], {'CallSid': 'CA340', 'From': '+15550340'})
+        self.assertEqual(event.payload['deploy'], 'abc123')
+        self.assertIn('ms', event.payload)
+
+
+class StatusCountTests(CallTestCase):
+    def counts(self):
+        return {status: count for status, count in read_status_counts().items() if count}
+
+    def test_signals_keep_the_counters(self):
+        first = CallResponse.objects.create(phone_number='+15550500', call_status='in-progress')
+        CallResponse.objects.create(phone_number='+15550501', call_status='in-progress')
+        CallResponse.objects.create(phone_number='+15550502')
+        self.assertEqual(self.counts(), {'in-progress': 2, '': 1})
+
+        first.call_status = 'completed'
+        first.save()
+        self.assertEqual(self.counts(), {'in-progress': 1, 'completed': 1, '': 1})
+        # Saving again, or saving other fields only, moves nothing
+        first.save()
+        first.transcript = 'hello'
+        first.save(update_fields=['transcript'])
+        self.assertEqual(self.counts(), {'in-progress': 1, 'completed': 1, '': 1})
+
+        first.delete()
+        self.assertEqual(self.counts(), {'in-progress': 1, '': 1})
+
+    def test_deferred_status_is_read_back_on_delete(self):
+        response = CallResponse.objects.create(phone_number='+15550510', call_status='completed')
+        CallResponse.objects.only('id', 'phone_number').get(id=response.id).delete()
+        self.assertEqual(self.counts(), {})
+
+    def test_update_call_status_moves_counts(self):
+        for status in ('in-progress', 'in-progress', 'completed'):
+            CallResponse.objects.create(phone_number='+15550520', call_sid='CA520', call_status=status)
+        self.assertEqual(update_call_status(CallResponse.objects.filter(call_sid='CA520'), 'completed'), 2)
+        self.assertEqual(self.counts(), {'completed': 3})
+        self.assertEqual(update_call_status(CallResponse.objects.filter(call_sid='CA520'), 'completed'), 0)
+
+    def test_rebuild_matches_the_table(self):
+        CallResponse.objects.create(phone_number='+15550530', call_status='failed')
+        # Bulk writes bypass the signals; rebuild catches up
+        CallResponse.objects.bulk_create([CallResponse(phone_number='+15550531', call_status='failed')])
+        self.assertEqual(self.counts(), {'failed': 1})
+        self.assertEqual(rebuild_status_counts(), {'failed': 2})
+        self.assertEqual(self.counts(), {'failed': 2})
+
+
+@mock.patch('call.views.load_questions', return_value=['Q1', 'Q2'])
+class CallListTests(CallTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        start = timezone.now() - timedelta(days=2)
+        for i in range(30):
+            for j, question in enumerate(['Q1', 'Q2']):
+                CallResponse.objects.create(
+                    phone_number=f'+1555060{i % 3}', call_sid=f'CA6{i:03d}', question=question,
+                    recording_duration=10, call_status='completed' if i % 2 else 'in-progress',
+                    transcript_status='completed' if j == 0 else 'pending',
+                    created_at=start + timedelta(minutes=10 * i + j),
+                )
+
+    def test_pages_of_calls(self, load_questions):
+        response = self.client.get('/dashboard/calls/')
+        calls = response.context['calls']
+        self.assertEqual([call['call_sid'] for call in calls], [f'CA6{i:03d}' for i in range(25)])
+        first = calls[1]
+        self.assertEqual(
+            (first['question_count'], first['total_recording_duration'], first['transcript_completeness'],
+             first['final_status'], len(first['answers'])),
+            (2, 20, 50, 'completed', 2),
+        )
+        cursor = response.context['next_page_query'].split('after=')[1]
+        calls = self.client.get('/dashboard/calls/', {'after': cursor}).context['calls']
+        self.assertEqual([call['call_sid'] for call in calls], [f'CA6{i:03d}' for i in range(25, 30)])
+
+    def test_only_the_page_is_aggregated(self, load_questions):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/dashboard/calls/', {'phone': '15550601'})
+        grouped = [query['sql'] for query in queries if 'GROUP BY' in query['sql']]
+        self.assertEqual(len(grouped), 1)
+        self.assertIn('"call_sid" IN (', grouped[0])
+        calls = self.client.get('/dashboard/calls/', {'phone': '15550601'}).context['calls']
+        self.assertEqual(len(calls), 10)
+
+
+class CacheTests(CallTestCase):
+    def test_bump_changes_the_version_and_misses(self):
+        builds = []
+        def build():
+            builds.append(1)
+            return 'body'
+        self.assertEqual(cached_fragment('response-page', 'x', build), 'body')
+        self.assertEqual(cached_fragment('response-page', 'x', build), 'body')
+        version = data_version()
+        bump_data_version()
+        self.assertNotEqual(data_version(), version)
+        cached_fragment('response-page', 'x', build)
+        self.assertEqual(len(builds), 2)
+
+    def test_counts_in_memory_without_redis(self):
+        hits, misses = cache_stats()['response-page']
+        with mock.patch('call.cache.cache.incr') as incr:
+            cached_fragment('response-page', 'y', lambda: 'body')
+            cached_fragment('response-page', 'y', lambda: 'body')
+        incr.assert_not_called()
+        self.assertEqual(cache_stats()['response-page'], (hits + 1, misses + 1))
+
+
+class SearchTests(CallTestCase):
+    def found(self, query):
+        return [hit.response.call_sid for hit in search_transcripts(query)]
+
+    def test_triggers_follow_every_write(self):
+        response = CallResponse.objects.create(phone_number='+15550900', call_sid='CA900', transcript='I know Python')
+        CallResponse.objects.create(phone_number='+15550901', call_sid='CA901')
+        self.assertEqual(self.found('python'), ['CA900'])
+        response.transcript = 'I know Django'
+        response.save()
+        self.assertEqual(self.found('python'), [])
+        self.assertEqual(self.found('django'), ['CA900'])
+        CallResponse.objects.filter(call_sid='CA901').update(transcript='Django too')
+        self.assertEqual(sorted(self.found('django')), ['CA900', 'CA901'])
+        response.delete()
+        self.assertEqual(self.found('django'), ['CA901'])
+
+    def test_snippet_is_escaped_and_query_is_not_fts_syntax(self):
+        CallResponse.objects.create(phone_number='+15550902', call_sid='CA902', transcript='<b>SQL</b> and NEAR joins')
+        hit, = search_transcripts('sql" NEAR(')
+        self.assertIn('&lt;b&gt;<mark>SQL</mark>&lt;/b&gt;', hit.snippet)
+
+    def test_post_migrate_restores_dropped_triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER call_transcript_fts_ai')
+        CallResponse.objects.create(phone_number='+15550903', call_sid='CA903', transcript='missed while rebuilt')
+        self.assertEqual(self.found('rebuilt'), [])
+        emit_post_migrate_signal(verbosity=0, interactive=False, db='default')
+        self.assertEqual(self.found('rebuilt'), ['CA903'])
+        CallResponse.objects.create(phone_number='+15550904', call_sid='CA904', transcript='indexed again')
+        self.assertEqual(self.found('indexed'), ['CA904'])
+
+
+class IncrementalExportTests(CallTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.responses = [
+            CallResponse.objects.create(phone_number=f'+1555100{i}', call_sid=f'CA100{i}', transcript=f'v1 {i}')
+            for i in range(3)
+        ]
+
+    def files(self):
+        return sorted(name for name in os.listdir(self.directory) if name != MANIFEST)
+
+    def latest(self, export):
+        transcripts = {}
+        for part in [export.manifest['base']] + export.manifest['deltas']:
+            for row in export._read(part['file']):
+                transcripts[row[RAW_FIELDS.index('call_sid')]] = row[RAW_FIELDS.index('transcript')]
+        return transcripts
+
+    def test_deltas_then_compaction_keep_the_latest_version(self):
+        export = IncrementalExport(self.directory)
+        self.assertEqual(export.export_changes(lag_seconds=0)['rows'], 3)
+        first = self.responses[0]
+        first.transcript = 'v2 0'
+        first.save()
+        CallResponse.objects.create(phone_number='+15551003', call_sid='CA1003', transcript='v1 3')
+        self.assertEqual(export.export_changes(lag_seconds=0)['rows'], 2)
+        first.transcript = 'v3 0'
+        first.save()
+        self.assertEqual(export.export_changes(lag_seconds=0)['rows'], 1)
+        self.assertIsNone(export.export_changes(lag_seconds=0))
+        before = self.latest(export)
+
+        base = export.compact()
+        self.assertEqual(base['rows'], 4)
+        self.assertEqual(self.files(), [base['file']])
+        reopened = IncrementalExport(self.directory)
+        self.assertEqual(reopened.manifest['deltas'], [])
+        self.assertEqual(self.latest(reopened), before)
+        self.assertEqual(before['CA1000'], 'v3 0')
+        # Part names keep counting upwards after compaction
+        self.assertEqual(base['file'], 'base-000004.csv')
+
+    def test_recent_changes_wait_for_the_next_run(self):
+        export = IncrementalExport(self.directory)
+        self.assertIsNone(export.export_changes(lag_seconds=60))
+        self.assertEqual(self.files(), [])
+        self.assertEqual(export.export_changes(lag_seconds=0)['rows'], 3)
+
+    def test_command_exports_and_compacts(self):
+        call_command('export_incremental', dir=self.directory, lag_seconds=0, stdout=io.StringIO())
+        self.responses[1].transcript = 'v2 1'
+        self.responses[1].save()
+        out = io.StringIO()
+        call_command('export_incremental', dir=self.directory, lag_seconds=0, compact=True, stdout=out)
+        self.assertIn('Compacted into', out.getvalue())
+        export = IncrementalExport(self.directory)
+        self.assertEqual(len(self.files()), 1)
+        self.assertEqual(self.latest(export)['CA1001'], 'v2 1')
@@ -1,14 +1,27 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('', views.index, name='index'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/calls/', views.call_list, name='call_list'),
+    path('dashboard/stream/', views.dashboard_stream, name='dashboard_stream'),
+    path('dashboard/funnel/', views.funnel, name='funnel'),
+    path('dashboard/latency/', views.latency, name='latency'),
     path('make-call/', views.make_call, name='make_call'),
     path('answer/', views.answer, name='answer'),
     path('voice/', views.voice, name='voice'),
     path('test-config/', views.test_config, name='test_config'),
+    path('candidates/<str:phone_number>/', views.candidate_profile, name='candidate_profile'),
     path('view-response/<int:response_id>/', views.view_response, name='view_response'),
     path('export-excel/', views.export_to_excel, name='export_excel'),
+    path('export-csv/', views.export_to_csv, name='export_csv'),
+    path('export-pivot/', views.export_pivot, name='export_pivot'),
+    path('exports/', views.export_jobs, name='export_jobs'),
+    path('exports/<int:job_id>/status/', views.export_job_status, name='export_job_status'),
+    path('exports/<int:job_id>/download/', views.export_job_download, name='export_job_download'),
     path('transcription/', views.transcription_webhook, name='transcription'),
+    path('api/responses/', api.response_list, name='api_response_list'),
+    path('api/responses/<int:response_id>/', api.response_detail, name='api_response_detail'),
+    path('api/analytics/durations/', api.duration_analytics, name='api_duration_analytics'),
 ]
\ No newline at end of file
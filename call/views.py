@@ -1,23 +1,48 @@
-from django.http import HttpResponse, JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.shortcuts import render, redirect
+from django.shortcuts import get_object_or_404, render, redirect
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
 from twilio.twiml.voice_response import VoiceResponse, Record, Say, Gather
 from twilio.rest import Client
 from django.conf import settings
 from urllib.parse import quote
-from .models import Recording, CallResponse
+from .models import (Recording, CallResponse, Candidate, DailyFunnel, ExportJob, HourlyFunnel,
+                     RollupWatermark)
+from .spool import spool_callresponse_write
+from .routers import reporting_view
+from .journal import journaled
+from .pagination import decode_cursor, encode_cursor, keyset_page
+from .live import catch_up, get_feed
+from .stats import read_status_counts, update_call_status
+from .cache import cached_fragment
+from .search import search_transcripts
+from .candidates import normalize_phone
+from .exports import export_rows, pivot_headers, pivot_rows, stream_csv, write_xlsx
+from .streaming import async_chunks, file_response, read_file
+from .filters import filter_call_responses
+from .questions import load_questions
+from .scoring import keyword_fields
+from .rollups import METRICS as FUNNEL_METRICS, WATERMARK as ROLLUP_WATERMARK
+from .latency import WATERMARK as LATENCY_WATERMARK, latency_report
+from .jobs import FORMATS as EXPORT_FORMATS, available_formats, submit_export
 import re
 from django.views.decorators.http import require_http_methods
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 from django.utils import timezone
-import pandas as pd
+from django.utils.dateparse import parse_datetime
+from django.utils.http import quote_etag
 import logging
 import time
 import json
-from io import BytesIO
 from django.contrib import messages
+from django.db import DatabaseError
+from django.db.models import Count, Max, Min, Q, Sum
+from django.core.serializers.json import DjangoJSONEncoder
+from asgiref.sync import sync_to_async
+import asyncio
 
 logger = logging.getLogger(__name__)
 
@@ -89,7 +114,12 @@ def make_call(request):
                 logger.info(f"CallResponse created for {call.sid}")
             except Exception as db_error:
                 logger.warning(f"Failed to create CallResponse (continuing): {db_error}")
-                # Continue without database - call will still work
+                # Continue without database - call will still work, the write is replayed later
+                spool_callresponse_write(
+                    'get_or_create',
+                    {'call_sid': call.sid, 'question': 'Call initiated'},
+                    {'phone_number': phone_number, 'call_status': 'initiated'}
+                )
             
             messages.success(request, f'Call initiated to {phone_number}. Call SID: {call.sid}')
             
@@ -104,6 +134,7 @@ def make_call(request):
 # Answer call with questions
 @csrf_exempt
 @require_http_methods(["POST"])
+@journaled('answer')
 def answer(request):
     """Handle incoming call and start the interview"""
     try:
@@ -162,6 +193,7 @@ def fetch_transcript(recording_sid):
 # Handle recorded answer
 @csrf_exempt
 @require_http_methods(["POST"])
+@journaled('recording_status')
 def recording_status(request):
     try:
         # Get the recording SID from the request
@@ -188,33 +220,41 @@ def recording_status(request):
         # Get recording details
         recording = client.recordings(recording_sid).fetch()
         
-        # Find the CallResponse record
-        try:
-            response = CallResponse.objects.get(id=response_id)
-        except CallResponse.DoesNotExist:
-            return HttpResponse('CallResponse not found', status=404)
-
-        # Update the response with recording details
-        response.recording_sid = recording_sid
-        response.recording_url = recording.uri
-        response.recording_duration = recording.duration
-        response.call_status = call.status
-        response.call_duration = call.duration
-        response.save()
+        fields = {
+            'recording_sid': recording_sid,
+            'recording_url': recording.uri,
+            'recording_duration': recording.duration,
+            'call_status': call.status,
+            'call_duration': call.duration,
+        }
 
         # Try to get the transcript
         try:
             # Get transcript for this recording
             transcript = client.transcriptions.list(recording_sid=recording_sid)
             if transcript:
-                response.transcript = transcript[0].transcription_text
-                response.transcript_status = 'completed'
+                fields['transcript'] = transcript[0].transcription_text
+                fields['transcript_status'] = 'completed'
+                fields.update(keyword_fields(fields['transcript']))
             else:
-                response.transcript_status = 'pending'
+                fields['transcript_status'] = 'pending'
         except Exception as e:
             logger.error(f"Error fetching transcript for recording {recording_sid}: {str(e)}")
-            response.transcript_status = 'failed'
-        response.save()
+            fields['transcript_status'] = 'failed'
+
+        # Update the CallResponse record, or spool the update if the database is unavailable
+        try:
+            response = CallResponse.objects.get(id=response_id)
+            for field, value in fields.items():
+                setattr(response, field, value)
+            response.save()
+        except CallResponse.DoesNotExist:
+            return HttpResponse('CallResponse not found', status=404)
+        except DatabaseError as db_error:
+            logger.warning(f"Failed to store recording {recording_sid} (spooled for replay): {db_error}")
+            spool_callresponse_write('update', {'id': response_id}, fields)
+            # The next question depends on the stored answers; fall through to the error reply
+            raise
 
         # Create a new VoiceResponse for the next question
         resp = VoiceResponse()
@@ -246,7 +286,11 @@ def recording_status(request):
             resp.say("Thank you for your time. We will review your responses and get back to you soon.", voice='Polly.Amy')
             
             # Update all responses for this call to completed
-            CallResponse.objects.filter(call_sid=call_sid).update(call_status='completed')
+            try:
+                update_call_status(CallResponse.objects.filter(call_sid=call_sid), 'completed')
+            except DatabaseError as db_error:
+                logger.warning(f"Failed to update call status (spooled for replay): {db_error}")
+                spool_callresponse_write('update', {'call_sid': call_sid}, {'call_status': 'completed'})
 
         return HttpResponse(str(resp))
         
@@ -257,21 +301,79 @@ def recording_status(request):
         return HttpResponse(str(resp))
 
 # HR Dashboard
+DASHBOARD_PAGE_SIZE = 50
+DASHBOARD_ORDERING = ['-created_at', '-id']
+# ?sort= choices for the dashboard table; each ordering has an index
+DASHBOARD_SORTS = {
+    'recent': DASHBOARD_ORDERING,
+    'score': ['-keyword_score', '-id'],
+}
+
+def _render_dashboard_stats():
+    status_counts = read_status_counts()
+    return render_to_string('call/_stats.html', {
+        'total_calls': sum(status_counts.values()),
+        'completed_calls': status_counts.get('completed', 0),
+        'in_progress_calls': status_counts.get('in-progress', 0),
+    })
+
+def render_rows(call_responses, using=None):
+    """Dashboard table rows, rendered with CALL_TEMPLATE_ENGINE"""
+    return mark_safe(render_to_string(
+        'call/_response_rows.html',
+        {'call_responses': call_responses},
+        using=using or settings.CALL_TEMPLATE_ENGINE,
+    ))
+
+@reporting_view
 def dashboard(request):
     """Display dashboard with call data"""
     try:
-        # Try to get call responses from database
-        call_responses = CallResponse.objects.all().order_by('-created_at')
-        total_calls = call_responses.count()
-        completed_calls = call_responses.filter(call_status='completed').count()
-        in_progress_calls = call_responses.filter(call_status='in-progress').count()
+        # Try to get call responses from database, one keyset page at a time
+        sort = request.GET.get('sort') if request.GET.get('sort') in DASHBOARD_SORTS else 'recent'
+        call_responses, next_cursor = keyset_page(
+            filter_call_responses(CallResponse.objects.all(), request.GET),
+            DASHBOARD_SORTS[sort],
+            request.GET.get('after'),
+            DASHBOARD_PAGE_SIZE,
+        )
+        stats_html = mark_safe(cached_fragment('dashboard-stats', 'all', _render_dashboard_stats))
+        
+        next_query = None
+        if next_cursor:
+            params = request.GET.copy()
+            params['after'] = next_cursor
+            next_query = params.urlencode()
+        filters = request.GET.copy()
+        filters.pop('after', None)
+        sort_queries = {}
+        for key in DASHBOARD_SORTS:
+            params = filters.copy()
+            params['sort'] = key
+            sort_queries[key] = params.urlencode()
+        
+        # Ranked transcript matches with highlighted snippets
+        search = request.GET.get('search', '').strip()
+        search_results = search_transcripts(search) if search else []
+        
+        # Where the live stream picks up: the newest change at render time
+        latest = CallResponse.objects.order_by('-updated_at', '-id').values_list('updated_at', 'id').first()
         
         context = {
             'call_responses': call_responses,
-            'total_calls': total_calls,
-            'completed_calls': completed_calls,
-            'in_progress_calls': in_progress_calls,
+            'rows_html': render_rows(call_responses),
+            'live_cursor': encode_cursor(latest) if latest else encode_cursor([timezone.now(), 0]),
+            'stats_html': stats_html,
+            'search': search,
+            'search_results': search_results,
+            'export_formats': [(fmt, dict(ExportJob.FORMAT_CHOICES)[fmt]) for fmt in available_formats()],
             'database_available': True,
+            'filters': request.GET,
+            'is_first_page': 'after' not in request.GET,
+            'first_page_query': filters.urlencode(),
+            'next_page_query': next_query,
+            'sort': sort,
+            'sort_queries': sort_queries,
         }
         
     except Exception as e:
@@ -288,6 +390,204 @@ def dashboard(request):
     
     return render(request, 'call/dashboard.html', context)
 
+def _sse(event, data, event_id=None):
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+async def dashboard_stream(request):
+    """Server-sent events with the CallResponse changes after the client's cursor"""
+    cursor = decode_cursor(request.headers.get('Last-Event-ID') or request.GET.get('cursor'))
+    feed = await sync_to_async(get_feed)()
+
+    async def events():
+        nonlocal cursor
+        yield f"retry: {settings.CALL_LIVE_RETRY_MS}\n\n"
+        if cursor is None:
+            yield _sse('reset', {})
+            return
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.CALL_LIVE_STREAM_SECONDS
+        last_sent = loop.time()
+        version = None
+        while loop.time() < deadline:
+            if feed.version != version:
+                version = feed.version
+                rows = feed.changes_since(cursor)
+                if rows is None:
+                    # Too far behind the shared buffer: one catch-up query
+                    rows = await sync_to_async(catch_up)(cursor)
+                    if rows is None:
+                        yield _sse('reset', {})
+                        return
+                if rows:
+                    cursor = [rows[-1]['updated_at'], rows[-1]['id']]
+                    yield _sse('changes', rows, encode_cursor(cursor))
+                    last_sent = loop.time()
+            if loop.time() - last_sent > 15:
+                yield ": keep-alive\n\n"
+                last_sent = loop.time()
+            await asyncio.sleep(settings.CALL_LIVE_POLL_INTERVAL)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+CALLS_PAGE_SIZE = 25
+# Pages seek on the call_sid index; only the calls on a page are aggregated
+CALLS_ORDERING = ['call_sid']
+
+@reporting_view
+def call_list(request):
+    """Display one row per call with aggregated answer statistics"""
+    questions = load_questions()
+    try:
+        rows = filter_call_responses(
+            CallResponse.objects.exclude(call_sid__isnull=True).exclude(call_sid=''),
+            {key: request.GET.get(key, '') for key in ('since', 'until', 'phone')},
+        )
+        page, next_cursor = keyset_page(
+            rows.values('call_sid').distinct(), CALLS_ORDERING, request.GET.get('after'), CALLS_PAGE_SIZE,
+        )
+        call_sids = [row['call_sid'] for row in page]
+        answered = Q(question__in=questions)
+        aggregated = (
+            rows.filter(call_sid__in=call_sids)
+            .order_by()
+            .values('call_sid')
+            .annotate(
+                phone=Max('phone_number'),
+                started_at=Min('created_at'),
+                last_activity=Max('updated_at'),
+                question_count=Count('id', filter=answered),
+                total_recording_duration=Sum('recording_duration', filter=answered),
+                transcripts_completed=Count('id', filter=answered & Q(transcript_status='completed')),
+                completed_rows=Count('id', filter=Q(call_status='completed')),
+                failed_rows=Count('id', filter=Q(call_status='failed')),
+            )
+        )
+        by_sid = {call['call_sid']: call for call in aggregated}
+        calls = [by_sid[call_sid] for call_sid in call_sids]
+
+        # One batched query for the answers of every call on this page
+        answers = {}
+        for answer in (
+            CallResponse.objects.filter(call_sid__in=[call['call_sid'] for call in calls], question__in=questions)
+            .only('call_sid', 'question', 'transcript', 'transcript_status', 'recording_url', 'recording_duration')
+            .order_by('call_sid', 'created_at', 'id')
+        ):
+            answers.setdefault(answer.call_sid, []).append(answer)
+
+        for call in calls:
+            call['answers'] = answers.get(call['call_sid'], [])
+            if call['completed_rows']:
+                call['final_status'] = 'completed'
+            elif call['failed_rows']:
+                call['final_status'] = 'failed'
+            else:
+                call['final_status'] = 'in-progress'
+            call['transcript_completeness'] = (
+                round(100 * call['transcripts_completed'] / call['question_count'])
+                if call['question_count'] else 0
+            )
+
+        next_query = None
+        if next_cursor:
+            params = request.GET.copy()
+            params['after'] = next_cursor
+            next_query = params.urlencode()
+        filters = request.GET.copy()
+        filters.pop('after', None)
+
+        context = {
+            'calls': calls,
+            'question_total': len(questions),
+            'database_available': True,
+            'filters': request.GET,
+            'is_first_page': 'after' not in request.GET,
+            'first_page_query': filters.urlencode(),
+            'next_page_query': next_query,
+        }
+    except Exception as e:
+        logger.error(f"Database error in call list: {e}")
+        context = {
+            'calls': [],
+            'database_available': False,
+            'database_error': str(e),
+        }
+
+    return render(request, 'call/calls.html', context)
+
+FUNNEL_PERIODS = {'day': (DailyFunnel, timedelta(days=30)), 'hour': (HourlyFunnel, timedelta(hours=48))}
+
+@reporting_view
+def funnel(request):
+    """Per-question drop-off and completion rates, read only from the funnel rollups"""
+    granularity = request.GET.get('by') if request.GET.get('by') in FUNNEL_PERIODS else 'day'
+    model, period = FUNNEL_PERIODS[granularity]
+    since = timezone.now() - period
+    try:
+        steps = list(
+            model.objects.filter(bucket__gte=since)
+            .values('step')
+            .annotate(question_text=Max('question'), **{metric: Sum(metric) for metric in FUNNEL_METRICS})
+            .order_by('step')
+        )
+        total = steps[0]['calls_reached'] if steps and steps[0]['step'] == 0 else 0
+        previous = total
+        for step in steps:
+            step['reach_rate'] = round(100 * step['calls_reached'] / total) if total else 0
+            step['drop_off'] = previous - step['calls_reached'] if step['step'] else 0
+            step['average_duration'] = (
+                round(step['duration_total'] / step['answers_timed'], 1) if step['answers_timed'] else None
+            )
+            previous = step['calls_reached']
+
+        buckets = list(model.objects.filter(step=0, bucket__gte=since).order_by('-bucket'))
+        for bucket in buckets:
+            bucket.completion_rate = (
+                round(100 * bucket.calls_completed / bucket.calls_reached) if bucket.calls_reached else 0
+            )
+        watermark = RollupWatermark.objects.filter(name=ROLLUP_WATERMARK).first()
+        context = {
+            'steps': [step for step in steps if step['step']],
+            'total_calls': total,
+            'buckets': buckets,
+            'granularity': granularity,
+            'rolled_up_to': watermark.updated_at if watermark else None,
+            'database_available': True,
+        }
+    except Exception as e:
+        logger.error(f"Database error in funnel: {e}")
+        context = {'database_available': False, 'database_error': str(e)}
+
+    return render(request, 'call/funnel.html', context)
+
+LATENCY_PERIODS = (1, 7, 30)
+
+@reporting_view
+def latency(request):
+    """Caller-perceived dead air per question and per deployment, from the derived turn timings"""
+    days = int(request.GET['days']) if request.GET.get('days') in map(str, LATENCY_PERIODS) else 7
+    try:
+        watermark = RollupWatermark.objects.filter(name=LATENCY_WATERMARK).first()
+        context = dict(
+            latency_report(days),
+            days=days,
+            periods=LATENCY_PERIODS,
+            derived_to=watermark.updated_at if watermark else None,
+            database_available=True,
+        )
+    except Exception as e:
+        logger.error(f"Database error in latency report: {e}")
+        context = {'days': days, 'periods': LATENCY_PERIODS, 'database_available': False, 'database_error': str(e)}
+
+    return render(request, 'call/latency.html', context)
+
 def index(request):
     """Render the main page"""
     return render(request, 'call/dashboard.html')
@@ -333,74 +633,148 @@ def test_config(request):
             }
         })
 
+@reporting_view
+def candidate_profile(request, phone_number):
+    """Everything known about one candidate, read from the Candidate summary row"""
+    candidate = get_object_or_404(Candidate, phone_number=normalize_phone(phone_number))
+    transcripts = [
+        dict(item, created_at=parse_datetime(item['created_at']))
+        for item in candidate.latest_transcripts
+    ]
+    return render(request, 'call/candidate.html', {
+        'candidate': candidate,
+        'latest_transcripts': transcripts,
+    })
+
+@reporting_view
 def view_response(request, response_id):
     """Display the details of a specific response"""
-    response = CallResponse.objects.get(id=response_id)
-    return render(request, 'call/view_response.html', {'response': response})
+    def build():
+        response = CallResponse.objects.get(id=response_id)
+        return render_to_string('call/view_response.html', {'response': response},
+                                using=settings.CALL_TEMPLATE_ENGINE)
+    return HttpResponse(cached_fragment('response-page', response_id, build))
 
+@reporting_view
 def export_to_excel(request):
+    """Download the responses matching the dashboard filters as an XLSX workbook"""
     try:
-        # Get all responses
-        responses = CallResponse.objects.all().order_by('-created_at')
-        
-        # Create a DataFrame
-        data = []
-        for response in responses:
-            data.append({
-                'Phone Number': response.phone_number,
-                'Question': response.question or 'N/A',
-                'Response': response.response or 'N/A',
-                'Recording URL': response.recording_url or 'N/A',
-                'Recording Duration (seconds)': response.recording_duration or 'N/A',
-                'Transcript': response.transcript or 'N/A',
-                'Transcript Status': response.transcript_status,
-                'Call SID': response.call_sid or 'N/A',
-                'Call Duration (seconds)': response.call_duration or 'N/A',
-                'Call Status': response.call_status or 'N/A',
-                'Created At': response.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                'Updated At': response.updated_at.strftime('%Y-%m-%d %H:%M:%S')
-            })
-        
-        df = pd.DataFrame(data)
-        
-        # Create Excel writer
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Call Responses', index=False)
-            
-            # Get workbook and worksheet
-            workbook = writer.book
-            worksheet = writer.sheets['Call Responses']
-            
-            # Auto-adjust column widths
-            for column in worksheet.columns:
-                max_length = 0
-                column = [cell for cell in column]
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = (max_length + 2)
-                worksheet.column_dimensions[column[0].column_letter].width = adjusted_width
-        
-        # Set up the response
-        output.seek(0)
-        response = HttpResponse(
-            output.read(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        responses = filter_call_responses(CallResponse.objects.all(), request.GET)
+        output = write_xlsx(export_rows(responses))
+        return file_response(
+            output,
+            'call_responses.xlsx',
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
         )
-        response['Content-Disposition'] = 'attachment; filename=call_responses.xlsx'
-        
-        return response
         
     except Exception as e:
         logger.error(f"Error exporting to Excel: {str(e)}")
         messages.error(request, f"Error exporting to Excel: {str(e)}")
         return redirect('dashboard')
 
+@reporting_view
+def export_to_csv(request):
+    """Stream the responses matching the dashboard filters as CSV"""
+    responses = filter_call_responses(CallResponse.objects.all(), request.GET)
+    response = StreamingHttpResponse(async_chunks(stream_csv(export_rows(responses))), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename=call_responses.csv'
+    return response
+
+@reporting_view
+def export_pivot(request):
+    """One row per call with a transcript and duration column per question, as CSV or XLSX"""
+    questions = load_questions()
+    headers = pivot_headers(questions)
+    rows = pivot_rows(filter_call_responses(CallResponse.objects.all(), request.GET), questions)
+    if request.GET.get('format') == 'xlsx':
+        return file_response(
+            write_xlsx(rows, sheet_title='Interviews', headers=headers),
+            'interviews.xlsx',
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+    response = StreamingHttpResponse(async_chunks(stream_csv(rows, headers)), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename=interviews.csv'
+    return response
+
+def export_jobs(request):
+    """Submit a background export (POST) and list recent export jobs"""
+    if request.method == 'POST':
+        fmt = request.POST.get('format')
+        if fmt not in available_formats():
+            messages.error(request, f"Unsupported export format: {fmt}")
+            return redirect('export_jobs')
+        try:
+            job, reused = submit_export(fmt, request.POST)
+        except Exception as e:
+            logger.error(f"Error submitting export: {str(e)}")
+            messages.error(request, f"Error submitting export: {str(e)}")
+            return redirect('export_jobs')
+        if reused:
+            messages.info(request, f"Export #{job.id} already covers this data; reusing it.")
+        else:
+            messages.success(request, f"Export #{job.id} queued.")
+        return redirect('export_jobs')
+
+    return render(request, 'call/exports.html', {
+        'jobs': ExportJob.objects.all()[:20],
+        'formats': [(fmt, dict(ExportJob.FORMAT_CHOICES)[fmt]) for fmt in available_formats()],
+        'filters': request.GET,
+    })
+
+def export_job_status(request, job_id):
+    job = get_object_or_404(ExportJob, id=job_id)
+    return JsonResponse({
+        'id': job.id,
+        'status': job.status,
+        'progress': job.progress,
+        'rows_written': job.rows_written,
+        'rows_total': job.rows_total,
+        'file_size': job.file_size,
+        'error': job.error,
+    })
+
+def export_job_download(request, job_id):
+    """Serve a finished export, honouring single byte-range requests so downloads can resume"""
+    job = get_object_or_404(ExportJob, id=job_id, status='done')
+    if not os.path.exists(job.file_path):
+        raise Http404("Export file has expired")
+    extension, content_type = EXPORT_FORMATS[job.format]
+    size = os.path.getsize(job.file_path)
+    # Artifacts never change once written, so the cache key identifies the bytes
+    etag = quote_etag(job.cache_key)
+    start, end = 0, size - 1
+
+    match = re.fullmatch(r'bytes=(\d*)-(\d*)', request.headers.get('Range', '').strip())
+    if_range = request.headers.get('If-Range')
+    partial = bool(match and any(match.groups())) and (not if_range or if_range == etag)
+    if partial:
+        first, last = match.groups()
+        if not first:
+            start = max(0, size - int(last))
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        if start >= size or start > end:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    length = end - start + 1
+    response = StreamingHttpResponse(
+        async_chunks(read_file(open(job.file_path, 'rb'), start, length)),
+        status=206 if partial else 200,
+        content_type=content_type,
+    )
+    response['Content-Length'] = str(length)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Content-Disposition'] = f'attachment; filename=call_responses_{job.id}{extension}'
+    if partial:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
+
 @csrf_exempt
+@journaled('voice')
 def voice(request):
     """Handle voice response and ask questions - Database-independent approach"""
     try:
@@ -421,21 +795,7 @@ def voice(request):
         logger.info(f"Voice route: q={q}, name={name}, call_sid={call_sid}, phone_number={phone_number}")
         
         # Load questions from JSON file
-        try:
-            questions_path = os.path.join(settings.BASE_DIR, "questions.json")
-            with open(questions_path, "r", encoding="utf-8") as f:
-                questions = json.load(f)
-            logger.info(f"Loaded {len(questions)} questions from JSON file")
-        except Exception as e:
-            logger.error(f"Error loading questions: {e}")
-            # Fallback questions
-            questions = [
-                "Hi, please tell us your full name.",
-                "What is your work experience?",
-                "What was your previous job role?",
-                "Why do you want to join our company?"
-            ]
-            logger.info(f"Using fallback questions: {len(questions)} questions")
+        questions = load_questions()
         
         # Create TwiML response
         response = VoiceResponse()
@@ -470,6 +830,11 @@ def voice(request):
                 except Exception as db_error:
                     logger.warning(f"Database operation failed (continuing without DB): {db_error}")
                     # Continue without database - this won't break the call flow
+                    spool_callresponse_write(
+                        'get_or_create',
+                        {'call_sid': call_sid, 'question': current_question},
+                        {'phone_number': phone_number, 'call_status': 'in-progress'}
+                    )
             
             # If this is the last question
             if q == len(questions):
@@ -480,10 +845,11 @@ def voice(request):
                 # Try to update call status to completed (optional)
                 if call_sid:
                     try:
-                        CallResponse.objects.filter(call_sid=call_sid).update(call_status='completed')
+                        update_call_status(CallResponse.objects.filter(call_sid=call_sid), 'completed')
                         logger.info(f"Call {call_sid} completed")
                     except Exception as db_error:
                         logger.warning(f"Failed to update call status (continuing): {db_error}")
+                        spool_callresponse_write('update', {'call_sid': call_sid}, {'call_status': 'completed'})
             else:
                 # Ask the current question
                 logger.info(f"Asking question {q}: {current_question}")
@@ -520,6 +886,7 @@ def voice(request):
         return HttpResponse(str(response), content_type="text/xml")
 
 @csrf_exempt
+@journaled('transcription_webhook')
 def transcription_webhook(request):
     """Handle transcription webhook from Twilio"""
     if request.method == "POST":
@@ -534,23 +901,31 @@ def transcription_webhook(request):
             logger.info(f"Transcript: {transcript_text}")
             logger.info(f"Recording URL: {recording_url}")
             
-            # Find or create CallResponse
-            response, created = CallResponse.objects.get_or_create(
-                recording_sid=recording_sid,
-                defaults={
-                    'phone_number': call_sid,  # Using call_sid temporarily
-                    'question': 'Auto-transcribed response',
-                    'recording_url': recording_url,
-                    'transcript': transcript_text,
-                    'transcript_status': 'completed'
-                }
-            )
-            
-            if not created:
-                # Update existing response
-                response.transcript = transcript_text
-                response.transcript_status = 'completed'
-                response.save()
+            # Score the new transcript here so it is sortable as soon as it is stored
+            transcript_fields = {'transcript': transcript_text, 'transcript_status': 'completed'}
+            transcript_fields.update(keyword_fields(transcript_text))
+            defaults = {
+                'phone_number': call_sid,  # Using call_sid temporarily
+                'question': 'Auto-transcribed response',
+                'recording_url': recording_url,
+                **transcript_fields,
+            }
+            try:
+                # Find or create CallResponse
+                response, created = CallResponse.objects.get_or_create(
+                    recording_sid=recording_sid,
+                    defaults=defaults
+                )
+                
+                if not created:
+                    # Update existing response
+                    for field, value in transcript_fields.items():
+                        setattr(response, field, value)
+                    response.save()
+            except Exception as db_error:
+                logger.warning(f"Failed to store transcription (spooled for replay): {db_error}")
+                spool_callresponse_write('get_or_create', {'recording_sid': recording_sid}, defaults)
+                spool_callresponse_write('update', {'recording_sid': recording_sid}, transcript_fields)
             
             return HttpResponse("Transcription received", status=200)
             
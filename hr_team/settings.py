@@ -62,7 +62,6 @@ TEMPLATES = [
         'DIRS': [
             os.path.join(BASE_DIR, 'templates'),
         ],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -70,10 +69,34 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compiled templates are kept in memory whatever DEBUG says
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
 
+# Optional Jinja2 engine for the per-row dashboard and response templates
+# (call/jinja2/); without the package everything renders with Django templates
+try:
+    import jinja2  # noqa: F401
+    TEMPLATES.append({
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'NAME': 'jinja2',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'environment': 'call.jinja.environment',
+        },
+    })
+    JINJA2_AVAILABLE = True
+except ImportError:
+    JINJA2_AVAILABLE = False
+
 WSGI_APPLICATION = 'hr_team.wsgi.application'
 
 # Database
@@ -84,6 +107,60 @@ DATABASES = {
     }
 }
 
+# Read replica for the reporting views (dashboard, exports, response pages).
+# Set REPLICA_DATABASE_URL to use a real replica; otherwise reports read from a
+# read-only snapshot of the SQLite database kept fresh by
+# `manage.py refresh_replica --every 15` (see Procfile / render.yaml).
+CALL_REPLICA_MAX_STALENESS = float(os.getenv('CALL_REPLICA_MAX_STALENESS', '30'))
+CALL_REPLICA_SNAPSHOT_PATH = None
+if os.getenv('REPLICA_DATABASE_URL'):
+    import dj_database_url
+    DATABASES['replica'] = dj_database_url.parse(os.getenv('REPLICA_DATABASE_URL'))
+elif os.getenv('CALL_REPLICA_ENABLED', 'True') == 'True':
+    CALL_REPLICA_SNAPSHOT_PATH = os.getenv('CALL_REPLICA_SNAPSHOT_PATH', os.path.join(BASE_DIR, 'db.replica.sqlite3'))
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f'file:{CALL_REPLICA_SNAPSHOT_PATH}?mode=ro',
+        'OPTIONS': {'uri': True},
+    }
+if 'replica' in DATABASES:
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['call.routers.ReportingRouter']
+
+# Where `manage.py bootstrap_db` remembers the last schema fingerprint it verified
+CALL_SCHEMA_FINGERPRINT_DIR = os.getenv('CALL_SCHEMA_FINGERPRINT_DIR', BASE_DIR)
+
+# Cache
+# Files under CACHE_LOCATION by default, so every web worker and management
+# command on the machine shares the data version that invalidates cached pages
+# (a per-process local memory cache would miss bumps made by other processes).
+# REDIS_URL shares it between machines; CACHE_BACKEND=locmem is only for a
+# single process.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+elif os.getenv('CACHE_BACKEND', 'file') == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'call-working',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')),
+            'OPTIONS': {'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '10000'))},
+        }
+    }
+CALL_CACHE_TIMEOUT = int(os.getenv('CALL_CACHE_TIMEOUT', '300'))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -117,5 +194,51 @@ TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
 TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER')
 PUBLIC_URL = 'https://call-working.onrender.com'  # Render deployment URL
 
+# Local spool for CallResponse writes made while the database is unavailable
+CALL_SPOOL_PATH = os.getenv('CALL_SPOOL_PATH', os.path.join(BASE_DIR, 'spool', 'callresponse.spool'))
+CALL_SPOOL_FSYNC_BATCH = int(os.getenv('CALL_SPOOL_FSYNC_BATCH', '64'))
+CALL_SPOOL_FSYNC_INTERVAL = float(os.getenv('CALL_SPOOL_FSYNC_INTERVAL', '1.0'))
+
+# Retention: CallResponse rows older than this are moved to archive segments
+CALL_ARCHIVE_DIR = os.getenv('CALL_ARCHIVE_DIR', os.path.join(BASE_DIR, 'archive'))
+CALL_ARCHIVE_AFTER_DAYS = int(os.getenv('CALL_ARCHIVE_AFTER_DAYS', '90'))
+CALL_ARCHIVE_SEGMENT_ROWS = int(os.getenv('CALL_ARCHIVE_SEGMENT_ROWS', '5000'))
+
+# Append-only journal of raw Twilio webhook events
+CALL_JOURNAL_DIR = os.getenv('CALL_JOURNAL_DIR', os.path.join(BASE_DIR, 'journal'))
+CALL_JOURNAL_SEGMENT_BYTES = int(os.getenv('CALL_JOURNAL_SEGMENT_BYTES', str(64 * 1024 * 1024)))
+# Recorded with every journal event so latency can be compared between releases
+CALL_DEPLOYMENT = os.getenv('CALL_DEPLOYMENT') or os.getenv('RENDER_GIT_COMMIT', '')[:12] or 'local'
+
+# Live dashboard stream: one shared poll per process, fanned out to every tab
+CALL_LIVE_POLL_INTERVAL = float(os.getenv('CALL_LIVE_POLL_INTERVAL', '2.0'))
+CALL_LIVE_BUFFER_SIZE = int(os.getenv('CALL_LIVE_BUFFER_SIZE', '2000'))
+CALL_LIVE_STREAM_SECONDS = int(os.getenv('CALL_LIVE_STREAM_SECONDS', '300'))
+CALL_LIVE_RETRY_MS = int(os.getenv('CALL_LIVE_RETRY_MS', '3000'))
+
+# Bearer token required by the /api/ endpoints; unset leaves them open like the dashboard
+CALL_API_TOKEN = os.getenv('CALL_API_TOKEN')
+
+# Engine for the dashboard rows and response pages: 'jinja2' (when installed) or 'django'
+CALL_TEMPLATE_ENGINE = os.getenv('CALL_TEMPLATE_ENGINE', 'jinja2' if JINJA2_AVAILABLE else 'django')
+if CALL_TEMPLATE_ENGINE == 'jinja2' and not JINJA2_AVAILABLE:
+    CALL_TEMPLATE_ENGINE = 'django'
+
+# Background export jobs (call.jobs); Parquet output needs pyarrow installed.
+# The in-process workers also requeue abandoned jobs and purge expired ones;
+# with CALL_EXPORT_WORKERS=0 jobs only run under `manage.py run_export_jobs`
+CALL_EXPORT_DIR = os.getenv('CALL_EXPORT_DIR', os.path.join(BASE_DIR, 'exports'))
+CALL_EXPORT_WORKERS = int(os.getenv('CALL_EXPORT_WORKERS', '1'))
+CALL_EXPORT_KEEP_DAYS = int(os.getenv('CALL_EXPORT_KEEP_DAYS', '7'))
+# Queued or running jobs without progress for this long are considered abandoned
+CALL_EXPORT_STALE_MINUTES = int(os.getenv('CALL_EXPORT_STALE_MINUTES', '10'))
+
+# Transcript keyword scoring (call.scoring): the role's phrase list in the keywords file
+CALL_KEYWORDS_PATH = os.getenv('CALL_KEYWORDS_PATH', os.path.join(BASE_DIR, 'keywords.json'))
+CALL_SCORING_ROLE = os.getenv('CALL_SCORING_ROLE', 'default')
+
+# Downloaded recordings (<recording_sid>.wav or .mp3) read by `manage.py analyze_recordings`
+CALL_RECORDINGS_DIR = os.getenv('CALL_RECORDINGS_DIR', os.path.join(BASE_DIR, 'recordings'))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField' 
\ No newline at end of file